@@ -0,0 +1,203 @@
+from src.adapters.room_responses import (
+    get_available_intervals_response,
+    get_available_seats_batch_response,
+    get_available_seats_chunk,
+    get_available_seats_response,
+    get_cache_stats_response,
+    get_cancel_seats_rejected_response,
+    get_cancel_seats_response,
+    get_reserve_seats_rejected_response,
+    get_reserve_seats_response,
+    get_room_response,
+    get_room_seats_response,
+    get_rooms_response,
+)
+from src.config import settings
+from src.protos_generated import room_pb2, room_pb2_grpc
+from src.use_cases.async_room_management import AsyncRoomManagement
+from src.use_cases.async_seat_management import AsyncSeatManagement
+
+
+class AsyncRoomService(room_pb2_grpc.RoomServiceServicer):
+    """
+    RoomService of the aio server, same proto contract and responses
+    Every RPC is a coroutine over async Postgres and Redis, the CPU bound
+    availability work is awaited on worker threads
+    """
+
+    def __init__(self):
+        self.room_management = AsyncRoomManagement()
+        self.seat_management = AsyncSeatManagement()
+
+    async def AddRoom(self, request, context):
+        room = await self.room_management.add_room(request.row, request.col)
+        if not room:
+            return room_pb2.AddRoomResponse(status="Failed to add room")
+        return room_pb2.AddRoomResponse(status="Room added", id=room.id)
+
+    async def RemoveRoom(self, request, context):
+        # Check if the room exists
+        room = await self.room_management.get_room(request.id)
+        if not room:
+            return room_pb2.RemoveRoomResponse(status="Room not found")
+
+        await self.room_management.remove_room(request.id)
+        return room_pb2.RemoveRoomResponse(status="Room removed")
+
+    async def ListRooms(self, request, context):
+        return get_rooms_response(await self.room_management.list_rooms())
+
+    async def GetRoom(self, request, context):
+        room = await self.room_management.get_room(request.id)
+        if not room:
+            return room_pb2.GetRoomResponse(status="Room not found")
+        return get_room_response(room)
+
+    async def ListRoomSeats(self, request, context):
+        # Check if the room exists
+        room = await self.room_management.get_room(request.room_id)
+        if not room:
+            return room_pb2.ListRoomSeatsResponse(status="Room not found")
+
+        seats = await self.room_management.list_room_seats(request.room_id)
+        return get_room_seats_response(seats)
+
+    async def GetAvailableSeats(self, request, context):
+        # Check if the room exists
+        room = await self.room_management.get_room(request.room_id)
+        if not room:
+            return room_pb2.GetAvailableSeatsResponse(status="Room not found")
+        self.room_management.record_room_requests([room.id])
+
+        # Only evaluate the seats inside the viewport
+        if request.HasField("viewport"):
+            available_intervals = (
+                await self.room_management.get_room_available_intervals_in_rect(
+                    room=room,
+                    min_distance=settings.min_distance,
+                    row_start=request.viewport.row_start,
+                    row_end=request.viewport.row_end,
+                    col_start=request.viewport.col_start,
+                    col_end=request.viewport.col_end,
+                )
+            )
+            return get_available_intervals_response(
+                available_intervals, as_intervals=request.as_intervals
+            )
+
+        if request.as_intervals:
+            available_intervals = (
+                await self.room_management.get_room_available_intervals(
+                    room=room, min_distance=settings.min_distance
+                )
+            )
+            return get_available_intervals_response(
+                available_intervals, as_intervals=True
+            )
+
+        available_seats = await self.room_management.get_room_available_seats(
+            room=room, min_distance=settings.min_distance
+        )
+        return get_available_seats_response(available_seats)
+
+    async def StreamAvailableSeats(self, request, context):
+        # Check if the room exists
+        room = await self.room_management.get_room(request.room_id)
+        if not room:
+            yield room_pb2.GetAvailableSeatsChunk(status="Room not found")
+            return
+        self.room_management.record_room_requests([room.id])
+
+        async for (
+            row_start,
+            row_end,
+            available_seats,
+        ) in self.room_management.iter_room_available_seats(
+            room=room,
+            min_distance=settings.min_distance,
+            chunk_rows=settings.available_seats_chunk_rows,
+        ):
+            yield get_available_seats_chunk(row_start, row_end, available_seats)
+
+    async def GetAvailableSeatsBatch(self, request, context):
+        # Get all rooms at once, missing rooms are left out
+        rooms = await self.room_management.get_rooms(list(request.room_ids))
+        self.room_management.record_room_requests(list(rooms))
+
+        available_seats = await self.room_management.get_rooms_available_seats(
+            rooms=list(rooms.values()), min_distance=settings.min_distance
+        )
+        return get_available_seats_batch_response(
+            list(request.room_ids), rooms, available_seats
+        )
+
+    async def CountAvailableSeats(self, request, context):
+        # Check if the room exists
+        room = await self.room_management.get_room(request.room_id)
+        if not room:
+            return room_pb2.CountAvailableSeatsResponse(status="Room not found")
+        self.room_management.record_room_requests([room.id])
+
+        count = await self.room_management.count_room_available_seats(
+            room=room, min_distance=settings.min_distance
+        )
+        return room_pb2.CountAvailableSeatsResponse(count=count)
+
+    async def GetCacheStats(self, request, context):
+        return get_cache_stats_response()
+
+    async def ReserveSeats(self, request, context):
+        # Check if the room exists
+        room = await self.room_management.get_room(request.room_id)
+        if not room:
+            return room_pb2.ReserveSeatsResponse(status="Room not found")
+
+        # Check all requested seats against one snapshot of the room
+        seats = [(seat.pos_x, seat.pos_y) for seat in request.seats]
+        rejections = await self.room_management.validate_room_seats(
+            room=room,
+            seats=seats,
+            min_distance=settings.min_distance,
+            snapshot=not settings.reserve_fast_path,
+        )
+        if rejections:
+            return get_reserve_seats_rejected_response(rejections)
+
+        if settings.reserve_fast_path:
+            seats, rejections = await self.room_management.check_and_reverse_room_seats(
+                room=room, seats=seats, min_distance=settings.min_distance
+            )
+            if rejections:
+                return get_reserve_seats_rejected_response(rejections)
+        else:
+            seats = await self.room_management.reverse_room_seats(
+                room=room, seats=seats
+            )
+
+        return get_reserve_seats_response(seats)
+
+    async def CancelSeats(self, request, context):
+        # Check if the room exists
+        room = await self.room_management.get_room(request.room_id)
+        if not room:
+            return room_pb2.CancelSeatsResponse(status="Room not found")
+
+        if not request.seat_ids:
+            return room_pb2.CancelSeatsResponse(status="Seat ids is empty")
+
+        # Check seats in db
+        list_seats, missing_seat_ids = (
+            await self.seat_management.get_seats_with_room_id(
+                list(request.seat_ids), room_id=request.room_id
+            )
+        )
+        rejected_response = get_cancel_seats_rejected_response(
+            room, list_seats, missing_seat_ids
+        )
+        if rejected_response:
+            return rejected_response
+
+        seats = await self.room_management.cancel_room_seats(
+            room=room, seats=list_seats
+        )
+        return get_cancel_seats_response(seats)
@@ -0,0 +1,186 @@
+from typing import Dict, List, Optional, Tuple
+
+from src.entities.rooms import Room, RoomRecord, SeatLike
+from src.entities.seats import SeatRejection
+from src.protos_generated import room_pb2
+from src.services.local_cache import local_cache
+
+
+def get_rooms_response(rooms: List[RoomRecord]) -> room_pb2.ListRoomsResponse:
+    return room_pb2.ListRoomsResponse(
+        rooms=[
+            room_pb2.Room(
+                id=room.id,
+                row=room.row,
+                col=room.col,
+            )
+            for room in rooms
+        ]
+    )
+
+
+def get_room_response(room: Room) -> room_pb2.GetRoomResponse:
+    return room_pb2.GetRoomResponse(
+        room=room_pb2.Room(
+            id=room.id,
+            row=room.row,
+            col=room.col,
+        )
+    )
+
+
+def get_room_seats_response(seats: List[SeatLike]) -> room_pb2.ListRoomSeatsResponse:
+    return room_pb2.ListRoomSeatsResponse(
+        seats=[
+            room_pb2.Seat(
+                id=seat.id,
+                pos_x=seat.pos_x,
+                pos_y=seat.pos_y,
+            )
+            for seat in seats
+        ]
+    )
+
+
+def get_seats(seats: List[Tuple[int, int]]) -> List[room_pb2.Seat]:
+    return [
+        room_pb2.Seat(
+            pos_x=seat[0],
+            pos_y=seat[1],
+        )
+        for seat in seats
+    ]
+
+
+def get_available_seats_response(
+    available_seats: List[Tuple[int, int]],
+) -> room_pb2.GetAvailableSeatsResponse:
+    return room_pb2.GetAvailableSeatsResponse(seats=get_seats(available_seats))
+
+
+def get_available_intervals_response(
+    available_intervals: List[Tuple[int, int, int]], as_intervals: bool
+) -> room_pb2.GetAvailableSeatsResponse:
+    """
+    Intervals (row, start_col, end_col) are much smaller for mostly free rooms,
+    without as_intervals they are expanded to seats
+    """
+    if not as_intervals:
+        return room_pb2.GetAvailableSeatsResponse(
+            seats=[
+                room_pb2.Seat(
+                    pos_x=interval[0],
+                    pos_y=pos_y,
+                )
+                for interval in available_intervals
+                for pos_y in range(interval[1], interval[2] + 1)
+            ]
+        )
+    return room_pb2.GetAvailableSeatsResponse(
+        intervals=[
+            room_pb2.SeatInterval(
+                row=interval[0],
+                start_col=interval[1],
+                end_col=interval[2],
+            )
+            for interval in available_intervals
+        ]
+    )
+
+
+def get_available_seats_chunk(
+    row_start: int, row_end: int, available_seats: List[Tuple[int, int]]
+) -> room_pb2.GetAvailableSeatsChunk:
+    return room_pb2.GetAvailableSeatsChunk(
+        row_start=row_start,
+        row_end=row_end,
+        seats=get_seats(available_seats),
+    )
+
+
+def get_available_seats_batch_response(
+    room_ids: List[int],
+    rooms: Dict[int, Room],
+    available_seats: Dict[int, List[Tuple[int, int]]],
+) -> room_pb2.GetAvailableSeatsBatchResponse:
+    return room_pb2.GetAvailableSeatsBatchResponse(
+        rooms=[
+            (
+                room_pb2.RoomAvailableSeats(
+                    room_id=room_id,
+                    seats=get_seats(available_seats[room_id]),
+                )
+                if room_id in rooms
+                else room_pb2.RoomAvailableSeats(
+                    room_id=room_id, status="Room not found"
+                )
+            )
+            for room_id in room_ids
+        ]
+    )
+
+
+def get_cache_stats_response() -> room_pb2.GetCacheStatsResponse:
+    stats = local_cache.get_stats()
+    return room_pb2.GetCacheStatsResponse(
+        hits=stats.hits,
+        misses=stats.misses,
+        evictions=stats.evictions,
+        size=stats.size,
+        hit_ratio=stats.hit_ratio,
+    )
+
+
+def get_reserve_seats_response(
+    seats: List[Tuple[int, int]],
+) -> room_pb2.ReserveSeatsResponse:
+    return room_pb2.ReserveSeatsResponse(seats=get_seats(seats))
+
+
+def get_reserve_seats_rejected_response(
+    rejections: List[SeatRejection],
+) -> room_pb2.ReserveSeatsResponse:
+    # The status keeps the first rejection, every rejection has its reason
+    return room_pb2.ReserveSeatsResponse(
+        status=f"Seat x:{rejections[0].pos_x} - y:{rejections[0].pos_y} {rejections[0].reason}",
+        rejected_seats=[
+            room_pb2.SeatRejection(
+                seat=room_pb2.Seat(pos_x=rejection.pos_x, pos_y=rejection.pos_y),
+                reason=rejection.reason,
+            )
+            for rejection in rejections
+        ],
+    )
+
+
+def get_cancel_seats_rejected_response(
+    room: Room, seats: List[SeatLike], missing_seat_ids: List[int]
+) -> Optional[room_pb2.CancelSeatsResponse]:
+    """
+    Check the seats to cancel against the room, None if they can be canceled
+    """
+    if missing_seat_ids:
+        return room_pb2.CancelSeatsResponse(
+            status=f"Seat id {', '.join(map(str, missing_seat_ids))} is not found"
+        )
+
+    # Check if seats are valid with the room
+    for seat in seats:
+        if seat.pos_x >= room.row:
+            return room_pb2.CancelSeatsResponse(
+                status=f"Seat {seat} have pos_x is greater than row {room.row}"
+            )
+        if seat.pos_y >= room.col:
+            return room_pb2.CancelSeatsResponse(
+                status=f"Seat {seat} have pos_y is greater than col {room.col}"
+            )
+    return None
+
+
+def get_cancel_seats_response(
+    seats: List[Tuple[int, int]],
+) -> room_pb2.CancelSeatsResponse:
+    return room_pb2.CancelSeatsResponse(
+        status="Seats are canceled",
+        seats=[room_pb2.Seat(pos_x=seat[0], pos_y=seat[1]) for seat in seats],
+    )
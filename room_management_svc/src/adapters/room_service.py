@@ -1,7 +1,18 @@
-from typing import List, Tuple
-
+from src.adapters.room_responses import (
+    get_available_intervals_response,
+    get_available_seats_batch_response,
+    get_available_seats_chunk,
+    get_available_seats_response,
+    get_cache_stats_response,
+    get_cancel_seats_rejected_response,
+    get_cancel_seats_response,
+    get_reserve_seats_rejected_response,
+    get_reserve_seats_response,
+    get_room_response,
+    get_room_seats_response,
+    get_rooms_response,
+)
 from src.config import settings
-from src.entities.seats import Seat
 from src.protos_generated import room_pb2, room_pb2_grpc
 from src.use_cases.room_management import RoomManagement
 from src.use_cases.seat_management import SeatManagement
@@ -28,29 +39,13 @@ class RoomService(room_pb2_grpc.RoomServiceServicer):
         return room_pb2.RemoveRoomResponse(status="Room removed")
 
     def ListRooms(self, request, context):
-        rooms = self.room_management.list_rooms()
-        return room_pb2.ListRoomsResponse(
-            rooms=[
-                room_pb2.Room(
-                    id=room.id,
-                    row=room.row,
-                    col=room.col,
-                )
-                for room in rooms
-            ]
-        )
+        return get_rooms_response(self.room_management.list_rooms())
 
     def GetRoom(self, request, context):
         room = self.room_management.get_room(request.id)
         if not room:
             return room_pb2.GetRoomResponse(status="Room not found")
-        return room_pb2.GetRoomResponse(
-            room=room_pb2.Room(
-                id=room.id,
-                row=room.row,
-                col=room.col,
-            )
-        )
+        return get_room_response(room)
 
     def ListRoomSeats(self, request, context):
         # Check if the room exists
@@ -59,35 +54,89 @@ class RoomService(room_pb2_grpc.RoomServiceServicer):
             return room_pb2.ListRoomSeatsResponse(status="Room not found")
 
         seats = self.room_management.list_room_seats(request.room_id)
-        return room_pb2.ListRoomSeatsResponse(
-            seats=[
-                room_pb2.Seat(
-                    id=seat.id,
-                    pos_x=seat.pos_x,
-                    pos_y=seat.pos_y,
-                )
-                for seat in seats
-            ]
-        )
+        return get_room_seats_response(seats)
 
     def GetAvailableSeats(self, request, context):
         # Check if the room exists
         room = self.room_management.get_room(request.room_id)
         if not room:
             return room_pb2.GetAvailableSeatsResponse(status="Room not found")
+        self.room_management.record_room_requests([room.id])
+
+        # Only evaluate the seats inside the viewport
+        if request.HasField("viewport"):
+            available_intervals = (
+                self.room_management.get_room_available_intervals_in_rect(
+                    room=room,
+                    min_distance=settings.min_distance,
+                    row_start=request.viewport.row_start,
+                    row_end=request.viewport.row_end,
+                    col_start=request.viewport.col_start,
+                    col_end=request.viewport.col_end,
+                )
+            )
+            return get_available_intervals_response(
+                available_intervals, as_intervals=request.as_intervals
+            )
+
+        if request.as_intervals:
+            available_intervals = self.room_management.get_room_available_intervals(
+                room=room, min_distance=settings.min_distance
+            )
+            return get_available_intervals_response(
+                available_intervals, as_intervals=True
+            )
 
         available_seats = self.room_management.get_room_available_seats(
             room=room, min_distance=settings.min_distance
         )
-        return room_pb2.GetAvailableSeatsResponse(
-            seats=[
-                room_pb2.Seat(
-                    pos_x=seat[0],
-                    pos_y=seat[1],
-                )
-                for seat in available_seats
-            ]
+        return get_available_seats_response(available_seats)
+
+    def StreamAvailableSeats(self, request, context):
+        # Check if the room exists
+        room = self.room_management.get_room(request.room_id)
+        if not room:
+            yield room_pb2.GetAvailableSeatsChunk(status="Room not found")
+            return
+        self.room_management.record_room_requests([room.id])
+
+        for (
+            row_start,
+            row_end,
+            available_seats,
+        ) in self.room_management.iter_room_available_seats(
+            room=room,
+            min_distance=settings.min_distance,
+            chunk_rows=settings.available_seats_chunk_rows,
+        ):
+            yield get_available_seats_chunk(row_start, row_end, available_seats)
+
+    def GetAvailableSeatsBatch(self, request, context):
+        # Get all rooms at once, missing rooms are left out
+        rooms = self.room_management.get_rooms(list(request.room_ids))
+        self.room_management.record_room_requests(list(rooms))
+
+        available_seats = self.room_management.get_rooms_available_seats(
+            rooms=list(rooms.values()), min_distance=settings.min_distance
+        )
+        return get_available_seats_batch_response(
+            list(request.room_ids), rooms, available_seats
+        )
+
+    def CountAvailableSeats(self, request, context):
+        # Check if the room exists
+        room = self.room_management.get_room(request.room_id)
+        if not room:
+            return room_pb2.CountAvailableSeatsResponse(status="Room not found")
+        self.room_management.record_room_requests([room.id])
+
+        count = self.room_management.count_room_available_seats(
+            room=room, min_distance=settings.min_distance
         )
+        return room_pb2.CountAvailableSeatsResponse(count=count)
+
+    def GetCacheStats(self, request, context):
+        return get_cache_stats_response()
 
     def ReserveSeats(self, request, context):
         # Check if the room exists
@@ -95,55 +144,27 @@ class RoomService(room_pb2_grpc.RoomServiceServicer):
         if not room:
             return room_pb2.ReserveSeatsResponse(status="Room not found")
 
-        # Check if seats are in the room
-        for seat in request.seats:
-            if seat.pos_x >= room.row:
-                return room_pb2.ReserveSeatsResponse(
-                    status=f"Seat {seat} have pos_x is greater than row {room.row}"
-                )
-            if seat.pos_y >= room.col:
-                return room_pb2.ReserveSeatsResponse(
-                    status=f"Seat {seat} have pos_y is greater than col {room.col}"
-                )
-
-        # Check if seats are already in the room
-        for seat in request.seats:
-            # Check pos_x and pos_y are the same
-            for room_seat in self.room_management.list_room_seats(room.id):
-                if seat.pos_x == room_seat.pos_x and seat.pos_y == room_seat.pos_y:
-                    return room_pb2.ReserveSeatsResponse(
-                        status=f"Seat x:{seat.pos_x} - y:{seat.pos_y} is already in the room"
-                    )
-
-        # Check if seats in available_seats
-        available_seats: List[Tuple[int, int]] = (
-            self.room_management.get_room_available_seats(
-                room=room, min_distance=settings.min_distance
-            )
+        # Check all requested seats against one snapshot of the room
+        seats = [(seat.pos_x, seat.pos_y) for seat in request.seats]
+        rejections = self.room_management.validate_room_seats(
+            room=room,
+            seats=seats,
+            min_distance=settings.min_distance,
+            snapshot=not settings.reserve_fast_path,
         )
-        for seat in request.seats:
-            is_available = False
-            for available_seat in available_seats:
-                if seat.pos_x == available_seat[0] and seat.pos_y == available_seat[1]:
-                    is_available = True
-                    break
-        if not is_available:
-            return room_pb2.ReserveSeatsResponse(
-                status=f"Seat x:{seat.pos_x} - y:{seat.pos_y} is not available"
+        if rejections:
+            return get_reserve_seats_rejected_response(rejections)
+
+        if settings.reserve_fast_path:
+            seats, rejections = self.room_management.check_and_reverse_room_seats(
+                room=room, seats=seats, min_distance=settings.min_distance
             )
+            if rejections:
+                return get_reserve_seats_rejected_response(rejections)
+        else:
+            seats = self.room_management.reverse_room_seats(room=room, seats=seats)
 
-        seats = self.room_management.reverse_room_seats(
-            room=room, seats=[(seat.pos_x, seat.pos_y) for seat in request.seats]
-        )
-        return room_pb2.ReserveSeatsResponse(
-            seats=[
-                room_pb2.Seat(
-                    pos_x=seat[0],
-                    pos_y=seat[1],
-                )
-                for seat in seats
-            ]
-        )
+        return get_reserve_seats_response(seats)
 
     def CancelSeats(self, request, context):
         # Check if the room exists
@@ -154,27 +175,15 @@ class RoomService(room_pb2_grpc.RoomServiceServicer):
         if not request.seat_ids:
             return room_pb2.CancelSeatsResponse(status="Seat ids is empty")
 
-        list_seats: List[Seat] = []
         # Check seats in db
-        for seat_id in request.seat_ids:
-            seat = self.seat_management.get_seat_with_room_id(
-                seat_id, room_id=request.room_id
-            )
-            if not seat:
-                return room_pb2.CancelSeatsResponse(
-                    status=f"Seat id {seat_id} is not found"
-                )
-
-            # Check if seats are valid with the room
-            if seat.pos_x >= room.row:
-                return room_pb2.CancelSeatsResponse(
-                    status=f"Seat {seat} have pos_x is greater than row {room.row}"
-                )
-            if seat.pos_y >= room.col:
-                return room_pb2.CancelSeatsResponse(
-                    status=f"Seat {seat} have pos_y is greater than col {room.col}"
-                )
-            list_seats.append(seat)
+        list_seats, missing_seat_ids = self.seat_management.get_seats_with_room_id(
+            list(request.seat_ids), room_id=request.room_id
+        )
+        rejected_response = get_cancel_seats_rejected_response(
+            room, list_seats, missing_seat_ids
+        )
+        if rejected_response:
+            return rejected_response
 
-        self.room_management.cancel_room_seats(room=room, seats=list_seats)
-        return room_pb2.CancelSeatsResponse(status="Seats are canceled")
+        seats = self.room_management.cancel_room_seats(room=room, seats=list_seats)
+        return get_cancel_seats_response(seats)
@@ -22,6 +22,45 @@ class Settings(BaseSettings):
     redis_key_ttl: int = 600
 
     min_distance: int = 5
+    # Rooms with at least this ratio of taken seats use the summed-area table index
+    dense_seat_index_ratio: float = 0.1
+    # Rows per message of StreamAvailableSeats
+    available_seats_chunk_rows: int = 16
+    # Workers computing availability of many rooms in parallel
+    availability_worker_count: int = 4
+    # Run availability computation on threads or offload it to processes: thread | process
+    availability_executor: str = "thread"
+    # Rooms with at least row * col seats are offloaded in process mode
+    availability_offload_min_seats: int = 40000
+    # Decide reservations atomically on a Redis bitmap of the room instead of locks
+    reserve_fast_path: bool = False
+    # In-process cache in front of Redis, 0 entries disables it
+    local_cache_size: int = 10000
+    local_cache_ttl: int = 60
+    # Bound on the estimated bytes of the in-process cache, larger values are not kept
+    local_cache_max_bytes: int = 64 * 1024 * 1024
+    # Redis channel of the keys dropped from the in-process caches of every replica
+    local_cache_channel: str = "local_cache_invalidation"
+    # Format of cached values: binary | json, values of either format are readable
+    cache_codec: str = "binary"
+    # Lease of the replica computing a missing cache value, others poll the cache
+    single_flight_lease_ms: int = 2000
+    single_flight_poll_ms: int = 20
+    # Serve the value of the previous room version while another replica computes
+    serve_stale_while_revalidate: bool = False
+    # Recompute availability of rooms in the background after reserve and cancel
+    availability_refresh_enabled: bool = True
+    availability_refresh_debounce_ms: int = 200
+    # Most requested rooms warmed at startup, 0 disables counting requests
+    availability_warm_rooms: int = 20
+    # Reads of rooms are counted in process and added to room_requests this often
+    availability_requests_flush_ms: int = 1000
+    # gRPC server: thread | aio, aio serves RPCs as coroutines on one event loop
+    grpc_server: str = "thread"
+    # Connections of the asyncpg pool of the aio server
+    async_db_pool_size: int = 50
+    # In-flight RPCs of the aio server, more are rejected with RESOURCE_EXHAUSTED
+    async_max_concurrent_rpcs: int = 10000
 
 
 # Create a singleton instance of the settings to be used throughout the application
@@ -0,0 +1,59 @@
+from typing import Iterator, Tuple
+
+
+class SeatOccupancy:
+    """
+    Packed bitmap of the taken seats of a room
+    Seat (pos_x, pos_y) is bit pos_x * col + pos_y, most significant bit first,
+    the same layout as numpy.packbits and Redis bitmaps
+    """
+
+    __slots__ = ("row", "col", "bitmap", "_count")
+
+    def __init__(self, row: int, col: int):
+        self.row = row
+        self.col = col
+        self.bitmap = bytearray((row * col + 7) // 8)
+        self._count = 0
+
+    def _locate(self, pos_x: int, pos_y: int) -> Tuple[int, int]:
+        index = pos_x * self.col + pos_y
+        return index >> 3, 0x80 >> (index & 7)
+
+    def __contains__(self, position: Tuple[int, int]) -> bool:
+        byte_index, mask = self._locate(*position)
+        return bool(self.bitmap[byte_index] & mask)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        # Bits are in row-major order, so the positions come out sorted
+        for byte_index, byte in enumerate(self.bitmap):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (0x80 >> bit):
+                    yield divmod(byte_index * 8 + bit, self.col)
+
+    def add(self, pos_x: int, pos_y: int) -> bool:
+        """
+        Mark seat as taken, return False if it is already taken
+        """
+        byte_index, mask = self._locate(pos_x, pos_y)
+        if self.bitmap[byte_index] & mask:
+            return False
+        self.bitmap[byte_index] |= mask
+        self._count += 1
+        return True
+
+    def remove(self, pos_x: int, pos_y: int) -> bool:
+        """
+        Mark seat as free, return False if it is not taken
+        """
+        byte_index, mask = self._locate(pos_x, pos_y)
+        if not self.bitmap[byte_index] & mask:
+            return False
+        self.bitmap[byte_index] &= ~mask
+        self._count -= 1
+        return True
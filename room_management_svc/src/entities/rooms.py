@@ -1,10 +1,14 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 from typing_extensions import Annotated
 
-from src.entities.seats import Seat
+from src.entities.occupancy import SeatOccupancy
+from src.entities.seats import Seat, SeatRecord
+
+# Seats are models at the API boundary and records when read from storage
+SeatLike = Union[Seat, SeatRecord]
 
 
 class Room(BaseModel):
@@ -20,22 +24,29 @@ class Room(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
-    _seats: List[Seat] = []  # Use private variable to store seats
+    _seats: Dict[Tuple[int, int], SeatLike] = {}  # Index of seats by position
+    _occupancy: Optional[SeatOccupancy] = None  # Packed bitmap of taken seats
+
+    def model_post_init(self, __context: Any):
+        self._occupancy = SeatOccupancy(self.row, self.col)
 
     # Getter for seats
     @property
-    def seats(self) -> List[Seat]:
-        # Return sorted available seats base on pos_x
-        sorted_seats = self._seats.sort(key=lambda item: (item.pos_x, item.pos_y))
-        return sorted_seats if sorted_seats else self._seats
+    def seats(self) -> List[SeatLike]:
+        # Return sorted seats base on pos_x, pos_y, the bitmap is already sorted
+        return [self._seats[position] for position in self._occupancy]
+
+    @property
+    def occupancy(self) -> SeatOccupancy:
+        return self._occupancy
 
-    def validate_seat(self, seat: Seat):
+    def validate_seat(self, seat: SeatLike):
         if seat.pos_x >= self.row:
             raise ValueError(f"Seat {seat} have pos_x is greater than row {self.row}")
         if seat.pos_y >= self.col:
             raise ValueError(f"Seat {seat} have pos_y is greater than col {self.col}")
 
-    def add_seats(self, seats: List[Seat]):
+    def add_seats(self, seats: Sequence[SeatLike]):
         """
         Add seats to the room
         Args:
@@ -47,13 +58,15 @@ class Room(BaseModel):
 
         # Check seats is already in the room
         for seat in seats:
-            if seat in self._seats:
+            if (seat.pos_x, seat.pos_y) in self._occupancy:
                 raise ValueError(f"Seat {seat} is already in the room")
 
         # Add seats to the room and remove duplicates
-        self._seats += list(set(seats) - set(self._seats))
+        for seat in seats:
+            if self._occupancy.add(seat.pos_x, seat.pos_y):
+                self._seats[(seat.pos_x, seat.pos_y)] = seat
 
-    def remove_seats(self, seats: List[Seat]):
+    def remove_seats(self, seats: Sequence[SeatLike]):
         """
         Remove seats from the room
         Args:
@@ -65,8 +78,39 @@ class Room(BaseModel):
 
         # Check if seats are in the room
         for seat in seats:
-            if seat not in self._seats:
+            if (seat.pos_x, seat.pos_y) not in self._occupancy:
                 raise ValueError(f"Seat {seat} is not in the room")
 
         # Remove seats from the room and remove duplicates
-        self._seats = list(set(self._seats) - set(seats))
+        for seat in seats:
+            if self._occupancy.remove(seat.pos_x, seat.pos_y):
+                del self._seats[(seat.pos_x, seat.pos_y)]
+
+
+class RoomRecord:
+    """
+    Room read from the database or the cache, which is trusted so it is not
+    validated. Use cases which add seats get a Room from to_room()
+    """
+
+    __slots__ = ("id", "row", "col", "is_deleted")
+
+    def __init__(self, id: Optional[int], row: int, col: int, is_deleted: bool = False):
+        self.id = id
+        self.row = row
+        self.col = col
+        self.is_deleted = is_deleted
+
+    def to_room(self) -> Room:
+        return Room.model_construct(
+            id=self.id, row=self.row, col=self.col, is_deleted=self.is_deleted
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"id={self.id} row={self.row} col={self.col} is_deleted={self.is_deleted}"
+        )
+
+
+# Rooms are models in use cases and records when only read
+RoomLike = Union[Room, RoomRecord]
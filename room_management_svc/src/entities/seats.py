@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 from typing_extensions import Annotated
@@ -19,9 +19,44 @@ class Seat(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.now)
 
     def __eq__(self, other) -> bool:
-        if isinstance(other, Seat):
+        if isinstance(other, (Seat, SeatRecord)):
             return self.pos_x == other.pos_x and self.pos_y == other.pos_y
         return False
 
     def __hash__(self) -> int:
         return hash((self.pos_x, self.pos_y))
+
+
+class SeatRecord:
+    """
+    Seat read from the database or the cache, which is trusted so it is not
+    validated and has no timestamps. Seat is the model of the API boundary
+    """
+
+    __slots__ = ("id", "pos_x", "pos_y")
+
+    def __init__(self, id: Optional[int], pos_x: int, pos_y: int):
+        self.id = id
+        self.pos_x = pos_x
+        self.pos_y = pos_y
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Seat, SeatRecord)):
+            return self.pos_x == other.pos_x and self.pos_y == other.pos_y
+        return False
+
+    def __hash__(self) -> int:
+        return hash((self.pos_x, self.pos_y))
+
+    def __repr__(self) -> str:
+        return f"id={self.id} pos_x={self.pos_x} pos_y={self.pos_y}"
+
+
+class SeatRejection(NamedTuple):
+    """
+    Requested seat which can't be reserved and why
+    """
+
+    pos_x: int
+    pos_y: int
+    reason: str
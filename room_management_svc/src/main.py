@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from concurrent import futures
@@ -10,14 +11,27 @@ sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
 )
 
+from src.adapters.async_room_service import AsyncRoomService
 from src.adapters.room_service import RoomService
 from src.config import settings
 from src.protos_generated import room_pb2_grpc
+from src.repositories.async_db_connection import (
+    close_async_connection_pool,
+    open_async_connection_pool,
+)
+from src.services.local_cache import local_cache
 
 
-def main():
+def serve():
+    # Drop in-process cache entries invalidated by other replicas
+    local_cache.subscribe()
+
+    room_service = RoomService()
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=settings.worker_count))
-    room_pb2_grpc.add_RoomServiceServicer_to_server(RoomService(), server)
+    room_pb2_grpc.add_RoomServiceServicer_to_server(room_service, server)
+
+    # Warm the cache of the most requested rooms
+    room_service.room_management.warm_hot_rooms()
 
     server.add_insecure_port(f"{settings.grpc_host}:{settings.grpc_port}")
     logger.info(f"Server started at port {settings.grpc_port}")
@@ -26,5 +40,39 @@ def main():
     server.wait_for_termination()
 
 
+async def serve_async():
+    # Drop in-process cache entries invalidated by other replicas
+    local_cache.subscribe()
+    await open_async_connection_pool()
+
+    # Every RPC is a coroutine on the event loop
+    room_service = AsyncRoomService()
+    server = grpc.aio.server(
+        maximum_concurrent_rpcs=settings.async_max_concurrent_rpcs,
+    )
+    room_pb2_grpc.add_RoomServiceServicer_to_server(room_service, server)
+
+    # Warm the cache of the most requested rooms
+    await room_service.room_management.warm_hot_rooms()
+
+    server.add_insecure_port(f"{settings.grpc_host}:{settings.grpc_port}")
+    logger.info(f"Async server started at port {settings.grpc_port}")
+
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await close_async_connection_pool()
+
+
+def main():
+    if settings.grpc_server == "aio":
+        asyncio.run(serve_async())
+    elif settings.grpc_server == "thread":
+        serve()
+    else:
+        raise ValueError(f"gRPC server {settings.grpc_server} is not supported")
+
+
 if __name__ == "__main__":
     main()
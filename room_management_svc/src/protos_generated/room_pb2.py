@@ -16,7 +16,7 @@ _sym_db = _symbol_database.Default()
 from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
 
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n\nroom.proto\x12\x04room\x1a\x1bgoogle/protobuf/empty.proto",\n\x04Room\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0b\n\x03row\x18\x02 \x01(\x05\x12\x0b\n\x03\x63ol\x18\x03 \x01(\x05"N\n\x04Seat\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x12\n\x05pos_x\x18\x02 \x01(\x05H\x00\x88\x01\x01\x12\x12\n\x05pos_y\x18\x03 \x01(\x05H\x01\x88\x01\x01\x42\x08\n\x06_pos_xB\x08\n\x06_pos_y".\n\x11ListRoomsResponse\x12\x19\n\x05rooms\x18\x01 \x03(\x0b\x32\n.room.Room"\x1c\n\x0eGetRoomRequest\x12\n\n\x02id\x18\x01 \x01(\x05";\n\x0fGetRoomResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x18\n\x04room\x18\x02 \x01(\x0b\x32\n.room.Room"*\n\x0e\x41\x64\x64RoomRequest\x12\x0b\n\x03row\x18\x01 \x01(\x05\x12\x0b\n\x03\x63ol\x18\x02 \x01(\x05"-\n\x0f\x41\x64\x64RoomResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\x05"\x1f\n\x11RemoveRoomRequest\x12\n\n\x02id\x18\x01 \x01(\x05"$\n\x12RemoveRoomResponse\x12\x0e\n\x06status\x18\x01 \x01(\t"+\n\x18GetAvailableSeatsRequest\x12\x0f\n\x07room_id\x18\x01 \x01(\x05"F\n\x19GetAvailableSeatsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x19\n\x05seats\x18\x02 \x03(\x0b\x32\n.room.Seat"A\n\x13ReserveSeatsRequest\x12\x0f\n\x07room_id\x18\x01 \x01(\x05\x12\x19\n\x05seats\x18\x02 \x03(\x0b\x32\n.room.Seat"A\n\x14ReserveSeatsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x19\n\x05seats\x18\x02 \x03(\x0b\x32\n.room.Seat"7\n\x12\x43\x61ncelSeatsRequest\x12\x0f\n\x07room_id\x18\x01 \x01(\x05\x12\x10\n\x08seat_ids\x18\x02 \x03(\x05"%\n\x13\x43\x61ncelSeatsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t"\'\n\x14ListRoomSeatsRequest\x12\x0f\n\x07room_id\x18\x01 \x01(\x05"B\n\x15ListRoomSeatsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x19\n\x05seats\x18\x02 \x03(\x0b\x32\n.room.Seat2\xa7\x04\n\x0bRoomService\x12\x36\n\x07\x41\x64\x64Room\x12\x14.room.AddRoomRequest\x1a\x15.room.AddRoomResponse\x12?\n\nRemoveRoom\x12\x17.room.RemoveRoomRequest\x1a\x18.room.RemoveRoomResponse\x12<\n\tListRooms\x12\x16.google.protobuf.Empty\x1a\x17.room.ListRoomsResponse\x12\x36\n\x07GetRoom\x12\x14.room.GetRoomRequest\x1a\x15.room.GetRoomResponse\x12T\n\x11GetAvailableSeats\x12\x1e.room.GetAvailableSeatsRequest\x1a\x1f.room.GetAvailableSeatsResponse\x12\x45\n\x0cReserveSeats\x12\x19.room.ReserveSeatsRequest\x1a\x1a.room.ReserveSeatsResponse\x12\x42\n\x0b\x43\x61ncelSeats\x12\x18.room.CancelSeatsRequest\x1a\x19.room.CancelSeatsResponse\x12H\n\rListRoomSeats\x12\x1a.room.ListRoomSeatsRequest\x1a\x1b.room.ListRoomSeatsResponseB\x07Z\x05../pbb\x06proto3'
+    b'\n\nroom.proto\x12\x04room\x1a\x1bgoogle/protobuf/empty.proto",\n\x04Room\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0b\n\x03row\x18\x02 \x01(\x05\x12\x0b\n\x03\x63ol\x18\x03 \x01(\x05"N\n\x04Seat\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x12\n\x05pos_x\x18\x02 \x01(\x05H\x00\x88\x01\x01\x12\x12\n\x05pos_y\x18\x03 \x01(\x05H\x01\x88\x01\x01\x42\x08\n\x06_pos_xB\x08\n\x06_pos_y".\n\x11ListRoomsResponse\x12\x19\n\x05rooms\x18\x01 \x03(\x0b\x32\n.room.Room"\x1c\n\x0eGetRoomRequest\x12\n\n\x02id\x18\x01 \x01(\x05";\n\x0fGetRoomResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x18\n\x04room\x18\x02 \x01(\x0b\x32\n.room.Room"*\n\x0e\x41\x64\x64RoomRequest\x12\x0b\n\x03row\x18\x01 \x01(\x05\x12\x0b\n\x03\x63ol\x18\x02 \x01(\x05"-\n\x0f\x41\x64\x64RoomResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\x05"\x1f\n\x11RemoveRoomRequest\x12\n\n\x02id\x18\x01 \x01(\x05"$\n\x12RemoveRoomResponse\x12\x0e\n\x06status\x18\x01 \x01(\t"?\n\x0cSeatInterval\x12\x0b\n\x03row\x18\x01 \x01(\x05\x12\x11\n\tstart_col\x18\x02 \x01(\x05\x12\x0f\n\x07\x65nd_col\x18\x03 \x01(\x05"R\n\x08SeatRect\x12\x11\n\trow_start\x18\x01 \x01(\x05\x12\x0f\n\x07row_end\x18\x02 \x01(\x05\x12\x11\n\tcol_start\x18\x03 \x01(\x05\x12\x0f\n\x07\x63ol_end\x18\x04 \x01(\x05"u\n\x18GetAvailableSeatsRequest\x12\x0f\n\x07room_id\x18\x01 \x01(\x05\x12\x14\n\x0c\x61s_intervals\x18\x02 \x01(\x08\x12%\n\x08viewport\x18\x03 \x01(\x0b\x32\x0e.room.SeatRectH\x00\x88\x01\x01\x42\x0b\n\t_viewport"m\n\x19GetAvailableSeatsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x19\n\x05seats\x18\x02 \x03(\x0b\x32\n.room.Seat\x12%\n\tintervals\x18\x03 \x03(\x0b\x32\x12.room.SeatInterval"g\n\x16GetAvailableSeatsChunk\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x11\n\trow_start\x18\x02 \x01(\x05\x12\x0f\n\x07row_end\x18\x03 \x01(\x05\x12\x19\n\x05seats\x18\x04 \x03(\x0b\x32\n.room.Seat"1\n\x1dGetAvailableSeatsBatchRequest\x12\x10\n\x08room_ids\x18\x01 \x03(\x05"P\n\x12RoomAvailableSeats\x12\x0f\n\x07room_id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x19\n\x05seats\x18\x03 \x03(\x0b\x32\n.room.Seat"I\n\x1eGetAvailableSeatsBatchResponse\x12\'\n\x05rooms\x18\x01 \x03(\x0b\x32\x18.room.RoomAvailableSeats"-\n\x1a\x43ountAvailableSeatsRequest\x12\x0f\n\x07room_id\x18\x01 \x01(\x05"<\n\x1b\x43ountAvailableSeatsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05"i\n\x15GetCacheStatsResponse\x12\x0c\n\x04hits\x18\x01 \x01(\x03\x12\x0e\n\x06misses\x18\x02 \x01(\x03\x12\x11\n\tevictions\x18\x03 \x01(\x03\x12\x0c\n\x04size\x18\x04 \x01(\x03\x12\x11\n\thit_ratio\x18\x05 \x01(\x01"A\n\x13ReserveSeatsRequest\x12\x0f\n\x07room_id\x18\x01 \x01(\x05\x12\x19\n\x05seats\x18\x02 \x03(\x0b\x32\n.room.Seat"9\n\rSeatRejection\x12\x18\n\x04seat\x18\x01 \x01(\x0b\x32\n.room.Seat\x12\x0e\n\x06reason\x18\x02 \x01(\t"n\n\x14ReserveSeatsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x19\n\x05seats\x18\x02 \x03(\x0b\x32\n.room.Seat\x12+\n\x0erejected_seats\x18\x03 \x03(\x0b\x32\x13.room.SeatRejection"7\n\x12\x43\x61ncelSeatsRequest\x12\x0f\n\x07room_id\x18\x01 \x01(\x05\x12\x10\n\x08seat_ids\x18\x02 \x03(\x05"@\n\x13\x43\x61ncelSeatsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x19\n\x05seats\x18\x02 \x03(\x0b\x32\n.room.Seat"\'\n\x14ListRoomSeatsRequest\x12\x0f\n\x07room_id\x18\x01 \x01(\x05"B\n\x15ListRoomSeatsResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x19\n\x05seats\x18\x02 \x03(\x0b\x32\n.room.Seat2\x86\x07\n\x0bRoomService\x12\x36\n\x07\x41\x64\x64Room\x12\x14.room.AddRoomRequest\x1a\x15.room.AddRoomResponse\x12?\n\nRemoveRoom\x12\x17.room.RemoveRoomRequest\x1a\x18.room.RemoveRoomResponse\x12<\n\tListRooms\x12\x16.google.protobuf.Empty\x1a\x17.room.ListRoomsResponse\x12\x36\n\x07GetRoom\x12\x14.room.GetRoomRequest\x1a\x15.room.GetRoomResponse\x12T\n\x11GetAvailableSeats\x12\x1e.room.GetAvailableSeatsRequest\x1a\x1f.room.GetAvailableSeatsResponse\x12V\n\x14StreamAvailableSeats\x12\x1e.room.GetAvailableSeatsRequest\x1a\x1c.room.GetAvailableSeatsChunk0\x01\x12\x63\n\x16GetAvailableSeatsBatch\x12#.room.GetAvailableSeatsBatchRequest\x1a$.room.GetAvailableSeatsBatchResponse\x12Z\n\x13\x43ountAvailableSeats\x12 .room.CountAvailableSeatsRequest\x1a!.room.CountAvailableSeatsResponse\x12\x44\n\rGetCacheStats\x12\x16.google.protobuf.Empty\x1a\x1b.room.GetCacheStatsResponse\x12\x45\n\x0cReserveSeats\x12\x19.room.ReserveSeatsRequest\x1a\x1a.room.ReserveSeatsResponse\x12\x42\n\x0b\x43\x61ncelSeats\x12\x18.room.CancelSeatsRequest\x1a\x19.room.CancelSeatsResponse\x12H\n\rListRoomSeats\x12\x1a.room.ListRoomSeatsRequest\x1a\x1b.room.ListRoomSeatsResponseB\x07Z\x05../pbb\x06proto3'
 )
 
 _globals = globals()
@@ -43,22 +43,42 @@ if not _descriptor._USE_C_DESCRIPTORS:
     _globals["_REMOVEROOMREQUEST"]._serialized_end = 436
     _globals["_REMOVEROOMRESPONSE"]._serialized_start = 438
     _globals["_REMOVEROOMRESPONSE"]._serialized_end = 474
-    _globals["_GETAVAILABLESEATSREQUEST"]._serialized_start = 476
-    _globals["_GETAVAILABLESEATSREQUEST"]._serialized_end = 519
-    _globals["_GETAVAILABLESEATSRESPONSE"]._serialized_start = 521
-    _globals["_GETAVAILABLESEATSRESPONSE"]._serialized_end = 591
-    _globals["_RESERVESEATSREQUEST"]._serialized_start = 593
-    _globals["_RESERVESEATSREQUEST"]._serialized_end = 658
-    _globals["_RESERVESEATSRESPONSE"]._serialized_start = 660
-    _globals["_RESERVESEATSRESPONSE"]._serialized_end = 725
-    _globals["_CANCELSEATSREQUEST"]._serialized_start = 727
-    _globals["_CANCELSEATSREQUEST"]._serialized_end = 782
-    _globals["_CANCELSEATSRESPONSE"]._serialized_start = 784
-    _globals["_CANCELSEATSRESPONSE"]._serialized_end = 821
-    _globals["_LISTROOMSEATSREQUEST"]._serialized_start = 823
-    _globals["_LISTROOMSEATSREQUEST"]._serialized_end = 862
-    _globals["_LISTROOMSEATSRESPONSE"]._serialized_start = 864
-    _globals["_LISTROOMSEATSRESPONSE"]._serialized_end = 930
-    _globals["_ROOMSERVICE"]._serialized_start = 933
-    _globals["_ROOMSERVICE"]._serialized_end = 1484
+    _globals["_SEATINTERVAL"]._serialized_start = 476
+    _globals["_SEATINTERVAL"]._serialized_end = 539
+    _globals["_SEATRECT"]._serialized_start = 541
+    _globals["_SEATRECT"]._serialized_end = 623
+    _globals["_GETAVAILABLESEATSREQUEST"]._serialized_start = 625
+    _globals["_GETAVAILABLESEATSREQUEST"]._serialized_end = 742
+    _globals["_GETAVAILABLESEATSRESPONSE"]._serialized_start = 744
+    _globals["_GETAVAILABLESEATSRESPONSE"]._serialized_end = 853
+    _globals["_GETAVAILABLESEATSCHUNK"]._serialized_start = 855
+    _globals["_GETAVAILABLESEATSCHUNK"]._serialized_end = 958
+    _globals["_GETAVAILABLESEATSBATCHREQUEST"]._serialized_start = 960
+    _globals["_GETAVAILABLESEATSBATCHREQUEST"]._serialized_end = 1009
+    _globals["_ROOMAVAILABLESEATS"]._serialized_start = 1011
+    _globals["_ROOMAVAILABLESEATS"]._serialized_end = 1091
+    _globals["_GETAVAILABLESEATSBATCHRESPONSE"]._serialized_start = 1093
+    _globals["_GETAVAILABLESEATSBATCHRESPONSE"]._serialized_end = 1166
+    _globals["_COUNTAVAILABLESEATSREQUEST"]._serialized_start = 1168
+    _globals["_COUNTAVAILABLESEATSREQUEST"]._serialized_end = 1213
+    _globals["_COUNTAVAILABLESEATSRESPONSE"]._serialized_start = 1215
+    _globals["_COUNTAVAILABLESEATSRESPONSE"]._serialized_end = 1275
+    _globals["_GETCACHESTATSRESPONSE"]._serialized_start = 1277
+    _globals["_GETCACHESTATSRESPONSE"]._serialized_end = 1382
+    _globals["_RESERVESEATSREQUEST"]._serialized_start = 1384
+    _globals["_RESERVESEATSREQUEST"]._serialized_end = 1449
+    _globals["_SEATREJECTION"]._serialized_start = 1451
+    _globals["_SEATREJECTION"]._serialized_end = 1508
+    _globals["_RESERVESEATSRESPONSE"]._serialized_start = 1510
+    _globals["_RESERVESEATSRESPONSE"]._serialized_end = 1620
+    _globals["_CANCELSEATSREQUEST"]._serialized_start = 1622
+    _globals["_CANCELSEATSREQUEST"]._serialized_end = 1677
+    _globals["_CANCELSEATSRESPONSE"]._serialized_start = 1679
+    _globals["_CANCELSEATSRESPONSE"]._serialized_end = 1743
+    _globals["_LISTROOMSEATSREQUEST"]._serialized_start = 1745
+    _globals["_LISTROOMSEATSREQUEST"]._serialized_end = 1784
+    _globals["_LISTROOMSEATSRESPONSE"]._serialized_start = 1786
+    _globals["_LISTROOMSEATSRESPONSE"]._serialized_end = 1852
+    _globals["_ROOMSERVICE"]._serialized_start = 1855
+    _globals["_ROOMSERVICE"]._serialized_end = 2757
 # @@protoc_insertion_point(module_scope)
@@ -74,6 +74,30 @@ class RoomServiceStub(object):
             response_deserializer=room__pb2.GetAvailableSeatsResponse.FromString,
             _registered_method=True,
         )
+        self.StreamAvailableSeats = channel.unary_stream(
+            "/room.RoomService/StreamAvailableSeats",
+            request_serializer=room__pb2.GetAvailableSeatsRequest.SerializeToString,
+            response_deserializer=room__pb2.GetAvailableSeatsChunk.FromString,
+            _registered_method=True,
+        )
+        self.GetAvailableSeatsBatch = channel.unary_unary(
+            "/room.RoomService/GetAvailableSeatsBatch",
+            request_serializer=room__pb2.GetAvailableSeatsBatchRequest.SerializeToString,
+            response_deserializer=room__pb2.GetAvailableSeatsBatchResponse.FromString,
+            _registered_method=True,
+        )
+        self.CountAvailableSeats = channel.unary_unary(
+            "/room.RoomService/CountAvailableSeats",
+            request_serializer=room__pb2.CountAvailableSeatsRequest.SerializeToString,
+            response_deserializer=room__pb2.CountAvailableSeatsResponse.FromString,
+            _registered_method=True,
+        )
+        self.GetCacheStats = channel.unary_unary(
+            "/room.RoomService/GetCacheStats",
+            request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            response_deserializer=room__pb2.GetCacheStatsResponse.FromString,
+            _registered_method=True,
+        )
         self.ReserveSeats = channel.unary_unary(
             "/room.RoomService/ReserveSeats",
             request_serializer=room__pb2.ReserveSeatsRequest.SerializeToString,
@@ -127,6 +151,30 @@ class RoomServiceServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def StreamAvailableSeats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def GetAvailableSeatsBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def CountAvailableSeats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def GetCacheStats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def ReserveSeats(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -173,6 +221,26 @@ def add_RoomServiceServicer_to_server(servicer, server):
             request_deserializer=room__pb2.GetAvailableSeatsRequest.FromString,
             response_serializer=room__pb2.GetAvailableSeatsResponse.SerializeToString,
         ),
+        "StreamAvailableSeats": grpc.unary_stream_rpc_method_handler(
+            servicer.StreamAvailableSeats,
+            request_deserializer=room__pb2.GetAvailableSeatsRequest.FromString,
+            response_serializer=room__pb2.GetAvailableSeatsChunk.SerializeToString,
+        ),
+        "GetAvailableSeatsBatch": grpc.unary_unary_rpc_method_handler(
+            servicer.GetAvailableSeatsBatch,
+            request_deserializer=room__pb2.GetAvailableSeatsBatchRequest.FromString,
+            response_serializer=room__pb2.GetAvailableSeatsBatchResponse.SerializeToString,
+        ),
+        "CountAvailableSeats": grpc.unary_unary_rpc_method_handler(
+            servicer.CountAvailableSeats,
+            request_deserializer=room__pb2.CountAvailableSeatsRequest.FromString,
+            response_serializer=room__pb2.CountAvailableSeatsResponse.SerializeToString,
+        ),
+        "GetCacheStats": grpc.unary_unary_rpc_method_handler(
+            servicer.GetCacheStats,
+            request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+            response_serializer=room__pb2.GetCacheStatsResponse.SerializeToString,
+        ),
         "ReserveSeats": grpc.unary_unary_rpc_method_handler(
             servicer.ReserveSeats,
             request_deserializer=room__pb2.ReserveSeatsRequest.FromString,
@@ -350,6 +418,126 @@ class RoomService(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def StreamAvailableSeats(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/room.RoomService/StreamAvailableSeats",
+            room__pb2.GetAvailableSeatsRequest.SerializeToString,
+            room__pb2.GetAvailableSeatsChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def GetAvailableSeatsBatch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/room.RoomService/GetAvailableSeatsBatch",
+            room__pb2.GetAvailableSeatsBatchRequest.SerializeToString,
+            room__pb2.GetAvailableSeatsBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def CountAvailableSeats(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/room.RoomService/CountAvailableSeats",
+            room__pb2.CountAvailableSeatsRequest.SerializeToString,
+            room__pb2.CountAvailableSeatsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def GetCacheStats(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/room.RoomService/GetCacheStats",
+            google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            room__pb2.GetCacheStatsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def ReserveSeats(
         request,
@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.entities.rooms import Room
+from src.repositories.availability_repository import BaseAvailabilityRepository
+from src.repositories.cache_keys import get_blocked_counts_key, get_occupancy_key
+from src.services.async_redis_client import AsyncRedisClient
+
+
+class AsyncAvailabilityRepository(BaseAvailabilityRepository):
+    """
+    Coroutine counterpart of AvailabilityRepository, same keys and scripts
+    so the thread and aio servers update the same state
+    """
+
+    def __init__(self):
+        super().__init__(AsyncRedisClient())
+
+    async def get_blocked_counts(
+        self, room: Room, min_distance: int, version: Optional[int] = None
+    ) -> Optional[np.ndarray]:
+        return (
+            await self.get_many_blocked_counts(
+                rooms=[room],
+                min_distance=min_distance,
+                versions=None if version is None else {room.id: version},
+            )
+        ).get(room.id)
+
+    async def get_many_blocked_counts(
+        self,
+        rooms: List[Room],
+        min_distance: int,
+        versions: Optional[Dict[int, int]] = None,
+    ) -> Dict[int, np.ndarray]:
+        blocked_counts = self.get_local_blocked_counts(rooms, min_distance, versions)
+        redis_rooms = [room for room in rooms if room.id not in blocked_counts]
+        blocked_counts.update(
+            self.decode_blocked_counts(
+                redis_rooms,
+                min_distance,
+                await self.redis_client.mget(
+                    [
+                        get_blocked_counts_key(room.id, min_distance)
+                        for room in redis_rooms
+                    ]
+                ),
+                versions,
+            )
+        )
+        return blocked_counts
+
+    async def set_blocked_counts(
+        self, room: Room, min_distance: int, counts: np.ndarray, version: int
+    ):
+        await self.set_many_blocked_counts(
+            rooms=[room],
+            min_distance=min_distance,
+            counts={room.id: counts},
+            versions={room.id: version},
+        )
+
+    async def set_many_blocked_counts(
+        self,
+        rooms: List[Room],
+        min_distance: int,
+        counts: Dict[int, np.ndarray],
+        versions: Dict[int, int],
+    ):
+        self.set_local_blocked_counts(min_distance, counts, versions)
+        call = self.get_set_blocked_counts_call(rooms, min_distance, counts, versions)
+        if call is not None:
+            await self.set_if_room_version_script(keys=call.keys, args=call.args)
+
+    async def update_blocked_counts(
+        self,
+        room: Room,
+        min_distance: int,
+        seats: List[Tuple[int, int]],
+        taken: bool,
+        radius: int,
+        deleted_keys: Optional[List[str]] = None,
+    ) -> bool:
+        call = self.get_update_blocked_counts_call(
+            room, min_distance, seats, taken, radius, deleted_keys
+        )
+        return bool(
+            await self.update_blocked_counts_script(keys=call.keys, args=call.args)
+        )
+
+    async def set_occupancy(self, room: Room, version: int):
+        call = self.get_set_occupancy_call(room, version)
+        await self.set_if_room_version_script(keys=call.keys, args=call.args)
+
+    async def delete_occupancy(self, room: Room):
+        await self.redis_client.delete(get_occupancy_key(room.id))
+
+    async def check_and_reserve(
+        self, room: Room, seats: List[Tuple[int, int]], radius: int
+    ) -> Optional[List[Tuple[int, int]]]:
+        call = self.get_check_and_reserve_call(room, seats, radius)
+        return self.decode_rejected_seats(
+            await self.check_and_reserve_script(keys=call.keys, args=call.args)
+        )
+
+    async def set_occupancy_bits(
+        self, room: Room, seats: List[Tuple[int, int]], taken: bool
+    ) -> bool:
+        if not seats:
+            return True
+
+        call = self.get_set_occupancy_bits_call(room, seats, taken)
+        return bool(
+            await self.set_occupancy_bits_script(keys=call.keys, args=call.args)
+        )
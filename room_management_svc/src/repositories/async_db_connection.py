@@ -0,0 +1,40 @@
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Optional
+
+import asyncpg
+
+from src.config import settings
+
+connection_pool: Optional[asyncpg.Pool] = None
+
+
+async def open_async_connection_pool() -> asyncpg.Pool:
+    """Create the pool on the running event loop, it is bound to that loop."""
+    global connection_pool
+    if connection_pool is None:
+        connection_pool = await asyncpg.create_pool(
+            min_size=1,
+            max_size=settings.async_db_pool_size,
+            database=settings.db_name,
+            user=settings.db_user,
+            password=settings.db_password,
+            host=settings.db_host,
+            port=settings.db_port,
+        )
+    return connection_pool
+
+
+@asynccontextmanager
+async def get_async_db_connection() -> AsyncGenerator[asyncpg.Connection, None]:
+    """Yield a connection from the pool and return it when done."""
+    pool = await open_async_connection_pool()
+    async with pool.acquire() as conn:
+        yield conn
+
+
+async def close_async_connection_pool() -> None:
+    """Function to close the connection pool."""
+    global connection_pool
+    if connection_pool is not None:
+        await connection_pool.close()
+        connection_pool = None
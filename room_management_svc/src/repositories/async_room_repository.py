@@ -0,0 +1,128 @@
+from typing import Dict, List, Optional
+
+from src.config import settings
+from src.entities.rooms import Room, RoomRecord
+from src.repositories.async_db_connection import get_async_db_connection
+from src.repositories.cache_keys import ROOMS_KEY, get_room_key
+from src.repositories.room_repository import BaseRoomRepository
+from src.services.async_redis_client import AsyncRedisClient
+from src.services.local_cache import local_cache
+
+
+class AsyncRoomRepository(BaseRoomRepository):
+    """
+    Coroutine counterpart of RoomRepository, same queries and cache keys
+    """
+
+    def __init__(self):
+        super().__init__(AsyncRedisClient())
+
+    async def add_room(self, row: int, col: int) -> Optional[Room]:
+        # Invalidate cache when a new room is added
+        await self.redis_client.delete(ROOMS_KEY)
+        await local_cache.invalidate_async([ROOMS_KEY], self.redis_client)
+
+        async with get_async_db_connection() as conn:
+            room_data = await conn.fetchrow(
+                "INSERT INTO room (row, col) VALUES ($1, $2) RETURNING id, row, col, is_deleted",
+                row,
+                col,
+            )
+        if not room_data:
+            return None
+        return Room(
+            id=room_data["id"],
+            row=room_data["row"],
+            col=room_data["col"],
+            is_deleted=room_data["is_deleted"],
+        )
+
+    async def remove_room(self, room_id: int):
+        # Invalidate cache when a room is removed
+        redis_keys, local_keys = self.get_removed_keys(room_id)
+        await self.redis_client.delete(*redis_keys)
+        await local_cache.invalidate_async(local_keys, self.redis_client)
+
+        async with get_async_db_connection() as conn:
+            await conn.execute(
+                "UPDATE room SET is_deleted = TRUE WHERE id = $1", room_id
+            )
+
+    async def list_rooms(self) -> List[RoomRecord]:
+        # Records are kept in process, every caller gets its own list
+        cached_records = local_cache.get(ROOMS_KEY)
+        if cached_records is not None:
+            return list(cached_records)
+
+        # Check if the result is cached
+        epoch = local_cache.get_epoch()
+        rooms = self.decode_rooms(await self.redis_client.get(ROOMS_KEY), epoch)
+        if rooms is not None:
+            return rooms
+
+        async with get_async_db_connection() as conn:
+            rooms_data = await conn.fetch(
+                "SELECT id, row, col, is_deleted FROM room WHERE is_deleted = FALSE"
+            )
+        rooms, cached_rooms = self.get_rooms_from_rows(rooms_data, epoch)
+
+        # Cache the result
+        await self.redis_client.set(ROOMS_KEY, cached_rooms, ex=settings.redis_key_ttl)
+        return rooms
+
+    async def get_room_record(self, room_id: int) -> Optional[RoomRecord]:
+        return (await self.get_room_records([room_id])).get(room_id)
+
+    async def get_room_records(self, room_ids: List[int]) -> Dict[int, RoomRecord]:
+        """
+        Get many room records with one MGET and one query for the cache misses
+        """
+        # Try to get rooms from the process, then from cache
+        room_ids = list(dict.fromkeys(room_ids))
+        records = self.get_local_room_records(room_ids)
+
+        epoch = local_cache.get_epoch()
+        redis_room_ids = [room_id for room_id in room_ids if room_id not in records]
+        if redis_room_ids:
+            records.update(
+                self.decode_room_records(
+                    redis_room_ids,
+                    await self.redis_client.mget(
+                        [get_room_key(room_id) for room_id in redis_room_ids]
+                    ),
+                    epoch,
+                )
+            )
+
+        missing_room_ids = [room_id for room_id in room_ids if room_id not in records]
+        if missing_room_ids:
+            async with get_async_db_connection() as conn:
+                rooms_data = await conn.fetch(
+                    "SELECT id, row, col, is_deleted FROM room WHERE id = ANY($1::int[]) AND is_deleted = FALSE",
+                    missing_room_ids,
+                )
+            missing_records, cached_rooms = self.get_room_records_from_rows(
+                rooms_data, epoch
+            )
+
+            # Cache the result
+            await self.redis_client.set_many(cached_rooms, ex=settings.redis_key_ttl)
+            records.update(missing_records)
+
+        return records
+
+    async def get_room(self, room_id: int) -> Optional[Room]:
+        # Every caller gets its own Room since use cases add seats to it
+        room = await self.get_room_record(room_id)
+        return room.to_room() if room else None
+
+    async def get_rooms(self, room_ids: List[int]) -> Dict[int, Room]:
+        """
+        Get many rooms with one MGET and one query for the cache misses
+        Args:
+            room_ids: Room ids, missing or deleted rooms are left out
+        """
+        return {
+            room_id: record.to_room()
+            for room_id, record in (await self.get_room_records(room_ids)).items()
+        }
@@ -0,0 +1,221 @@
+from typing import Dict, List, Optional, Tuple
+
+from src.config import settings
+from src.entities.rooms import SeatLike
+from src.entities.seats import SeatRecord
+from src.repositories.async_db_connection import get_async_db_connection
+from src.repositories.cache_keys import get_room_version_key, get_seat_key
+from src.repositories.seat_repository import BaseSeatRepository
+from src.services.async_redis_client import AsyncRedisClient
+from src.services.local_cache import local_cache
+
+
+class AsyncSeatRepository(BaseSeatRepository):
+    """
+    Coroutine counterpart of SeatRepository, same queries, cache keys and
+    versions so the thread and aio servers can run side by side
+    """
+
+    def __init__(self):
+        super().__init__(AsyncRedisClient())
+
+    async def get_room_version(self, room_id: int) -> int:
+        return (await self.get_room_versions([room_id]))[room_id]
+
+    async def get_room_versions(self, room_ids: List[int]) -> Dict[int, int]:
+        versions = self.get_local_room_versions(room_ids)
+        missing_room_ids = [room_id for room_id in room_ids if room_id not in versions]
+        if not missing_room_ids:
+            return versions
+
+        epoch = local_cache.get_epoch()
+        missing_versions = dict(
+            zip(
+                missing_room_ids,
+                await self.redis_client.get_versions(
+                    [get_room_version_key(room_id) for room_id in missing_room_ids]
+                ),
+            )
+        )
+        self.set_local_room_versions(missing_versions, epoch)
+        return {**versions, **missing_versions}
+
+    async def invalidate_room(self, room_id: int, seat_ids: Optional[List[int]] = None):
+        # The version is bumped with the blocked counts, see SeatRepository
+        seat_keys = self.get_seat_keys(room_id, seat_ids)
+        if seat_keys:
+            await self.redis_client.delete(*seat_keys)
+        await local_cache.invalidate_async(
+            [get_room_version_key(room_id)], self.redis_client
+        )
+
+    async def list_seats_by_room_id(
+        self, room_id: int, version: Optional[int] = None
+    ) -> List[SeatRecord]:
+        """
+        List seats of the room, read at the given room version or a later one
+        """
+        return (
+            await self.list_seats_by_room_ids(
+                [room_id], versions=None if version is None else {room_id: version}
+            )
+        )[room_id]
+
+    async def list_seats_by_room_ids(
+        self, room_ids: List[int], versions: Optional[Dict[int, int]] = None
+    ) -> Dict[int, List[SeatRecord]]:
+        """
+        List seats of many rooms with one MGET and one query for the cache misses
+        """
+        room_ids = list(dict.fromkeys(room_ids))
+        if versions is None:
+            versions = await self.get_room_versions(room_ids)
+
+        # Check if the result is cached in process, then in Redis
+        room_seats = self.get_local_room_seats(room_ids, versions)
+        redis_room_ids = [room_id for room_id in room_ids if room_id not in room_seats]
+        room_seats.update(
+            self.decode_room_seats(
+                redis_room_ids,
+                versions,
+                await self.redis_client.mget(
+                    self.get_room_seats_keys(redis_room_ids, versions)
+                ),
+            )
+        )
+
+        missing_room_ids = [
+            room_id for room_id in room_ids if room_id not in room_seats
+        ]
+        if not missing_room_ids:
+            return room_seats
+
+        async with get_async_db_connection() as conn:
+            seats_data = await conn.fetch(
+                "SELECT room_id, id, pos_x, pos_y FROM seat WHERE room_id = ANY($1::int[])",
+                missing_room_ids,
+            )
+        missing_room_seats = self.get_room_seats_from_rows(missing_room_ids, seats_data)
+
+        # Cache the result
+        await self.redis_client.set_many(
+            self.encode_room_seats(missing_room_seats, versions),
+            ex=settings.redis_key_ttl,
+        )
+        self.set_local_room_seats(missing_room_seats, versions)
+        return {**room_seats, **missing_room_seats}
+
+    async def list_seats_in_rect(
+        self,
+        room_id: int,
+        row_start: int,
+        row_end: int,
+        col_start: int,
+        col_end: int,
+    ) -> List[Tuple[int, int]]:
+        """
+        Positions of the seats of a rectangle of the room, see
+        SeatRepository.list_seats_in_rect
+        """
+        async with get_async_db_connection() as conn:
+            seats_data = await conn.fetch(
+                "SELECT pos_x, pos_y FROM seat WHERE room_id = $1 "
+                "AND pos_x >= $2 AND pos_x < $3 AND pos_y >= $4 AND pos_y < $5",
+                room_id,
+                row_start,
+                row_end,
+                col_start,
+                col_end,
+            )
+        return [(seat_data[0], seat_data[1]) for seat_data in seats_data]
+
+    async def reverse_seats(
+        self, room_id: int, seats: List[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        """
+        Insert the seats with one statement, taken seats are skipped
+        Returns:
+            The inserted seats, in the order they were given
+        """
+        seats = list(dict.fromkeys(seats))
+        if not seats:
+            return []
+
+        async with get_async_db_connection() as conn:
+            rows = await conn.fetch(
+                "INSERT INTO seat (room_id, pos_x, pos_y) "
+                "SELECT $1, pos_x, pos_y FROM unnest($2::int[], $3::int[]) AS t(pos_x, pos_y) "
+                "ON CONFLICT DO NOTHING RETURNING pos_x, pos_y",
+                room_id,
+                [seat[0] for seat in seats],
+                [seat[1] for seat in seats],
+            )
+        inserted_seats = {(row["pos_x"], row["pos_y"]) for row in rows}
+
+        # The caller invalidates the room after its in-place updates
+        return [seat for seat in seats if seat in inserted_seats]
+
+    async def cancel_seats(
+        self, room_id: int, seats: List[SeatLike]
+    ) -> List[Tuple[int, int]]:
+        """
+        Delete the seats with one statement, the rows are locked by the delete
+        Returns:
+            The deleted seats, in the order they were given
+        """
+        positions = list(dict.fromkeys((seat.pos_x, seat.pos_y) for seat in seats))
+        if not positions:
+            return []
+
+        async with get_async_db_connection() as conn:
+            rows = await conn.fetch(
+                "DELETE FROM seat WHERE room_id = $1 AND (pos_x, pos_y) IN "
+                "(SELECT * FROM unnest($2::int[], $3::int[])) RETURNING id, pos_x, pos_y",
+                room_id,
+                [position[0] for position in positions],
+                [position[1] for position in positions],
+            )
+        deleted_seats = {(row["pos_x"], row["pos_y"]): row["id"] for row in rows}
+
+        # The caller invalidates the room and the seats after its in-place updates
+        return [position for position in positions if position in deleted_seats]
+
+    async def get_seats_with_room_id(
+        self, seat_ids: List[int], room_id: int
+    ) -> Tuple[List[SeatRecord], List[int]]:
+        """
+        Get seats of a room with one MGET and one query for the cache misses
+        Returns:
+            The seats found, in the order of the ids, and the ids which are not
+            seats of the room
+        """
+        seat_ids = list(dict.fromkeys(seat_ids))
+
+        # Try to get seats from cache
+        seats = self.decode_seats(
+            seat_ids,
+            await self.redis_client.mget(
+                [get_seat_key(room_id, seat_id) for seat_id in seat_ids]
+            ),
+        )
+
+        missing_seat_ids = [seat_id for seat_id in seat_ids if seat_id not in seats]
+        if missing_seat_ids:
+            async with get_async_db_connection() as conn:
+                seats_data = await conn.fetch(
+                    "SELECT id, pos_x, pos_y FROM seat WHERE id = ANY($1::int[]) AND room_id = $2",
+                    missing_seat_ids,
+                    room_id,
+                )
+            missing_seats = {
+                seat_db.id: seat_db
+                for seat_db in (SeatRecord(*seat_data) for seat_data in seats_data)
+            }
+
+            # Cache the result
+            await self.redis_client.set_many(
+                self.encode_seats(room_id, missing_seats), ex=settings.redis_key_ttl
+            )
+            seats.update(missing_seats)
+
+        return self.split_seats(seat_ids, seats)
@@ -0,0 +1,494 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from src.config import settings
+from src.entities.rooms import Room
+from src.repositories.cache_keys import (
+    get_blocked_counts_key,
+    get_local_blocked_counts_key,
+    get_occupancy_key,
+    get_room_version_key,
+)
+from src.services.async_redis_client import AsyncRedisClient
+from src.services.local_cache import local_cache
+from src.services.redis_client import RedisClient
+
+# Blocked counts are stored as BITFIELD u16, which Redis keeps big-endian
+BLOCKED_COUNTS_DTYPE = np.dtype(">u2")
+MAX_BLOCKED_COUNT = np.iinfo(np.uint16).max
+
+# Store the value of every room KEYS[i] only if its room version KEYS[i + 1]
+# is still the version ARGV[i + 1] its seats were read at, ARGV[1] is the TTL
+SET_IF_ROOM_VERSION_SCRIPT = """
+for i = 1, #KEYS, 2 do
+    if (redis.call('GET', KEYS[i + 1]) or '0') == ARGV[i + 1] then
+        redis.call('SET', KEYS[i], ARGV[i + 2], 'EX', ARGV[1], 'NX')
+    end
+end
+return 1
+"""
+
+# Apply reserved (ARGV[1] = 1) or canceled (ARGV[1] = 0) seats ARGV[5:] to the
+# state KEYS[1] and the occupancy bitmap KEYS[3], then bump the room version
+# KEYS[2] in the same script
+# The bits after the counters record the seats the state has seen, so a seat
+# already in the snapshot of the state is not counted twice
+# Returns 0 if a counter left the u16 range, the state is dropped then
+UPDATE_BLOCKED_COUNTS_SCRIPT = """
+local taken = tonumber(ARGV[1])
+local row = tonumber(ARGV[2])
+local col = tonumber(ARGV[3])
+local radius = tonumber(ARGV[4])
+local delta = taken == 1 and 1 or -1
+local in_range = 1
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    for i = 5, #ARGV, 2 do
+        local pos_x = tonumber(ARGV[i])
+        local pos_y = tonumber(ARGV[i + 1])
+        if redis.call('SETBIT', KEYS[1], row * col * 16 + pos_x * col + pos_y, taken) ~= taken then
+            for near_x = math.max(pos_x - radius, 0), math.min(pos_x + radius, row - 1) do
+                local width = radius - math.abs(near_x - pos_x)
+                for near_y = math.max(pos_y - width, 0), math.min(pos_y + width, col - 1) do
+                    local counts = redis.call('BITFIELD', KEYS[1], 'OVERFLOW', 'FAIL', 'INCRBY', 'u16', '#' .. (near_x * col + near_y), delta)
+                    if not counts[1] then
+                        in_range = 0
+                    end
+                end
+            end
+        end
+    end
+    if in_range == 0 then
+        redis.call('DEL', KEYS[1])
+    end
+end
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    for i = 5, #ARGV, 2 do
+        redis.call('SETBIT', KEYS[3], tonumber(ARGV[i]) * tonumber(ARGV[3]) + tonumber(ARGV[i + 1]), taken)
+    end
+end
+for i = 4, #KEYS do
+    redis.call('DEL', KEYS[i])
+end
+redis.call('INCR', KEYS[2])
+return in_range
+"""
+
+# Reasons of the seats rejected by CHECK_AND_RESERVE_SCRIPT
+SEAT_NOT_AVAILABLE = 1
+SEAT_TOO_CLOSE = 2
+
+# Check the diamond of radius ARGV[3] around every requested seat ARGV[5:]
+# against the taken seats and the seats requested before it, then take them all
+# if none is rejected
+# Every use extends the TTL ARGV[4] of the bitmap
+# Returns nil when the room has no bitmap yet, otherwise the 1-based position
+# and the reason of every rejected seat, empty when reserved
+CHECK_AND_RESERVE_SCRIPT = """
+if redis.call('EXPIRE', KEYS[1], ARGV[4]) == 0 then
+    return false
+end
+local row = tonumber(ARGV[1])
+local col = tonumber(ARGV[2])
+local radius = tonumber(ARGV[3])
+local seats = {}
+local function is_taken_near(pos_x, pos_y)
+    for dx = -radius, radius do
+        local near_x = pos_x + dx
+        if near_x >= 0 and near_x < row then
+            local width = radius - math.abs(dx)
+            for near_y = math.max(pos_y - width, 0), math.min(pos_y + width, col - 1) do
+                if redis.call('GETBIT', KEYS[1], near_x * col + near_y) == 1 then
+                    return true
+                end
+            end
+        end
+    end
+    return false
+end
+local function is_requested_near(pos_x, pos_y)
+    for _, seat in ipairs(seats) do
+        if math.abs(seat[1] - pos_x) + math.abs(seat[2] - pos_y) <= radius then
+            return true
+        end
+    end
+    return false
+end
+local rejected = {}
+for i = 5, #ARGV, 2 do
+    local pos_x = tonumber(ARGV[i])
+    local pos_y = tonumber(ARGV[i + 1])
+    local position = (i - 3) / 2
+    if is_taken_near(pos_x, pos_y) then
+        table.insert(rejected, position)
+        table.insert(rejected, %d)
+    elseif is_requested_near(pos_x, pos_y) then
+        table.insert(rejected, position)
+        table.insert(rejected, %d)
+    else
+        table.insert(seats, {pos_x, pos_y})
+    end
+end
+if #rejected == 0 then
+    for _, seat in ipairs(seats) do
+        redis.call('SETBIT', KEYS[1], seat[1] * col + seat[2], 1)
+    end
+end
+return rejected
+""" % (
+    SEAT_NOT_AVAILABLE,
+    SEAT_TOO_CLOSE,
+)
+
+# Set the bits at offsets ARGV[2:] to ARGV[1] only if the bitmap exists
+SET_OCCUPANCY_BITS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 2, #ARGV do
+    redis.call('SETBIT', KEYS[1], ARGV[i], ARGV[1])
+end
+return 1
+"""
+
+
+class ScriptCall(NamedTuple):
+    keys: List[str]
+    args: List[Any]
+
+
+class BaseAvailabilityRepository:
+    """
+    Per room availability state kept in Redis and updated in place
+    Every seat stores the number of taken seats closer than min_distance,
+    so a write only touches the diamond around the changed seat
+    The keys and arguments of the scripts are built here, AvailabilityRepository
+    and AsyncAvailabilityRepository only run them with their client
+    """
+
+    def __init__(self, redis_client: Union[RedisClient, AsyncRedisClient]):
+        self.redis_client = redis_client
+        self.set_if_room_version_script = self.redis_client.register_script(
+            SET_IF_ROOM_VERSION_SCRIPT
+        )
+        self.update_blocked_counts_script = self.redis_client.register_script(
+            UPDATE_BLOCKED_COUNTS_SCRIPT
+        )
+        self.check_and_reserve_script = self.redis_client.register_script(
+            CHECK_AND_RESERVE_SCRIPT
+        )
+        self.set_occupancy_bits_script = self.redis_client.register_script(
+            SET_OCCUPANCY_BITS_SCRIPT
+        )
+
+    def get_local_blocked_counts(
+        self,
+        rooms: List[Room],
+        min_distance: int,
+        versions: Optional[Dict[int, int]],
+    ) -> Dict[int, np.ndarray]:
+        """
+        Decoded states kept in process, under the room version they were read at
+        """
+        blocked_counts: Dict[int, np.ndarray] = {}
+        if versions is None:
+            return blocked_counts
+        for room in rooms:
+            counts = local_cache.get(
+                get_local_blocked_counts_key(room.id, versions[room.id], min_distance)
+            )
+            if counts is not None:
+                blocked_counts[room.id] = counts
+        return blocked_counts
+
+    def set_local_blocked_counts(
+        self,
+        min_distance: int,
+        counts: Dict[int, np.ndarray],
+        versions: Optional[Dict[int, int]],
+    ):
+        if versions is None:
+            return
+        for room_id, room_counts in counts.items():
+            local_cache.set(
+                get_local_blocked_counts_key(room_id, versions[room_id], min_distance),
+                room_counts,
+            )
+
+    def decode_blocked_counts(
+        self,
+        rooms: List[Room],
+        min_distance: int,
+        values: List[Optional[bytes]],
+        versions: Optional[Dict[int, int]],
+    ) -> Dict[int, np.ndarray]:
+        """
+        Decode the state of many rooms read with one MGET and keep it in process,
+        rooms without state are left out
+        """
+        blocked_counts: Dict[int, np.ndarray] = {}
+        for room, value in zip(rooms, values):
+            if value:
+                # The counters are followed by the bits of the taken seats
+                blocked_counts[room.id] = np.frombuffer(
+                    value, dtype=BLOCKED_COUNTS_DTYPE, count=room.row * room.col
+                ).reshape(room.row, room.col)
+        self.set_local_blocked_counts(min_distance, blocked_counts, versions)
+        return blocked_counts
+
+    def get_set_blocked_counts_call(
+        self,
+        rooms: List[Room],
+        min_distance: int,
+        counts: Dict[int, np.ndarray],
+        versions: Dict[int, int],
+    ) -> Optional[ScriptCall]:
+        """
+        Store the state of many rooms in one round-trip
+        A state is only stored if no seat changed since its seats were read,
+        and never overwrites a state which is already updated in place
+        Args:
+            rooms: Rooms with their seats added
+            min_distance: Minimum manhattan distance of the state
+            counts: Blocked counts by room id
+            versions: Room version the seats were read at, by room id
+        Returns:
+            None if there is nothing to store
+        """
+        # A saturated counter can't be updated in place, it is computed again
+        rooms = [room for room in rooms if counts[room.id].max() < MAX_BLOCKED_COUNT]
+        if not rooms:
+            return None
+
+        keys: List[str] = []
+        args: List[Any] = [settings.redis_key_ttl]
+        for room in rooms:
+            keys += [
+                get_blocked_counts_key(room.id, min_distance),
+                get_room_version_key(room.id),
+            ]
+            args += [
+                versions[room.id],
+                counts[room.id].astype(BLOCKED_COUNTS_DTYPE).tobytes()
+                + bytes(room.occupancy.bitmap),
+            ]
+        return ScriptCall(keys, args)
+
+    def get_update_blocked_counts_call(
+        self,
+        room: Room,
+        min_distance: int,
+        seats: List[Tuple[int, int]],
+        taken: bool,
+        radius: int,
+        deleted_keys: Optional[List[str]] = None,
+    ) -> ScriptCall:
+        """
+        Apply reserved or canceled seats to the state and the occupancy bitmap
+        and bump the room version in one script, so neither is ever stored
+        from seats older than the change
+        Args:
+            room: Room of the seats
+            min_distance: Minimum manhattan distance of the state
+            seats: Seats which were inserted or deleted
+            taken: True for reserved seats, False for canceled seats
+            radius: Blocking radius around every taken seat
+            deleted_keys: Cache entries of the seats, deleted by the same script
+        """
+        return ScriptCall(
+            [
+                get_blocked_counts_key(room.id, min_distance),
+                get_room_version_key(room.id),
+                get_occupancy_key(room.id),
+                *(deleted_keys or []),
+            ],
+            [
+                int(taken),
+                room.row,
+                room.col,
+                radius,
+                *(position for seat in seats for position in seat),
+            ],
+        )
+
+    def get_set_occupancy_call(self, room: Room, version: int) -> ScriptCall:
+        """
+        Store the occupancy bitmap of the room, it has the same bit layout as
+        Redis bitmaps. Like the blocked counts it is only stored if the room
+        version is still the version its seats were read at
+        It expires after REDIS_KEY_TTL without reservations
+        """
+        return ScriptCall(
+            [get_occupancy_key(room.id), get_room_version_key(room.id)],
+            [settings.redis_key_ttl, version, bytes(room.occupancy.bitmap)],
+        )
+
+    def get_check_and_reserve_call(
+        self, room: Room, seats: List[Tuple[int, int]], radius: int
+    ) -> ScriptCall:
+        """
+        Atomically check the seats against the occupancy bitmap and take them
+        Args:
+            room: Room of the seats
+            seats: Seats to reserve
+            radius: Blocking radius around every taken seat
+        """
+        return ScriptCall(
+            [get_occupancy_key(room.id)],
+            [
+                room.row,
+                room.col,
+                radius,
+                settings.redis_key_ttl,
+                *(position for seat in seats for position in seat),
+            ],
+        )
+
+    def decode_rejected_seats(
+        self, result: Optional[List[Any]]
+    ) -> Optional[List[Tuple[int, int]]]:
+        """
+        Pair the flat reply of CHECK_AND_RESERVE_SCRIPT into the 0-based index
+        and the reason of every rejected seat
+        """
+        if result is None:
+            return None
+        return [
+            (int(result[i]) - 1, int(result[i + 1])) for i in range(0, len(result), 2)
+        ]
+
+    def get_set_occupancy_bits_call(
+        self, room: Room, seats: List[Tuple[int, int]], taken: bool
+    ) -> ScriptCall:
+        """
+        Mark seats as taken or free in the bitmap, if the room has one
+        """
+        return ScriptCall(
+            [get_occupancy_key(room.id)],
+            [int(taken), *(pos_x * room.col + pos_y for pos_x, pos_y in seats)],
+        )
+
+
+class AvailabilityRepository(BaseAvailabilityRepository):
+    def __init__(self):
+        super().__init__(RedisClient())
+
+    def get_blocked_counts(
+        self, room: Room, min_distance: int, version: Optional[int] = None
+    ) -> Optional[np.ndarray]:
+        return self.get_many_blocked_counts(
+            rooms=[room],
+            min_distance=min_distance,
+            versions=None if version is None else {room.id: version},
+        ).get(room.id)
+
+    def get_many_blocked_counts(
+        self,
+        rooms: List[Room],
+        min_distance: int,
+        versions: Optional[Dict[int, int]] = None,
+    ) -> Dict[int, np.ndarray]:
+        """
+        Get the state of many rooms in one MGET, rooms without state are left out
+        Args:
+            rooms: Rooms of the states
+            min_distance: Minimum manhattan distance of the states
+            versions: Room versions read before the states, by room id. With
+                them the decoded states are kept in process, the state is read
+                at the version or a later one
+        """
+        blocked_counts = self.get_local_blocked_counts(rooms, min_distance, versions)
+        redis_rooms = [room for room in rooms if room.id not in blocked_counts]
+        blocked_counts.update(
+            self.decode_blocked_counts(
+                redis_rooms,
+                min_distance,
+                self.redis_client.mget(
+                    [
+                        get_blocked_counts_key(room.id, min_distance)
+                        for room in redis_rooms
+                    ]
+                ),
+                versions,
+            )
+        )
+        return blocked_counts
+
+    def set_blocked_counts(
+        self, room: Room, min_distance: int, counts: np.ndarray, version: int
+    ):
+        self.set_many_blocked_counts(
+            rooms=[room],
+            min_distance=min_distance,
+            counts={room.id: counts},
+            versions={room.id: version},
+        )
+
+    def set_many_blocked_counts(
+        self,
+        rooms: List[Room],
+        min_distance: int,
+        counts: Dict[int, np.ndarray],
+        versions: Dict[int, int],
+    ):
+        """
+        Store the state of many rooms, see get_set_blocked_counts_call
+        """
+        self.set_local_blocked_counts(min_distance, counts, versions)
+        call = self.get_set_blocked_counts_call(rooms, min_distance, counts, versions)
+        if call is not None:
+            self.set_if_room_version_script(keys=call.keys, args=call.args)
+
+    def update_blocked_counts(
+        self,
+        room: Room,
+        min_distance: int,
+        seats: List[Tuple[int, int]],
+        taken: bool,
+        radius: int,
+        deleted_keys: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        See get_update_blocked_counts_call
+        Returns:
+            False if a counter left the u16 range and the state was dropped
+        """
+        call = self.get_update_blocked_counts_call(
+            room, min_distance, seats, taken, radius, deleted_keys
+        )
+        return bool(self.update_blocked_counts_script(keys=call.keys, args=call.args))
+
+    def set_occupancy(self, room: Room, version: int):
+        call = self.get_set_occupancy_call(room, version)
+        self.set_if_room_version_script(keys=call.keys, args=call.args)
+
+    def delete_occupancy(self, room: Room):
+        self.redis_client.delete(get_occupancy_key(room.id))
+
+    def check_and_reserve(
+        self, room: Room, seats: List[Tuple[int, int]], radius: int
+    ) -> Optional[List[Tuple[int, int]]]:
+        """
+        See get_check_and_reserve_call
+        Returns:
+            None if the room has no bitmap yet, otherwise the index and the
+            reason of every rejected seat, empty if the seats are taken
+        """
+        call = self.get_check_and_reserve_call(room, seats, radius)
+        return self.decode_rejected_seats(
+            self.check_and_reserve_script(keys=call.keys, args=call.args)
+        )
+
+    def set_occupancy_bits(
+        self, room: Room, seats: List[Tuple[int, int]], taken: bool
+    ) -> bool:
+        """
+        Mark seats as taken or free in the bitmap
+        Returns:
+            False if the room has no bitmap yet
+        """
+        if not seats:
+            return True
+
+        call = self.get_set_occupancy_bits_call(room, seats, taken)
+        return bool(self.set_occupancy_bits_script(keys=call.keys, args=call.args))
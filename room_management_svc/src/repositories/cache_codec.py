@@ -0,0 +1,240 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence, Tuple, Type, Union
+
+import numpy as np
+
+from src.entities.rooms import RoomLike, RoomRecord, SeatLike
+from src.entities.seats import SeatRecord
+
+# First byte of binary values, JSON values start with '[', '{' or '"'
+BINARY_FORMAT_VERSION = 1
+INT32_DTYPE = np.dtype("<i4")
+
+
+class CacheCodec(ABC):
+    """
+    Format of the values cached in Redis
+    Every codec reads values written by any codec, so the format can be
+    switched one replica at a time
+    Cached values are trusted, they are decoded to records without validation
+    """
+
+    @abstractmethod
+    def encode_room(self, room: RoomLike) -> bytes:
+        pass
+
+    @abstractmethod
+    def encode_rooms(self, rooms: Sequence[RoomLike]) -> bytes:
+        pass
+
+    @abstractmethod
+    def encode_seat(self, seat: SeatLike) -> bytes:
+        pass
+
+    @abstractmethod
+    def encode_seats(self, seats: Sequence[SeatLike]) -> bytes:
+        pass
+
+    @abstractmethod
+    def encode_positions(self, positions: Sequence[Sequence[int]]) -> bytes:
+        """
+        Encode (pos_x, pos_y) seats or (row, start_col, end_col) intervals
+        """
+        pass
+
+    @abstractmethod
+    def load_room(self, value: bytes) -> RoomRecord:
+        pass
+
+    @abstractmethod
+    def load_rooms(self, value: bytes) -> List[RoomRecord]:
+        pass
+
+    @abstractmethod
+    def load_seat(self, value: bytes) -> SeatRecord:
+        pass
+
+    @abstractmethod
+    def load_seats(self, value: bytes) -> List[SeatRecord]:
+        pass
+
+    @abstractmethod
+    def load_positions(self, value: bytes, width: int) -> List[Tuple[int, ...]]:
+        pass
+
+    # Decode with the codec which wrote the value
+    def decode_room(self, value: bytes) -> RoomRecord:
+        return get_value_codec(value).load_room(value)
+
+    def decode_rooms(self, value: bytes) -> List[RoomRecord]:
+        return get_value_codec(value).load_rooms(value)
+
+    def decode_seat(self, value: bytes) -> SeatRecord:
+        return get_value_codec(value).load_seat(value)
+
+    def decode_seats(self, value: bytes) -> List[SeatRecord]:
+        return get_value_codec(value).load_seats(value)
+
+    def decode_positions(self, value: bytes, width: int) -> List[Tuple[int, ...]]:
+        return get_value_codec(value).load_positions(value, width)
+
+
+class JsonCacheCodec(CacheCodec):
+    """
+    The original layout, a JSON array of model JSON strings
+    """
+
+    def dump_room(self, room: RoomLike) -> str:
+        return json.dumps(
+            {
+                "id": room.id,
+                "row": room.row,
+                "col": room.col,
+                "is_deleted": room.is_deleted,
+            }
+        )
+
+    def dump_seat(self, seat: SeatLike) -> str:
+        return json.dumps({"id": seat.id, "pos_x": seat.pos_x, "pos_y": seat.pos_y})
+
+    def encode_room(self, room: RoomLike) -> bytes:
+        return self.dump_room(room).encode()
+
+    def encode_rooms(self, rooms: Sequence[RoomLike]) -> bytes:
+        return json.dumps([self.dump_room(room) for room in rooms]).encode()
+
+    def encode_seat(self, seat: SeatLike) -> bytes:
+        return json.dumps(self.dump_seat(seat)).encode()
+
+    def encode_seats(self, seats: Sequence[SeatLike]) -> bytes:
+        return json.dumps([self.dump_seat(seat) for seat in seats]).encode()
+
+    def encode_positions(self, positions: Sequence[Sequence[int]]) -> bytes:
+        return json.dumps(positions).encode()
+
+    def parse_room(self, item: Union[str, bytes]) -> RoomRecord:
+        fields = json.loads(item)
+        return RoomRecord(
+            id=fields["id"],
+            row=fields["row"],
+            col=fields["col"],
+            is_deleted=fields.get("is_deleted", False),
+        )
+
+    def parse_seat(self, item: Union[str, bytes]) -> SeatRecord:
+        fields = json.loads(item)
+        return SeatRecord(id=fields["id"], pos_x=fields["pos_x"], pos_y=fields["pos_y"])
+
+    def load_room(self, value: bytes) -> RoomRecord:
+        return self.parse_room(value)
+
+    def load_rooms(self, value: bytes) -> List[RoomRecord]:
+        return [self.parse_room(item) for item in json.loads(value)]
+
+    def load_seat(self, value: bytes) -> SeatRecord:
+        return self.parse_seat(json.loads(value))
+
+    def load_seats(self, value: bytes) -> List[SeatRecord]:
+        return [self.parse_seat(item) for item in json.loads(value)]
+
+    def load_positions(self, value: bytes, width: int) -> List[Tuple[int, ...]]:
+        return [tuple(position) for position in json.loads(value)]
+
+
+class BinaryCacheCodec(CacheCodec):
+    """
+    Version byte followed by little-endian int32 columns
+    Rooms are (id, row, col, is_deleted), seats (id, pos_x, pos_y), positions
+    and intervals their coordinates
+    """
+
+    def encode_columns(self, values: Sequence[Sequence[int]], width: int) -> bytes:
+        return bytes([BINARY_FORMAT_VERSION]) + (
+            np.asarray(values, dtype=INT32_DTYPE).reshape(-1, width).tobytes()
+        )
+
+    def load_columns(self, value: bytes, width: int) -> List[List[int]]:
+        return (
+            np.frombuffer(value, dtype=INT32_DTYPE, offset=1)
+            .reshape(-1, width)
+            .tolist()
+        )
+
+    def encode_room(self, room: RoomLike) -> bytes:
+        return self.encode_rooms([room])
+
+    def encode_rooms(self, rooms: Sequence[RoomLike]) -> bytes:
+        return self.encode_columns(
+            [(room.id, room.row, room.col, room.is_deleted) for room in rooms], 4
+        )
+
+    def encode_seat(self, seat: SeatLike) -> bytes:
+        return self.encode_seats([seat])
+
+    def encode_seats(self, seats: Sequence[SeatLike]) -> bytes:
+        return self.encode_columns(
+            [(seat.id, seat.pos_x, seat.pos_y) for seat in seats], 3
+        )
+
+    def encode_positions(self, positions: Sequence[Sequence[int]]) -> bytes:
+        return bytes([BINARY_FORMAT_VERSION]) + (
+            np.asarray(positions, dtype=INT32_DTYPE).tobytes()
+        )
+
+    def load_room(self, value: bytes) -> RoomRecord:
+        return self.load_rooms(value)[0]
+
+    def load_rooms(self, value: bytes) -> List[RoomRecord]:
+        return [
+            RoomRecord(room_id, row, col, bool(is_deleted))
+            for room_id, row, col, is_deleted in self.load_columns(value, 4)
+        ]
+
+    def load_seat(self, value: bytes) -> SeatRecord:
+        return self.load_seats(value)[0]
+
+    def load_seats(self, value: bytes) -> List[SeatRecord]:
+        return [
+            SeatRecord(seat_id, pos_x, pos_y)
+            for seat_id, pos_x, pos_y in self.load_columns(value, 3)
+        ]
+
+    def load_positions(self, value: bytes, width: int) -> List[Tuple[int, ...]]:
+        return [
+            tuple(position)
+            for position in np.frombuffer(value, dtype=INT32_DTYPE, offset=1)
+            .reshape(-1, width)
+            .tolist()
+        ]
+
+
+JSON_CACHE_CODEC = JsonCacheCodec()
+BINARY_CACHE_CODEC = BinaryCacheCodec()
+
+CACHE_CODECS: Dict[str, Type[CacheCodec]] = {
+    "json": JsonCacheCodec,
+    "binary": BinaryCacheCodec,
+}
+
+
+def get_value_codec(value: bytes) -> CacheCodec:
+    """
+    Codec which wrote the value, from its first byte
+    """
+    if value[:1] and value[0] == BINARY_FORMAT_VERSION:
+        return BINARY_CACHE_CODEC
+    return JSON_CACHE_CODEC
+
+
+def get_cache_codec(name: str) -> CacheCodec:
+    """
+    Get the codec by name
+    Args:
+        name: Name of the codec, one of CACHE_CODECS
+    Returns:
+        The codec instance
+    """
+    if name not in CACHE_CODECS:
+        raise ValueError(f"Cache codec {name} is not supported")
+    return CACHE_CODECS[name]()
@@ -0,0 +1,64 @@
+"""
+Redis and process cache keys, shared by the thread and aio servers so both
+read and write the same entries
+Keys of values derived from the seats of a room end with its version, see
+SeatRepository.get_room_version
+"""
+
+ROOMS_KEY = "rooms_cache"
+
+# Sorted set of the reads of every room, see RoomManagement.record_room_requests
+ROOM_REQUESTS_KEY = "room_requests"
+
+
+def get_room_key(room_id: int) -> str:
+    return f"room_{room_id}"
+
+
+def get_room_version_key(room_id: int) -> str:
+    return f"room_version_{room_id}"
+
+
+def get_room_seats_key(room_id: int, version: int) -> str:
+    return f"room_seats_cache_{room_id}_v{version}"
+
+
+def get_seat_key(room_id: int, seat_id: int) -> str:
+    return f"seat_{room_id}_{seat_id}"
+
+
+def get_seat_lock_key(room_id: int, pos_x: int, pos_y: int) -> str:
+    return f"room_seat_{room_id}_{pos_x}_{pos_y}"
+
+
+def get_occupancy_key(room_id: int) -> str:
+    return f"room_occupancy_{room_id}"
+
+
+def get_blocked_counts_key(room_id: int, min_distance: int) -> str:
+    return f"room_blocked_counts_{room_id}_{min_distance}"
+
+
+def get_local_blocked_counts_key(room_id: int, version: int, min_distance: int) -> str:
+    # Process copy of the blocked counts, the Redis state is updated in place
+    return f"{get_blocked_counts_key(room_id, min_distance)}_v{version}"
+
+
+def get_available_seats_key(room_id: int, version: int, min_distance: int) -> str:
+    return f"room_available_seats_{room_id}_v{version}_{min_distance}"
+
+
+def get_available_count_key(room_id: int, version: int, min_distance: int) -> str:
+    return f"{get_available_seats_key(room_id, version, min_distance)}_count"
+
+
+def get_available_intervals_key(room_id: int, version: int, min_distance: int) -> str:
+    return f"{get_available_seats_key(room_id, version, min_distance)}_intervals"
+
+
+def get_distance_map_key(room_id: int, version: int) -> str:
+    return f"room_distance_map_{room_id}_v{version}"
+
+
+def get_prefix_sum_key(room_id: int, version: int) -> str:
+    return f"room_prefix_sum_{room_id}_v{version}"
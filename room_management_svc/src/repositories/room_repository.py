@@ -1,19 +1,107 @@
-import json
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from src.config import settings
-from src.entities.rooms import Room
+from src.entities.rooms import Room, RoomRecord
+from src.repositories.cache_codec import get_cache_codec
+from src.repositories.cache_keys import ROOMS_KEY, get_occupancy_key, get_room_key
 from src.repositories.db_connection import get_db_connection
+from src.services.async_redis_client import AsyncRedisClient
+from src.services.local_cache import local_cache
 from src.services.redis_client import RedisClient
 
 
-class RoomRepository:
+class BaseRoomRepository:
+    """
+    Cache keys and encoding of the rooms, shared by RoomRepository and
+    AsyncRoomRepository which only do the Redis and database I/O
+    """
+
+    def __init__(self, redis_client: Union[RedisClient, AsyncRedisClient]):
+        self.redis_client = redis_client
+        self.cache_codec = get_cache_codec(settings.cache_codec)
+
+    def get_removed_keys(self, room_id: int) -> Tuple[List[str], List[str]]:
+        """
+        Returns:
+            The Redis keys and the process keys to drop when the room is removed
+        """
+        return [ROOMS_KEY, get_room_key(room_id), get_occupancy_key(room_id)], [
+            ROOMS_KEY,
+            get_room_key(room_id),
+        ]
+
+    def decode_rooms(
+        self, value: Optional[bytes], epoch: int
+    ) -> Optional[List[RoomRecord]]:
+        """
+        Decode the cached list of rooms and keep it in process, None on miss
+        """
+        if not value:
+            return None
+        rooms = self.cache_codec.decode_rooms(value)
+        local_cache.set(ROOMS_KEY, rooms, epoch=epoch)
+        return list(rooms)
+
+    def get_rooms_from_rows(
+        self, rows: list, epoch: int
+    ) -> Tuple[List[RoomRecord], Any]:
+        """
+        Returns:
+            The rooms of the rows, kept in process, and their encoding to cache
+        """
+        # Rows are trusted, so they are not validated
+        rooms = [RoomRecord(*room_data) for room_data in rows]
+        local_cache.set(ROOMS_KEY, rooms, epoch=epoch)
+        return list(rooms), self.cache_codec.encode_rooms(rooms)
+
+    def get_local_room_records(self, room_ids: List[int]) -> Dict[int, RoomRecord]:
+        records: Dict[int, RoomRecord] = {}
+        for room_id in room_ids:
+            cached_record = local_cache.get(get_room_key(room_id))
+            if cached_record is not None:
+                records[room_id] = cached_record
+        return records
+
+    def decode_room_records(
+        self, room_ids: List[int], values: list, epoch: int
+    ) -> Dict[int, RoomRecord]:
+        """
+        Decode the rooms read with one MGET and keep them in process, rooms
+        which are not cached are left out
+        """
+        records: Dict[int, RoomRecord] = {}
+        for room_id, value in zip(room_ids, values):
+            if value:
+                records[room_id] = self.cache_codec.decode_room(value)
+                local_cache.set(get_room_key(room_id), records[room_id], epoch=epoch)
+        return records
+
+    def get_room_records_from_rows(
+        self, rows: list, epoch: int
+    ) -> Tuple[Dict[int, RoomRecord], Dict[str, Any]]:
+        """
+        Returns:
+            The rooms of the rows, kept in process, and the mapping to cache them
+        """
+        records: Dict[int, RoomRecord] = {}
+        for room_data in rows:
+            cached_record = RoomRecord(*room_data)
+            records[cached_record.id] = cached_record
+            local_cache.set(get_room_key(cached_record.id), cached_record, epoch=epoch)
+        return records, {
+            get_room_key(room_id): self.cache_codec.encode_room(record)
+            for room_id, record in records.items()
+        }
+
+
+class RoomRepository(BaseRoomRepository):
     def __init__(self):
-        self.redis_client = RedisClient()
+        super().__init__(RedisClient())
 
     def add_room(self, row: int, col: int) -> Optional[Room]:
         # Invalidate cache when a new room is added
-        self.redis_client.client.delete("rooms_cache")
+        self.redis_client.delete(ROOMS_KEY)
+        local_cache.invalidate([ROOMS_KEY])
 
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -34,9 +122,10 @@ class RoomRepository:
             )
 
     def remove_room(self, room_id: int):
-        # Invalidate cache when a new room is added
-        self.redis_client.client.delete("rooms_cache")
-        self.redis_client.client.delete(f"room_{room_id}")
+        # Invalidate cache when a room is removed
+        redis_keys, local_keys = self.get_removed_keys(room_id)
+        self.redis_client.delete(*redis_keys)
+        local_cache.invalidate(local_keys)
 
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -46,12 +135,17 @@ class RoomRepository:
             conn.commit()
             cursor.close()
 
-    def list_rooms(self) -> list[Room]:
-        # Check if the result is cached
-        cached_rooms = self.redis_client.get("rooms_cache")
+    def list_rooms(self) -> List[RoomRecord]:
+        # Records are kept in process, every caller gets its own list
+        cached_records = local_cache.get(ROOMS_KEY)
+        if cached_records is not None:
+            return list(cached_records)
 
-        if cached_rooms:
-            return [Room.model_validate_json(item) for item in json.loads(cached_rooms)]
+        # Check if the result is cached
+        epoch = local_cache.get_epoch()
+        rooms = self.decode_rooms(self.redis_client.get(ROOMS_KEY), epoch)
+        if rooms is not None:
+            return rooms
 
         with get_db_connection() as conn:
             cursor = conn.cursor()
@@ -60,52 +154,70 @@ class RoomRepository:
             )
             rooms_data = cursor.fetchall()
             cursor.close()
-
-            # Cache the result
-            cached_rooms = [
-                Room(
-                    id=room_data[0],
-                    row=room_data[1],
-                    col=room_data[2],
-                    is_deleted=room_data[3],
+        rooms, cached_rooms = self.get_rooms_from_rows(rooms_data, epoch)
+
+        # Cache the result
+        self.redis_client.set(ROOMS_KEY, cached_rooms, ex=settings.redis_key_ttl)
+        return rooms
+
+    def get_room_record(self, room_id: int) -> Optional[RoomRecord]:
+        return self.get_room_records([room_id]).get(room_id)
+
+    def get_room_records(self, room_ids: List[int]) -> Dict[int, RoomRecord]:
+        """
+        Get many room records with one MGET and one query for the cache misses
+        Args:
+            room_ids: Room ids, missing or deleted rooms are left out
+        """
+        # Try to get rooms from the process, then from cache
+        room_ids = list(dict.fromkeys(room_ids))
+        records = self.get_local_room_records(room_ids)
+
+        epoch = local_cache.get_epoch()
+        redis_room_ids = [room_id for room_id in room_ids if room_id not in records]
+        if redis_room_ids:
+            records.update(
+                self.decode_room_records(
+                    redis_room_ids,
+                    self.redis_client.mget(
+                        [get_room_key(room_id) for room_id in redis_room_ids]
+                    ),
+                    epoch,
                 )
-                for room_data in rooms_data
-            ]
-
-            self.redis_client.set(
-                "rooms_cache",
-                json.dumps([item.model_dump_json() for item in cached_rooms]),
-                ex=settings.redis_key_ttl,
             )
 
-            return cached_rooms
-
-    def get_room(self, room_id: int) -> Optional[Room]:
-        # Try to get room from cache
-        cache_key = f"room_{room_id}"
-        cached_room = self.redis_client.get(cache_key)
-        if cached_room:
-            return Room.model_validate_json(cached_room)
-
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, row, col, is_deleted FROM room WHERE id = %s AND is_deleted = FALSE",
-                (room_id,),
-            )
-            room_data = cursor.fetchone()
-            cursor.close()
-            if room_data is None:
-                return None
-            cached_room = Room(
-                id=room_data[0],
-                row=room_data[1],
-                col=room_data[2],
-                is_deleted=room_data[3],
+        missing_room_ids = [room_id for room_id in room_ids if room_id not in records]
+        if missing_room_ids:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT id, row, col, is_deleted FROM room WHERE id = ANY(%s) AND is_deleted = FALSE",
+                    (missing_room_ids,),
+                )
+                rooms_data = cursor.fetchall()
+                cursor.close()
+            missing_records, cached_rooms = self.get_room_records_from_rows(
+                rooms_data, epoch
             )
 
-            self.redis_client.set(
-                cache_key, cached_room.model_dump_json(), ex=settings.redis_key_ttl
-            )
+            # Cache the result
+            self.redis_client.set_many(cached_rooms, ex=settings.redis_key_ttl)
+            records.update(missing_records)
+
+        return records
 
-            return cached_room
+    def get_room(self, room_id: int) -> Optional[Room]:
+        # Every caller gets its own Room since use cases add seats to it
+        room = self.get_room_record(room_id)
+        return room.to_room() if room else None
+
+    def get_rooms(self, room_ids: List[int]) -> Dict[int, Room]:
+        """
+        Get many rooms with one MGET and one query for the cache misses
+        Args:
+            room_ids: Room ids, missing or deleted rooms are left out
+        """
+        return {
+            room_id: record.to_room()
+            for room_id, record in self.get_room_records(room_ids).items()
+        }
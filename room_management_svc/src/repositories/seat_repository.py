@@ -1,119 +1,368 @@
-import json
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from src.config import settings
-from src.entities.seats import Seat
+from src.entities.rooms import SeatLike
+from src.entities.seats import SeatRecord
+from src.repositories.cache_codec import get_cache_codec
+from src.repositories.cache_keys import (
+    get_room_seats_key,
+    get_room_version_key,
+    get_seat_key,
+)
 from src.repositories.db_connection import get_db_connection
+from src.services.async_redis_client import AsyncRedisClient
+from src.services.local_cache import local_cache
 from src.services.redis_client import RedisClient
 
 
-class SeatRepository:
+class BaseSeatRepository:
+    """
+    Cache keys, versions and encoding of the seats, shared by SeatRepository
+    and AsyncSeatRepository which only do the Redis and database I/O
+    """
+
+    def __init__(self, redis_client: Union[RedisClient, AsyncRedisClient]):
+        self.redis_client = redis_client
+        self.cache_codec = get_cache_codec(settings.cache_codec)
+
+    def get_local_room_versions(self, room_ids: List[int]) -> Dict[int, int]:
+        versions: Dict[int, int] = {}
+        for room_id in room_ids:
+            version = local_cache.get(get_room_version_key(room_id))
+            if version is not None:
+                versions[room_id] = version
+        return versions
+
+    def set_local_room_versions(self, versions: Dict[int, int], epoch: int):
+        # The epoch was taken before the versions were read from Redis
+        for room_id, version in versions.items():
+            local_cache.set(get_room_version_key(room_id), version, epoch=epoch)
+
+    def get_room_seats_keys(
+        self, room_ids: List[int], versions: Dict[int, int]
+    ) -> List[str]:
+        return [get_room_seats_key(room_id, versions[room_id]) for room_id in room_ids]
+
+    def get_local_room_seats(
+        self, room_ids: List[int], versions: Dict[int, int]
+    ) -> Dict[int, List[SeatRecord]]:
+        room_seats: Dict[int, List[SeatRecord]] = {}
+        for room_id, key in zip(room_ids, self.get_room_seats_keys(room_ids, versions)):
+            local_room_seats = local_cache.get(key)
+            if local_room_seats is not None:
+                room_seats[room_id] = list(local_room_seats)
+        return room_seats
+
+    def decode_room_seats(
+        self, room_ids: List[int], versions: Dict[int, int], values: list
+    ) -> Dict[int, List[SeatRecord]]:
+        """
+        Decode the seats of many rooms read with one MGET and keep them in
+        process, rooms without cached seats are left out
+        """
+        room_seats: Dict[int, List[SeatRecord]] = {}
+        for room_id, value in zip(room_ids, values):
+            if value:
+                room_seats[room_id] = self.cache_codec.decode_seats(value)
+        self.set_local_room_seats(room_seats, versions)
+        return room_seats
+
+    def get_room_seats_from_rows(
+        self, room_ids: List[int], rows: list
+    ) -> Dict[int, List[SeatRecord]]:
+        """
+        Group (room_id, id, pos_x, pos_y) rows by room, rooms without seats
+        have an empty list
+        """
+        room_seats: Dict[int, List[SeatRecord]] = {room_id: [] for room_id in room_ids}
+        for room_id, *seat_data in rows:
+            # Rows are trusted, so they are not validated
+            room_seats[room_id].append(SeatRecord(*seat_data))
+        return room_seats
+
+    def encode_room_seats(
+        self, room_seats: Dict[int, List[SeatRecord]], versions: Dict[int, int]
+    ) -> Dict[str, Any]:
+        return {
+            get_room_seats_key(room_id, versions[room_id]): (
+                self.cache_codec.encode_seats(seats)
+            )
+            for room_id, seats in room_seats.items()
+        }
+
+    def set_local_room_seats(
+        self, room_seats: Dict[int, List[SeatRecord]], versions: Dict[int, int]
+    ):
+        for room_id, seats in room_seats.items():
+            local_cache.set(get_room_seats_key(room_id, versions[room_id]), list(seats))
+
+    def get_seat_keys(self, room_id: int, seat_ids: Optional[List[int]]) -> List[str]:
+        return [get_seat_key(room_id, seat_id) for seat_id in seat_ids or []]
+
+    def decode_seats(self, seat_ids: List[int], values: list) -> Dict[int, SeatRecord]:
+        return {
+            seat_id: self.cache_codec.decode_seat(value)
+            for seat_id, value in zip(seat_ids, values)
+            if value
+        }
+
+    def encode_seats(
+        self, room_id: int, seats: Dict[int, SeatRecord]
+    ) -> Dict[str, Any]:
+        return {
+            get_seat_key(room_id, seat_id): self.cache_codec.encode_seat(seat)
+            for seat_id, seat in seats.items()
+        }
+
+    def split_seats(
+        self, seat_ids: List[int], seats: Dict[int, SeatRecord]
+    ) -> Tuple[List[SeatRecord], List[int]]:
+        """
+        The seats found, in the order of the ids, and the ids which are not
+        seats of the room
+        """
+        return [seats[seat_id] for seat_id in seat_ids if seat_id in seats], [
+            seat_id for seat_id in seat_ids if seat_id not in seats
+        ]
+
+
+class SeatRepository(BaseSeatRepository):
     def __init__(self):
-        self.redis_client = RedisClient()
+        super().__init__(RedisClient())
+
+    def get_room_version(self, room_id: int) -> int:
+        """
+        Generation of the seats of the room, every cache derived from the seats
+        has it in its key so a write invalidates them all with one INCR
+        """
+        return self.get_room_versions([room_id])[room_id]
+
+    def get_room_versions(self, room_ids: List[int]) -> Dict[int, int]:
+        versions = self.get_local_room_versions(room_ids)
+        missing_room_ids = [room_id for room_id in room_ids if room_id not in versions]
+        if not missing_room_ids:
+            return versions
+
+        epoch = local_cache.get_epoch()
+        missing_versions = dict(
+            zip(
+                missing_room_ids,
+                self.redis_client.get_versions(
+                    [get_room_version_key(room_id) for room_id in missing_room_ids]
+                ),
+            )
+        )
+        self.set_local_room_versions(missing_versions, epoch)
+        return {**versions, **missing_versions}
+
+    def invalidate_room(self, room_id: int, seat_ids: Optional[List[int]] = None):
+        """
+        Drop the cached seats and the process copies of the room version once
+        the version is bumped with the blocked counts of the room, see
+        AvailabilityRepository.update_blocked_counts which can delete the
+        cached seats itself
+        """
+        seat_keys = self.get_seat_keys(room_id, seat_ids)
+        if seat_keys:
+            self.redis_client.delete(*seat_keys)
+        local_cache.invalidate([get_room_version_key(room_id)])
 
-    def list_seats_by_room_id(self, room_id: int) -> list[Seat]:
-        # Check if the result is cached
-        cached_room_seats = self.redis_client.get(f"room_seats_cache_{room_id}")
-        if cached_room_seats:
-            return [
-                Seat.model_validate_json(item) for item in json.loads(cached_room_seats)
-            ]
+    def list_seats_by_room_id(
+        self, room_id: int, version: Optional[int] = None
+    ) -> List[SeatRecord]:
+        """
+        List seats of the room, read at the given room version or a later one
+        """
+        return self.list_seats_by_room_ids(
+            [room_id], versions=None if version is None else {room_id: version}
+        )[room_id]
+
+    def list_seats_by_room_ids(
+        self, room_ids: List[int], versions: Optional[Dict[int, int]] = None
+    ) -> Dict[int, List[SeatRecord]]:
+        """
+        List seats of many rooms with one MGET and one query for the cache misses
+        """
+        room_ids = list(dict.fromkeys(room_ids))
+        if versions is None:
+            versions = self.get_room_versions(room_ids)
+
+        # Check if the result is cached in process, then in Redis
+        room_seats = self.get_local_room_seats(room_ids, versions)
+        redis_room_ids = [room_id for room_id in room_ids if room_id not in room_seats]
+        room_seats.update(
+            self.decode_room_seats(
+                redis_room_ids,
+                versions,
+                self.redis_client.mget(
+                    self.get_room_seats_keys(redis_room_ids, versions)
+                ),
+            )
+        )
+
+        missing_room_ids = [
+            room_id for room_id in room_ids if room_id not in room_seats
+        ]
+        if not missing_room_ids:
+            return room_seats
 
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, pos_x, pos_y FROM seat WHERE room_id = %s",
-                (room_id,),
+                "SELECT room_id, id, pos_x, pos_y FROM seat WHERE room_id = ANY(%s)",
+                (missing_room_ids,),
             )
             seats_data = cursor.fetchall()
             cursor.close()
-            cached_room_seats = [
-                Seat(
-                    id=seat_data[0],
-                    pos_x=seat_data[1],
-                    pos_y=seat_data[2],
-                )
-                for seat_data in seats_data
-            ]
-
-            # Cache the result
-            self.redis_client.set(
-                f"room_seats_cache_{room_id}",
-                json.dumps([item.model_dump_json() for item in cached_room_seats]),
-                ex=settings.redis_key_ttl,
-            )
-            return cached_room_seats
+        missing_room_seats = self.get_room_seats_from_rows(missing_room_ids, seats_data)
 
-    def reverse_seats(
-        self, room_id: int, seats: list[Tuple[int, int]]
-    ) -> list[Tuple[int, int]]:
-        # Invalidate cache when a new room is added
-        self.redis_client.client.delete(f"room_seats_cache_{room_id}")
-        self.redis_client.delete_by_pattern(f"room_available_seats_{room_id}_*")
+        # Cache the result
+        self.redis_client.set_many(
+            self.encode_room_seats(missing_room_seats, versions),
+            ex=settings.redis_key_ttl,
+        )
+        self.set_local_room_seats(missing_room_seats, versions)
+        return {**room_seats, **missing_room_seats}
 
+    def list_seats_in_rect(
+        self,
+        room_id: int,
+        row_start: int,
+        row_end: int,
+        col_start: int,
+        col_end: int,
+    ) -> List[Tuple[int, int]]:
+        """
+        Positions of the seats of a rectangle of the room, read with a range
+        scan of the (room_id, pos_x, pos_y) index
+        Args:
+            room_id: Room of the seats
+            row_start, row_end: Rows of the rectangle, row_end is exclusive
+            col_start, col_end: Columns of the rectangle, col_end is exclusive
+        """
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            for pos_x, pos_y in seats:
-                # Add seats to the room with insert record if not exists
-                cursor.execute(
-                    "INSERT INTO seat (room_id, pos_x, pos_y) VALUES (%s, %s, %s) ON CONFLICT DO NOTHING",
-                    (room_id, pos_x, pos_y),
-                )
-            conn.commit()
+            cursor.execute(
+                "SELECT pos_x, pos_y FROM seat WHERE room_id = %s "
+                "AND pos_x >= %s AND pos_x < %s AND pos_y >= %s AND pos_y < %s",
+                (room_id, row_start, row_end, col_start, col_end),
+            )
+            seats_data = cursor.fetchall()
             cursor.close()
-            return seats
+        return seats_data
 
-    def cancel_seats(self, room_id: int, seats: List[Seat]) -> None:
-        # Invalidate cache when a new room is added
-        self.redis_client.client.delete(f"room_seats_cache_{room_id}")
-        self.redis_client.delete_by_pattern(f"room_available_seats_{room_id}_*")
-        for seat in seats:
-            self.redis_client.client.delete(f"seat_{seat.id}")
+    def reverse_seats(
+        self, room_id: int, seats: List[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        """
+        Insert the seats with one statement, taken seats are skipped
+        Args:
+            room_id: Room of the seats
+            seats: (pos_x, pos_y) of the seats
+        Returns:
+            The inserted seats, in the order they were given
+        """
+        seats = list(dict.fromkeys(seats))
+        if not seats:
+            return []
 
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            for seat in seats:
-                # Lock row ---> Select for update
-                cursor.execute(
-                    "SELECT id FROM seat WHERE room_id = %s AND pos_x = %s AND pos_y = %s FOR UPDATE",
-                    (room_id, seat.pos_x, seat.pos_y),
-                )
-
-                cursor.execute(
-                    "DELETE FROM seat WHERE room_id = %s AND pos_x = %s AND pos_y = %s",
-                    (room_id, seat.pos_x, seat.pos_y),
-                )
+            cursor.execute(
+                "INSERT INTO seat (room_id, pos_x, pos_y) "
+                "SELECT %s, pos_x, pos_y FROM unnest(%s::int[], %s::int[]) AS t(pos_x, pos_y) "
+                "ON CONFLICT DO NOTHING RETURNING pos_x, pos_y",
+                (room_id, [seat[0] for seat in seats], [seat[1] for seat in seats]),
+            )
+            inserted_seats = set(cursor.fetchall())
             conn.commit()
             cursor.close()
 
-    def get_seat_with_room_id(self, seat_id: int, room_id: int) -> Optional[Seat]:
-        # Try to get room from cache
-        cached_seat = self.redis_client.get(f"seat_{seat_id}")
-        if cached_seat:
-            return Seat.model_validate_json(json.loads(cached_seat))
+        # The caller invalidates the room after its in-place updates
+        return [seat for seat in seats if seat in inserted_seats]
+
+    def cancel_seats(
+        self, room_id: int, seats: List[SeatLike]
+    ) -> List[Tuple[int, int]]:
+        """
+        Delete the seats with one statement, the rows are locked by the delete
+        Args:
+            room_id: Room of the seats
+            seats: Seats to cancel
+        Returns:
+            The deleted seats, in the order they were given
+        """
+        positions = list(dict.fromkeys((seat.pos_x, seat.pos_y) for seat in seats))
+        if not positions:
+            return []
 
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, pos_x, pos_y FROM seat WHERE id = %s AND room_id = %s",
-                (seat_id, room_id),
+                "DELETE FROM seat WHERE room_id = %s AND (pos_x, pos_y) IN "
+                "(SELECT * FROM unnest(%s::int[], %s::int[])) RETURNING id, pos_x, pos_y",
+                (
+                    room_id,
+                    [position[0] for position in positions],
+                    [position[1] for position in positions],
+                ),
             )
-            seat_data = cursor.fetchone()
+            deleted_seats = {
+                (pos_x, pos_y): seat_id for seat_id, pos_x, pos_y in cursor.fetchall()
+            }
+            conn.commit()
             cursor.close()
-            if not seat_data:
-                return None
 
-            seat_db = Seat(
-                id=seat_data[0],
-                pos_x=seat_data[1],
-                pos_y=seat_data[2],
-            )
+        # The caller invalidates the room and the seats after its in-place updates
+        return [position for position in positions if position in deleted_seats]
+
+    def get_seat_with_room_id(self, seat_id: int, room_id: int) -> Optional[SeatRecord]:
+        seats, _ = self.get_seats_with_room_id(seat_ids=[seat_id], room_id=room_id)
+        return seats[0] if seats else None
+
+    def get_seats_with_room_id(
+        self, seat_ids: List[int], room_id: int
+    ) -> Tuple[List[SeatRecord], List[int]]:
+        """
+        Get seats of a room with one MGET and one query for the cache misses
+        Args:
+            seat_ids: Seat ids, duplicates are looked up once
+            room_id: Room of the seats
+        Returns:
+            The seats found, in the order of the ids, and the ids which are not
+            seats of the room
+        """
+        seat_ids = list(dict.fromkeys(seat_ids))
+
+        # Try to get seats from cache, keys are per room so a seat of another
+        # room is never returned
+        seats = self.decode_seats(
+            seat_ids,
+            self.redis_client.mget(
+                [get_seat_key(room_id, seat_id) for seat_id in seat_ids]
+            ),
+        )
+
+        missing_seat_ids = [seat_id for seat_id in seat_ids if seat_id not in seats]
+        if missing_seat_ids:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT id, pos_x, pos_y FROM seat WHERE id = ANY(%s) AND room_id = %s",
+                    (missing_seat_ids, room_id),
+                )
+                seats_data = cursor.fetchall()
+                cursor.close()
+
+            missing_seats = {
+                seat_db.id: seat_db
+                for seat_db in (SeatRecord(*seat_data) for seat_data in seats_data)
+            }
 
             # Cache the result
-            self.redis_client.set(
-                f"seat_{seat_id}",
-                json.dumps(seat_db.model_dump_json()),
-                ex=settings.redis_key_ttl,
+            self.redis_client.set_many(
+                self.encode_seats(room_id, missing_seats), ex=settings.redis_key_ttl
             )
+            seats.update(missing_seats)
 
-            return seat_db
+        return self.split_seats(seat_ids, seats)
@@ -0,0 +1,126 @@
+import asyncio
+import uuid
+from typing import Any, Dict, List, Optional
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from redis.commands.core import AsyncScript
+
+from src.config import settings
+from src.services.redis_client import (
+    ACQUIRE_LOCKS_SCRIPT,
+    RELEASE_LOCKS_SCRIPT,
+    MultiLock,
+)
+
+# Same attempts and delay as the Redlock defaults of RedisClient.acquire_locks
+LOCK_RETRY_COUNT = 3
+LOCK_RETRY_DELAY = 0.2
+
+
+class AsyncRedisClient:
+    """
+    Coroutine counterpart of RedisClient for the aio server
+    Keys, values and lock tokens are the same, so both servers share the cache
+    Connections are bound to the event loop which first uses them
+    """
+
+    def __init__(self):
+        self.redis_host = settings.redis_host
+        self.redis_port = settings.redis_port
+        self.redis_db = settings.redis_db
+        self.client = redis.Redis(
+            host=self.redis_host, port=self.redis_port, db=self.redis_db
+        )
+        self.retry_count = LOCK_RETRY_COUNT
+        self.retry_delay = LOCK_RETRY_DELAY
+        self.acquire_locks_script = self.register_script(ACQUIRE_LOCKS_SCRIPT)
+        self.release_locks_script = self.register_script(RELEASE_LOCKS_SCRIPT)
+
+    async def get(self, key) -> Any:
+        return await self.client.get(key)
+
+    async def set(self, key, value, ex=None):
+        await self.client.set(key, value, ex=ex)
+
+    async def mget(self, keys) -> list:
+        """
+        Get many keys in one round-trip, missing keys are None
+        """
+        if not keys:
+            return []
+        return await self.client.mget(keys)
+
+    async def set_many(self, mapping: Dict[str, Any], ex=None, nx=False):
+        """
+        Set many keys with the same TTL in one pipelined round-trip
+        """
+        if not mapping:
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipeline.set(key, value, ex=ex, nx=nx)
+        await pipeline.execute()
+
+    async def delete(self, *keys) -> int:
+        """
+        Delete many keys with one DEL
+        """
+        if not keys:
+            return 0
+        return await self.client.delete(*keys)
+
+    def pipeline(self) -> Pipeline:
+        """
+        Buffer commands and send them in one round-trip on execute()
+        """
+        return self.client.pipeline(transaction=False)
+
+    async def get_versions(self, keys) -> List[int]:
+        return [int(version) if version else 0 for version in await self.mget(keys)]
+
+    def register_script(self, script: str) -> AsyncScript:
+        """
+        Register a Lua script, it is sent by sha and loaded on first use
+        """
+        return self.client.register_script(script)
+
+    def get_unique_id(self) -> bytes:
+        # Lock tokens are compared as bytes, like the Redlock ones
+        return uuid.uuid4().hex.encode()
+
+    async def publish(self, channel: str, message: str) -> int:
+        return await self.client.publish(channel, message)
+
+    async def acquire_locks(self, keys: List[str], ttl: int) -> Optional[MultiLock]:
+        """
+        Acquire all keys or none of them, retrying like RedisClient.acquire_locks
+        without blocking the event loop between attempts
+        """
+        resources = list(dict.fromkeys(keys))
+        token = self.get_unique_id()
+        for retry in range(self.retry_count):
+            if await self.acquire_locks_script(keys=resources, args=[token, ttl]):
+                return MultiLock(resources=resources, key=token)
+            if retry < self.retry_count - 1:
+                await asyncio.sleep(self.retry_delay)
+        return None
+
+    async def release_locks(self, lock: MultiLock) -> int:
+        """
+        Release the keys of the lock which are not expired or taken over
+        """
+        return await self.release_locks_script(keys=lock.resources, args=[lock.key])
+
+    async def try_acquire_lock(self, key: str, ttl: int) -> Optional[MultiLock]:
+        """
+        Acquire a short lease on a key without retrying, see
+        RedisClient.try_acquire_lock
+        """
+        token = self.get_unique_id()
+        if await self.client.set(key, token, px=ttl, nx=True):
+            return MultiLock(resources=[key], key=token)
+        return None
+
+    async def close(self):
+        await self.client.aclose()
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.config import settings
+from src.services.async_redis_client import AsyncRedisClient
+from src.services.single_flight import get_single_flight_key
+
+
+class AsyncSingleFlight:
+    """
+    Coroutine counterpart of SingleFlight for the aio server
+    Callers of the event loop wait for one task computing the value, and the
+    Redis lease is shared with the thread server so replicas of both coalesce
+    """
+
+    def __init__(self, redis_client: AsyncRedisClient):
+        self.redis_client = redis_client
+        self.futures: Dict[str, asyncio.Task] = {}
+
+    async def do(
+        self,
+        key: str,
+        get: Callable[[], Awaitable[Optional[Any]]],
+        compute: Callable[[], Awaitable[Any]],
+        get_stale: Optional[Callable[[], Awaitable[Optional[Any]]]] = None,
+    ) -> Any:
+        """
+        Get the value of a key, computing it at most once at a time
+        Args:
+            key: Cache key of the value
+            get: Read the value from the cache, None on miss
+            compute: Compute and cache the value
+            get_stale: Read an older value served while another replica computes
+        Returns:
+            The value
+        """
+        value = await get()
+        if value is not None:
+            return value
+
+        # The event loop runs one coroutine at a time, so no lock is needed
+        task = self.futures.get(key)
+        if task is None:
+            # The computation is its own task, a cancelled caller only stops
+            # waiting for it and the other callers still get the value
+            task = self.futures[key] = asyncio.create_task(
+                self.compute_once(key, get, compute, get_stale)
+            )
+            task.add_done_callback(lambda task: self.done(key, task))
+        return await asyncio.shield(task)
+
+    def done(self, key: str, task: asyncio.Task):
+        del self.futures[key]
+        # Mark it retrieved, the callers get it from the task if any is left
+        if not task.cancelled():
+            task.exception()
+
+    async def compute_once(
+        self,
+        key: str,
+        get: Callable[[], Awaitable[Optional[Any]]],
+        compute: Callable[[], Awaitable[Any]],
+        get_stale: Optional[Callable[[], Awaitable[Optional[Any]]]],
+    ) -> Any:
+        # The previous flight may have cached it just before this one started
+        value = await get()
+        if value is not None:
+            return value
+
+        lock = await self.redis_client.try_acquire_lock(
+            get_single_flight_key(key), settings.single_flight_lease_ms
+        )
+        if lock is None:
+            # Another replica is computing it
+            if get_stale is not None and settings.serve_stale_while_revalidate:
+                value = await get_stale()
+                if value is not None:
+                    return value
+
+            deadline = time.monotonic() + settings.single_flight_lease_ms / 1000
+            while time.monotonic() < deadline:
+                await asyncio.sleep(settings.single_flight_poll_ms / 1000)
+                value = await get()
+                if value is not None:
+                    return value
+
+            # The lease expired before the value was cached, compute it here
+            return await compute()
+
+        try:
+            return await compute()
+        finally:
+            await self.redis_client.release_locks(lock)
@@ -0,0 +1,72 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.config import settings
+from src.entities.rooms import Room
+
+
+class AvailabilityExecutor:
+    """
+    Run CPU heavy availability computation of a room
+    Small rooms run on threads, big rooms can be offloaded to a process pool
+    so they don't hold the GIL of the gRPC server
+    The function receives (row, col, occupancy bitmap, *args) so only compact
+    bytes are pickled, never pydantic objects
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        offload_min_seats: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.mode = mode or settings.availability_executor
+        if self.mode not in ("thread", "process"):
+            raise ValueError(f"Availability executor {self.mode} is not supported")
+
+        self.offload_min_seats = (
+            settings.availability_offload_min_seats
+            if offload_min_seats is None
+            else offload_min_seats
+        )
+        self.max_workers = max_workers or settings.availability_worker_count
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+
+    def is_offloaded(self, room: Room) -> bool:
+        return self.mode == "process" and room.row * room.col >= self.offload_min_seats
+
+    def get_process_pool(self) -> ProcessPoolExecutor:
+        # Spawn workers, forking a process with gRPC and DB threads is unsafe
+        if self.process_pool is None:
+            self.process_pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self.process_pool
+
+    def submit(self, fn: Callable[..., Any], room: Room, *args) -> Future:
+        """
+        Schedule fn(row, col, bitmap, *args) for the room
+        """
+        if self.is_offloaded(room):
+            return self.get_process_pool().submit(
+                fn, room.row, room.col, bytes(room.occupancy.bitmap), *args
+            )
+        return self.thread_pool.submit(
+            fn, room.row, room.col, room.occupancy.bitmap, *args
+        )
+
+    def run(self, fn: Callable[..., Any], room: Room, *args) -> Any:
+        """
+        Run fn(row, col, bitmap, *args) for the room, inline if it isn't offloaded
+        """
+        if self.is_offloaded(room):
+            return self.submit(fn, room, *args).result()
+        return fn(room.row, room.col, room.occupancy.bitmap, *args)
+
+    def shutdown(self):
+        self.thread_pool.shutdown(wait=False)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False)
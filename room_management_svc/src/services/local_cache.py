@@ -0,0 +1,186 @@
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+from src.config import settings
+from src.services.async_redis_client import AsyncRedisClient
+from src.services.redis_client import RedisClient
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def get_size(value: Any) -> int:
+    """
+    Estimated bytes of a cached value, arrays and indexes report their buffer,
+    lists are estimated from their first item
+    """
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, (list, tuple)) and value:
+        return sys.getsizeof(value) + len(value) * get_size(value[0])
+    return sys.getsizeof(value)
+
+
+class LocalCache:
+    """
+    In-process LRU cache with TTL in front of Redis
+    Values are kept decoded, so a hit costs no network hop and no parsing
+    Callers must not mutate the values they get
+    Entries are bounded by count and by estimated bytes, a value larger than
+    max_bytes is not kept
+    Keys dropped by any replica are published on a Redis channel and dropped
+    by every subscribed replica, the TTL bounds staleness if a message is lost
+    """
+
+    def __init__(self, max_size: int, ttl: float, max_bytes: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # (expires, value, size) by key, size is the estimate of get_size
+        self.entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped on every delete, a reader that started before it doesn't set
+        self.epoch = 0
+        self.redis_client: Optional[RedisClient] = None
+        self.subscriber: Optional[threading.Thread] = None
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self.pop(key)
+                    self.evictions += 1
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_epoch(self) -> int:
+        return self.epoch
+
+    def set(self, key: str, value: Any, epoch: Optional[int] = None):
+        """
+        Cache a value, pass the epoch taken before reading it from Redis or the
+        database so a value read before a concurrent invalidation is not kept
+        """
+        if self.max_size <= 0 or value is None:
+            return
+
+        size = get_size(value)
+        with self.lock:
+            if epoch is not None and epoch != self.epoch:
+                return
+            self.pop(key)
+            if size > self.max_bytes:
+                return
+            self.entries[key] = (time.monotonic() + self.ttl, value, size)
+            self.bytes += size
+            while len(self.entries) > self.max_size or self.bytes > self.max_bytes:
+                self.pop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def pop(self, key: str):
+        # Callers hold the lock
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def delete(self, *keys: str):
+        with self.lock:
+            self.epoch += 1
+            for key in keys:
+                self.pop(key)
+
+    def clear(self):
+        with self.lock:
+            self.epoch += 1
+            self.entries.clear()
+            self.bytes = 0
+
+    def invalidate(self, keys: List[str]):
+        """
+        Drop keys here and publish them to the other replicas
+        """
+        if not keys:
+            return
+
+        self.delete(*keys)
+        if self.redis_client is None:
+            self.redis_client = RedisClient()
+        self.redis_client.client.publish(settings.local_cache_channel, json.dumps(keys))
+
+    async def invalidate_async(self, keys: List[str], redis_client: AsyncRedisClient):
+        """
+        Same as invalidate, published with the client of the running event loop
+        """
+        if not keys:
+            return
+
+        self.delete(*keys)
+        await redis_client.publish(settings.local_cache_channel, json.dumps(keys))
+
+    def subscribe(self):
+        """
+        Listen for keys dropped by other replicas in a daemon thread
+        """
+        if self.subscriber is not None:
+            return
+
+        if self.redis_client is None:
+            self.redis_client = RedisClient()
+        pubsub = self.redis_client.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(
+            **{
+                settings.local_cache_channel: lambda message: self.delete(
+                    *json.loads(message["data"])
+                )
+            }
+        )
+        # Drop what may have been missed before the subscription
+        self.clear()
+        self.subscriber = pubsub.run_in_thread(
+            sleep_time=1,
+            daemon=True,
+            exception_handler=lambda error, pubsub, thread: logger.error(
+                f"Local cache invalidation failed: {error}"
+            ),
+        )
+
+    def get_stats(self) -> CacheStats:
+        with self.lock:
+            return CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                size=len(self.entries),
+            )
+
+
+# Create a singleton instance of the cache shared by the repositories of the process
+local_cache = LocalCache(
+    max_size=settings.local_cache_size,
+    ttl=settings.local_cache_ttl,
+    max_bytes=settings.local_cache_max_bytes,
+)
@@ -1,9 +1,44 @@
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
 import redis
+from redis.client import Pipeline
+from redis.commands.core import Script
 from redis.typing import ResponseT
 from redlock import Lock, Redlock
 
 from src.config import settings
 
+# Set every key with the same token, or none of them if any is already locked
+ACQUIRE_LOCKS_SCRIPT = """
+for i = 1, #KEYS do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        return 0
+    end
+end
+for i = 1, #KEYS do
+    redis.call('SET', KEYS[i], ARGV[1], 'PX', ARGV[2])
+end
+return 1
+"""
+
+# Delete only the keys still holding the token of the lock
+RELEASE_LOCKS_SCRIPT = """
+local released = 0
+for i = 1, #KEYS do
+    if redis.call('GET', KEYS[i]) == ARGV[1] then
+        redis.call('DEL', KEYS[i])
+        released = released + 1
+    end
+end
+return released
+"""
+
+
+class MultiLock(NamedTuple):
+    resources: List[str]
+    key: bytes
+
 
 class RedisClient:
     def __init__(self):
@@ -16,6 +51,8 @@ class RedisClient:
         self.dlm = Redlock(
             [{"host": self.redis_host, "port": self.redis_port, "db": self.redis_db}]
         )
+        self.acquire_locks_script = self.register_script(ACQUIRE_LOCKS_SCRIPT)
+        self.release_locks_script = self.register_script(RELEASE_LOCKS_SCRIPT)
 
     def get(self, key) -> ResponseT:
         return self.client.get(key)
@@ -23,15 +60,98 @@ class RedisClient:
     def set(self, key, value, ex=None):
         self.client.set(key, value, ex=ex)
 
-    def delete_by_pattern(self, pattern):
+    def mget(self, keys) -> list:
+        """
+        Get many keys in one round-trip, missing keys are None
+        """
+        if not keys:
+            return []
+        return self.client.mget(keys)
+
+    def set_many(self, mapping: Dict[str, Any], ex=None, nx=False):
         """
-        Delete keys by pattern
+        Set many keys with the same TTL in one pipelined round-trip
         """
-        for key in self.client.scan_iter(match=pattern):
-            self.client.delete(key)
+        if not mapping:
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipeline.set(key, value, ex=ex, nx=nx)
+        pipeline.execute()
+
+    def delete(self, *keys) -> int:
+        """
+        Delete many keys with one DEL
+        """
+        if not keys:
+            return 0
+        return self.client.delete(*keys)
+
+    def pipeline(self) -> Pipeline:
+        """
+        Buffer commands and send them in one round-trip on execute()
+        """
+        return self.client.pipeline(transaction=False)
+
+    def get_version(self, key) -> int:
+        """
+        Get a generation counter, a missing counter is version 0
+        """
+        version = self.client.get(key)
+        return int(version) if version else 0
+
+    def get_versions(self, keys) -> List[int]:
+        return [int(version) if version else 0 for version in self.mget(keys)]
+
+    def incr(self, key) -> int:
+        return self.client.incr(key)
+
+    def register_script(self, script: str) -> Script:
+        """
+        Register a Lua script, it is sent by sha and loaded on first use
+        """
+        return self.client.register_script(script)
 
     def acquire_lock(self, key, ttl) -> Lock:
         return self.dlm.lock(key, ttl)
 
     def release_lock(self, lock):
         self.dlm.unlock(lock)
+
+    def acquire_locks(self, keys: List[str], ttl: int) -> Optional[MultiLock]:
+        """
+        Acquire all keys or none of them in a single round-trip per attempt
+        Args:
+            keys: Keys to lock
+            ttl: Time to live of the locks in milliseconds, same as acquire_lock
+        Returns:
+            MultiLock to release, None if any key is locked after all retries
+        """
+        resources = list(dict.fromkeys(keys))
+        token = self.dlm.get_unique_id()
+        for retry in range(self.dlm.retry_count):
+            if self.acquire_locks_script(keys=resources, args=[token, ttl]):
+                return MultiLock(resources=resources, key=token)
+            if retry < self.dlm.retry_count - 1:
+                time.sleep(self.dlm.retry_delay)
+        return None
+
+    def release_locks(self, lock: MultiLock) -> int:
+        """
+        Release the keys of the lock which are not expired or taken over
+        """
+        return self.release_locks_script(keys=lock.resources, args=[lock.key])
+
+    def try_acquire_lock(self, key: str, ttl: int) -> Optional[MultiLock]:
+        """
+        Acquire a short lease on a key without retrying
+        Args:
+            key: Key to lock
+            ttl: Time to live of the lock in milliseconds
+        Returns:
+            MultiLock to release with release_locks, None if the key is locked
+        """
+        token = self.dlm.get_unique_id()
+        if self.client.set(key, token, px=ttl, nx=True):
+            return MultiLock(resources=[key], key=token)
+        return None
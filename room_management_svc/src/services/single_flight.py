@@ -0,0 +1,104 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from src.config import settings
+from src.services.redis_client import RedisClient
+
+
+def get_single_flight_key(key: str) -> str:
+    # Redis lease of a computation, shared by the thread and aio servers
+    return f"single_flight_{key}"
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent computations of the same cache key
+    Callers of one process wait for the future of the first caller, and one
+    replica at a time holds a short Redis lease to compute it while the others
+    poll the cache, so a miss under load costs one computation instead of one
+    per request
+    """
+
+    def __init__(self, redis_client: RedisClient):
+        self.redis_client = redis_client
+        self.futures: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+
+    def do(
+        self,
+        key: str,
+        get: Callable[[], Optional[Any]],
+        compute: Callable[[], Any],
+        get_stale: Optional[Callable[[], Optional[Any]]] = None,
+    ) -> Any:
+        """
+        Get the value of a key, computing it at most once at a time
+        Args:
+            key: Cache key of the value
+            get: Read the value from the cache, None on miss
+            compute: Compute and cache the value
+            get_stale: Read an older value served while another replica computes
+        Returns:
+            The value
+        """
+        value = get()
+        if value is not None:
+            return value
+
+        with self.lock:
+            future = self.futures.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self.futures[key] = Future()
+        if not is_leader:
+            return future.result()
+
+        try:
+            value = self.compute_once(key, get, compute, get_stale)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise e
+        finally:
+            with self.lock:
+                del self.futures[key]
+
+    def compute_once(
+        self,
+        key: str,
+        get: Callable[[], Optional[Any]],
+        compute: Callable[[], Any],
+        get_stale: Optional[Callable[[], Optional[Any]]],
+    ) -> Any:
+        # The previous flight may have cached it just before this one started
+        value = get()
+        if value is not None:
+            return value
+
+        lock = self.redis_client.try_acquire_lock(
+            get_single_flight_key(key), settings.single_flight_lease_ms
+        )
+        if lock is None:
+            # Another replica is computing it
+            if get_stale is not None and settings.serve_stale_while_revalidate:
+                value = get_stale()
+                if value is not None:
+                    return value
+
+            deadline = time.monotonic() + settings.single_flight_lease_ms / 1000
+            while time.monotonic() < deadline:
+                time.sleep(settings.single_flight_poll_ms / 1000)
+                value = get()
+                if value is not None:
+                    return value
+
+            # The lease expired before the value was cached, compute it here
+            return compute()
+
+        try:
+            return compute()
+        finally:
+            self.redis_client.release_locks(lock)
@@ -0,0 +1,609 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config import settings
+from src.entities.rooms import Room, RoomRecord, SeatLike
+from src.entities.seats import SeatRecord, SeatRejection
+from src.repositories.async_availability_repository import AsyncAvailabilityRepository
+from src.repositories.async_room_repository import AsyncRoomRepository
+from src.repositories.async_seat_repository import AsyncSeatRepository
+from src.repositories.cache_keys import (
+    ROOM_REQUESTS_KEY,
+    get_available_seats_key,
+    get_blocked_counts_key,
+)
+from src.services.async_redis_client import AsyncRedisClient
+from src.services.async_single_flight import AsyncSingleFlight
+from src.services.local_cache import local_cache
+from src.use_cases.availability_engine import (
+    Rect,
+    clip_rect,
+    compute_blocked_counts,
+    compute_distance_map,
+    get_available_intervals,
+    get_available_intervals_in_halo,
+    get_available_mask_from_distance_map,
+    get_available_positions,
+    get_blocking_radius,
+    get_halo_rect,
+    get_occupancy,
+    iter_available_seats,
+    slice_available_intervals,
+)
+from src.use_cases.room_management import (
+    BaseRoomManagement,
+    CachedResult,
+    get_canceled_seat_ids,
+)
+from src.use_cases.seat_index import RotatedPrefixSumIndex
+
+
+class AsyncRoomManagement(BaseRoomManagement):
+    """
+    Awaitable use cases of the aio server
+    Database and cache I/O are coroutines over asyncpg and redis.asyncio, the
+    keys, scripts and computations are the ones of RoomManagement so both
+    servers share the state. CPU bound work runs on the availability executor
+    or a worker thread so the event loop only waits for it
+    """
+
+    def __init__(self):
+        redis_client = AsyncRedisClient()
+        super().__init__(
+            AsyncRoomRepository(),
+            AsyncSeatRepository(),
+            AsyncAvailabilityRepository(),
+            redis_client,
+            AsyncSingleFlight(redis_client),
+        )
+
+    async def add_room(self, row: int, col: int) -> Optional[Room]:
+        return await self.room_repository.add_room(row=row, col=col)
+
+    async def remove_room(self, room_id: int):
+        await self.redis_client.client.zrem(ROOM_REQUESTS_KEY, room_id)
+        await self.room_repository.remove_room(room_id=room_id)
+
+    async def list_rooms(self) -> List[RoomRecord]:
+        return await self.room_repository.list_rooms()
+
+    async def get_room(self, room_id: int) -> Optional[Room]:
+        return await self.room_repository.get_room(room_id=room_id)
+
+    async def get_rooms(self, room_ids: List[int]) -> Dict[int, Room]:
+        return await self.room_repository.get_rooms(room_ids=room_ids)
+
+    async def list_room_seats(self, room_id: int) -> List[SeatRecord]:
+        return await self.seat_repository.list_seats_by_room_id(room_id=room_id)
+
+    async def run(self, fn: Callable[..., Any], room: Room, *args) -> Any:
+        """
+        Run fn(row, col, bitmap, *args) for the room on the availability executor
+        """
+        return await asyncio.wrap_future(
+            self.availability_executor.submit(fn, room, *args)
+        )
+
+    async def get_cached(
+        self, key: str, loads: Callable[[bytes], Any]
+    ) -> Optional[Any]:
+        """
+        Get a result from the process, then from Redis, see
+        RoomManagement.get_cached
+        """
+        value = local_cache.get(key)
+        if value is not None:
+            return value
+
+        cached_value = await self.redis_client.get(key)
+        if cached_value is None:
+            return None
+        value = loads(cached_value)
+        local_cache.set(key, value)
+        return value
+
+    async def set_cached(self, key: str, value: Any, dumps: Callable[[Any], Any]):
+        await self.redis_client.set(key, dumps(value), ex=settings.redis_key_ttl)
+        local_cache.set(key, value)
+
+    async def get_or_compute(
+        self, room: Room, result: CachedResult, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Get a result of the current room version, computing it once at a time,
+        see RoomManagement.get_or_compute
+        """
+        version = await self.seat_repository.get_room_version(room.id)
+        key = result.room_key(version)
+
+        async def compute_and_cache() -> Any:
+            value = await compute()
+            await self.set_cached(key, value, result.dumps)
+            return value
+
+        return await self.single_flight.do(
+            key,
+            get=lambda: self.get_cached(key, result.loads),
+            compute=compute_and_cache,
+            get_stale=(
+                (lambda: self.get_cached(result.room_key(version - 1), result.loads))
+                if version > 0
+                else None
+            ),
+        )
+
+    async def get_room_available_seats(
+        self, room: Room, min_distance: int
+    ) -> List[Tuple[int, int]]:
+        # The configured min_distance is served from the state updated in place
+        if min_distance == settings.min_distance:
+            available = await self.get_room_available_mask(
+                room=room, min_distance=min_distance
+            )
+            return await asyncio.to_thread(get_available_positions, available)
+
+        # Threshold the distance map, it is shared by every min_distance
+        async def compute() -> List[Tuple[int, int]]:
+            available = get_available_mask_from_distance_map(
+                await self.get_room_distance_map(room=room), min_distance=min_distance
+            )
+            return await asyncio.to_thread(get_available_positions, available)
+
+        return await self.get_or_compute(
+            room,
+            self.get_available_seats_result(room=room, min_distance=min_distance),
+            compute,
+        )
+
+    async def get_rooms_available_seats(
+        self, rooms: List[Room], min_distance: int
+    ) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Available seats of many rooms, see RoomManagement.get_rooms_available_seats
+        """
+        available_seats: Dict[int, List[Tuple[int, int]]] = {}
+        versions = await self.seat_repository.get_room_versions(
+            [room.id for room in rooms]
+        )
+
+        # The configured min_distance is served from the state updated in place
+        is_state = min_distance == settings.min_distance
+        if is_state:
+            for (
+                room_id,
+                blocked_counts,
+            ) in (
+                await self.availability_repository.get_many_blocked_counts(
+                    rooms=rooms, min_distance=min_distance, versions=versions
+                )
+            ).items():
+                available_seats[room_id] = await asyncio.to_thread(
+                    get_available_positions, blocked_counts == 0
+                )
+        else:
+            available_seats = self.decode_rooms_available_seats(
+                rooms,
+                await self.redis_client.mget(
+                    [
+                        get_available_seats_key(
+                            room.id, versions[room.id], min_distance
+                        )
+                        for room in rooms
+                    ]
+                ),
+            )
+
+        missing_rooms = [room for room in rooms if room.id not in available_seats]
+        if not missing_rooms:
+            return available_seats
+
+        # Get all seats of the missing rooms
+        room_seats = await self.seat_repository.list_seats_by_room_ids(
+            room_ids=[room.id for room in missing_rooms], versions=versions
+        )
+        for room in missing_rooms:
+            room.add_seats(room_seats[room.id])
+
+        # Compute the misses in parallel
+        missing_blocked_counts: Dict[int, np.ndarray] = dict(
+            zip(
+                [room.id for room in missing_rooms],
+                await asyncio.gather(
+                    *[
+                        self.run(compute_blocked_counts, room, min_distance)
+                        for room in missing_rooms
+                    ]
+                ),
+            )
+        )
+        for room in missing_rooms:
+            available_seats[room.id] = await asyncio.to_thread(
+                get_available_positions, missing_blocked_counts[room.id] == 0
+            )
+
+        # Cache the results in one round-trip
+        if is_state:
+            await self.availability_repository.set_many_blocked_counts(
+                rooms=missing_rooms,
+                min_distance=min_distance,
+                counts=missing_blocked_counts,
+                versions=versions,
+            )
+        else:
+            await self.redis_client.set_many(
+                self.encode_rooms_available_seats(
+                    missing_rooms, min_distance, available_seats, versions
+                ),
+                ex=settings.redis_key_ttl,
+            )
+        return available_seats
+
+    async def get_room_available_mask(
+        self, room: Room, min_distance: int
+    ) -> np.ndarray:
+        # The configured min_distance is served from the state updated in place
+        if min_distance == settings.min_distance:
+            return (
+                await self.get_room_blocked_counts(room=room, min_distance=min_distance)
+                == 0
+            )
+
+        # Threshold the distance map, it is shared by every min_distance
+        return get_available_mask_from_distance_map(
+            await self.get_room_distance_map(room=room), min_distance=min_distance
+        )
+
+    async def count_room_available_seats(self, room: Room, min_distance: int) -> int:
+        return await self.get_or_compute(
+            room,
+            self.get_available_count_result(room=room, min_distance=min_distance),
+            lambda: self.compute_room_available_count(
+                room=room, min_distance=min_distance
+            ),
+        )
+
+    async def compute_room_available_count(self, room: Room, min_distance: int) -> int:
+        count = self.get_trivial_available_count(
+            room=room,
+            list_room_seats=await self.list_room_seats(room_id=room.id),
+            min_distance=min_distance,
+        )
+        if count is None:
+            count = int(
+                np.count_nonzero(
+                    await self.get_room_available_mask(
+                        room=room, min_distance=min_distance
+                    )
+                )
+            )
+        return count
+
+    async def get_room_available_intervals(
+        self, room: Room, min_distance: int
+    ) -> List[Tuple[int, int, int]]:
+        async def compute() -> List[Tuple[int, int, int]]:
+            return await asyncio.to_thread(
+                get_available_intervals,
+                await self.get_room_available_mask(
+                    room=room, min_distance=min_distance
+                ),
+            )
+
+        return await self.get_or_compute(
+            room,
+            self.get_available_intervals_result(room=room, min_distance=min_distance),
+            compute,
+        )
+
+    async def get_room_available_intervals_in_rect(
+        self,
+        room: Room,
+        min_distance: int,
+        row_start: int,
+        row_end: int,
+        col_start: int,
+        col_end: int,
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Available intervals of a viewport, clipped to the room, see
+        RoomManagement.get_room_available_intervals_in_rect
+        """
+        rect = clip_rect(
+            room.row, room.col, Rect(row_start, row_end, col_start, col_end)
+        )
+        if rect is None:
+            return []
+
+        # Slice the cached intervals of the whole room if there are
+        result = self.get_available_intervals_result(
+            room=room, min_distance=min_distance
+        )
+        available_intervals = await self.get_cached(
+            result.room_key(await self.seat_repository.get_room_version(room.id)),
+            result.loads,
+        )
+        if available_intervals is not None:
+            return slice_available_intervals(available_intervals, rect)
+
+        # Only the taken seats of the viewport plus a halo of the blocking radius
+        halo = get_halo_rect(
+            room.row, room.col, rect, get_blocking_radius(min_distance)
+        )
+        return await asyncio.to_thread(
+            get_available_intervals_in_halo,
+            await self.seat_repository.list_seats_in_rect(room.id, *halo),
+            halo=halo,
+            rect=rect,
+            min_distance=min_distance,
+        )
+
+    async def iter_room_available_seats(
+        self, room: Room, min_distance: int, chunk_rows: int
+    ) -> AsyncIterator[Tuple[int, int, List[Tuple[int, int]]]]:
+        # Get all seats in the room
+        list_room_seats = await self.list_room_seats(room_id=room.id)
+        room.add_seats(list_room_seats)
+
+        # Every chunk is computed in a worker thread, one chunk at a time
+        chunks = iter_available_seats(
+            get_occupancy(room), min_distance=min_distance, chunk_rows=chunk_rows
+        )
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    async def get_room_prefix_sum_index(
+        self, room: Room, list_room_seats: List[SeatLike]
+    ) -> RotatedPrefixSumIndex:
+        async def compute() -> RotatedPrefixSumIndex:
+            room.add_seats(list_room_seats)
+            return await asyncio.to_thread(
+                RotatedPrefixSumIndex.from_occupancy, get_occupancy(room)
+            )
+
+        return await self.get_or_compute(
+            room, self.get_prefix_sum_result(room), compute
+        )
+
+    async def get_room_distance_map(self, room: Room) -> np.ndarray:
+        async def compute() -> np.ndarray:
+            # Get all seats in the room
+            list_room_seats = await self.list_room_seats(room_id=room.id)
+            room.add_seats(list_room_seats)
+            return await self.run(compute_distance_map, room)
+
+        return await self.get_or_compute(
+            room, self.get_distance_map_result(room), compute
+        )
+
+    async def get_room_blocked_counts(
+        self, room: Room, min_distance: int
+    ) -> np.ndarray:
+        # The decoded state is kept in process under the version read here
+        version = await self.seat_repository.get_room_version(room.id)
+
+        async def compute() -> np.ndarray:
+            # Get all seats in the room, at least as new as the version
+            list_room_seats = await self.seat_repository.list_seats_by_room_id(
+                room_id=room.id, version=version
+            )
+            room.add_seats(list_room_seats)
+
+            blocked_counts = await self.run(compute_blocked_counts, room, min_distance)
+            await self.availability_repository.set_blocked_counts(
+                room=room,
+                min_distance=min_distance,
+                counts=blocked_counts,
+                version=version,
+            )
+            return blocked_counts
+
+        # The state is rebuilt once at a time, it is never stale so no fallback
+        return await self.single_flight.do(
+            get_blocked_counts_key(room.id, min_distance),
+            get=lambda: self.availability_repository.get_blocked_counts(
+                room=room, min_distance=min_distance, version=version
+            ),
+            compute=compute,
+        )
+
+    async def update_room_occupancy(
+        self,
+        room: Room,
+        seats: List[Tuple[int, int]],
+        taken: bool,
+        seat_ids: Optional[List[int]] = None,
+    ):
+        """
+        Apply reserved or canceled seats to the occupancy bitmap and the blocked
+        counts of the room, see RoomManagement.update_room_occupancy
+        """
+        if not seats:
+            return
+        # Only the diamond around every changed seat is touched, the cached
+        # seats are deleted by the same script
+        if not await self.availability_repository.update_blocked_counts(
+            room=room,
+            min_distance=settings.min_distance,
+            seats=seats,
+            taken=taken,
+            radius=get_blocking_radius(settings.min_distance),
+            deleted_keys=self.seat_repository.get_seat_keys(room.id, seat_ids),
+        ):
+            self.log_blocked_counts_overflow(room)
+        await self.seat_repository.invalidate_room(room.id)
+        self.notify_room_changed(room.id)
+
+    async def flush_room_requests(self):
+        """
+        Add the counted reads to room_requests with one pipelined round-trip
+        """
+        room_requests = self.pop_room_requests()
+        if not room_requests:
+            return
+        pipeline = self.redis_client.pipeline()
+        for room_id, count in room_requests.items():
+            pipeline.zincrby(ROOM_REQUESTS_KEY, count, room_id)
+        await pipeline.execute()
+
+    async def warm_hot_rooms(self):
+        """
+        Refresh the availability of the most requested rooms in the background
+        """
+        if settings.availability_warm_rooms <= 0:
+            return
+        for room_id in await self.redis_client.client.zrevrange(
+            ROOM_REQUESTS_KEY, 0, settings.availability_warm_rooms - 1
+        ):
+            self.availability_refresher.notify(int(room_id), delay=0)
+
+    async def refresh_room_availability(self, room: Room, min_distance: int):
+        """
+        Compute and cache the availability readers ask for after a change
+        """
+        await self.list_room_seats(room_id=room.id)
+        await self.get_room_blocked_counts(room=room, min_distance=min_distance)
+        await self.count_room_available_seats(room=room, min_distance=min_distance)
+        await self.get_room_available_intervals(room=room, min_distance=min_distance)
+
+    async def validate_room_seats(
+        self,
+        room: Room,
+        seats: List[Tuple[int, int]],
+        min_distance: int,
+        snapshot: bool = True,
+    ) -> List[SeatRejection]:
+        """
+        Check requested seats against one read of the seats of the room,
+        see RoomManagement.validate_room_seats
+        """
+        list_room_seats = await self.list_room_seats(room.id) if snapshot else None
+        # The cached summed-area table is read here, a grid is built in the check
+        seat_index: Optional[RotatedPrefixSumIndex] = None
+        if list_room_seats is not None and self.uses_prefix_sum_index(
+            room=room, list_room_seats=list_room_seats
+        ):
+            seat_index = await self.get_room_prefix_sum_index(
+                room=room, list_room_seats=list_room_seats
+            )
+        return await asyncio.to_thread(
+            self.check_room_seats,
+            room=room,
+            seats=seats,
+            min_distance=min_distance,
+            list_room_seats=list_room_seats,
+            seat_index=seat_index,
+        )
+
+    async def reverse_room_seats(
+        self, room: Room, seats: List[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        # Lock all seats at once, with the keys of the thread server
+        lock = await self.redis_client.acquire_locks(
+            self.get_seat_lock_keys(room=room, seats=seats),
+            settings.redis_key_ttl,
+        )
+        if not lock:
+            raise Exception(
+                f"Failed to acquire lock for seats {seats} of room {room.id}"
+            )
+        try:
+            reserved_seats = await self.seat_repository.reverse_seats(
+                room_id=room.id, seats=seats
+            )
+            # Only the seats which were inserted are counted
+            await self.update_room_occupancy(
+                room=room, seats=reserved_seats, taken=True
+            )
+            return reserved_seats
+        finally:
+            # Unlock all seats
+            await self.redis_client.release_locks(lock)
+
+    async def check_and_reverse_room_seats(
+        self, room: Room, seats: List[Tuple[int, int]], min_distance: int
+    ) -> Tuple[List[Tuple[int, int]], List[SeatRejection]]:
+        """
+        Reserve seats by deciding on the occupancy bitmap of the room in Redis,
+        see RoomManagement.check_and_reverse_room_seats
+        """
+        radius = get_blocking_radius(min_distance)
+        rejected_seats = await self.availability_repository.check_and_reserve(
+            room=room, seats=seats, radius=radius
+        )
+        if rejected_seats is None:
+            # Build the bitmap from the seats of the current room version
+            version = await self.seat_repository.get_room_version(room.id)
+            room.add_seats(
+                await self.seat_repository.list_seats_by_room_id(
+                    room_id=room.id, version=version
+                )
+            )
+            await self.availability_repository.set_occupancy(room, version=version)
+            rejected_seats = await self.availability_repository.check_and_reserve(
+                room=room, seats=seats, radius=radius
+            )
+        if rejected_seats is None:
+            # A write changed the room during the build, take the seat locks
+            rejections = await self.validate_room_seats(
+                room=room, seats=seats, min_distance=min_distance
+            )
+            if rejections:
+                return [], rejections
+            return await self.reverse_room_seats(room=room, seats=seats), []
+        if rejected_seats:
+            return [], self.get_rejected_seats(
+                seats=seats, rejected_seats=rejected_seats
+            )
+
+        try:
+            reserved_seats = await self.seat_repository.reverse_seats(
+                room_id=room.id, seats=seats
+            )
+        except Exception as e:
+            # Give the seats back, they were free before the script took them
+            await self.availability_repository.set_occupancy_bits(
+                room=room, seats=seats, taken=False
+            )
+            raise e
+        if len(reserved_seats) < len(set(seats)):
+            # The database had seats the bitmap didn't have, build it again
+            self.log_occupancy_behind(room)
+            await self.availability_repository.delete_occupancy(room)
+        # The bits of the reserved seats are already set, setting them again is a no-op
+        await self.update_room_occupancy(room=room, seats=reserved_seats, taken=True)
+        return reserved_seats, []
+
+    async def cancel_room_seats(
+        self, room: Room, seats: List[SeatLike]
+    ) -> List[Tuple[int, int]]:
+        # Lock all seats at once, with the keys of the thread server
+        lock = await self.redis_client.acquire_locks(
+            self.get_seat_lock_keys(
+                room=room, seats=[(seat.pos_x, seat.pos_y) for seat in seats]
+            ),
+            settings.redis_key_ttl,
+        )
+        if not lock:
+            raise Exception(
+                f"Failed to acquire lock for seats {[(seat.pos_x, seat.pos_y) for seat in seats]} of room {room.id}"
+            )
+        try:
+            # Only the seats which were deleted are given back
+            canceled_seats = await self.seat_repository.cancel_seats(
+                room_id=room.id, seats=seats
+            )
+            await self.update_room_occupancy(
+                room=room,
+                seats=canceled_seats,
+                taken=False,
+                seat_ids=get_canceled_seat_ids(seats, canceled_seats),
+            )
+            return canceled_seats
+        finally:
+            # Unlock all seats
+            await self.redis_client.release_locks(lock)
@@ -0,0 +1,16 @@
+from typing import List, Tuple
+
+from src.entities.seats import SeatRecord
+from src.repositories.async_seat_repository import AsyncSeatRepository
+
+
+class AsyncSeatManagement:
+    def __init__(self):
+        self.seat_repository = AsyncSeatRepository()
+
+    async def get_seats_with_room_id(
+        self, seat_ids: List[int], room_id: int
+    ) -> Tuple[List[SeatRecord], List[int]]:
+        return await self.seat_repository.get_seats_with_room_id(
+            seat_ids=seat_ids, room_id=room_id
+        )
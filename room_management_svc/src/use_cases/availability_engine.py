@@ -0,0 +1,363 @@
+import bisect
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.entities.rooms import Room
+
+# Distance maps are stored as uint16, farther seats are clipped to this value
+MAX_STORED_DISTANCE = np.iinfo(np.uint16).max
+
+
+def get_occupancy(room: Room) -> np.ndarray:
+    """
+    Boolean array (row, col), True for taken seats
+    """
+    return get_occupancy_from_bitmap(room.row, room.col, room.occupancy.bitmap)
+
+
+def get_occupancy_from_bitmap(row: int, col: int, bitmap: bytes) -> np.ndarray:
+    """
+    Boolean array (row, col) from a packed SeatOccupancy bitmap
+    """
+    bits = np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8), count=row * col)
+    return bits.reshape(row, col).astype(bool)
+
+
+def compute_blocked_counts(
+    row: int, col: int, bitmap: bytes, min_distance: int
+) -> np.ndarray:
+    """
+    get_blocked_counts from compact data, can run in a worker process
+    Counts are clipped to uint16, a clipped seat is blocked either way
+    """
+    blocked_counts = get_blocked_counts(
+        get_occupancy_from_bitmap(row, col, bitmap), min_distance
+    )
+    return np.minimum(blocked_counts, np.iinfo(np.uint16).max).astype(np.uint16)
+
+
+def compute_distance_map(row: int, col: int, bitmap: bytes) -> np.ndarray:
+    """
+    get_distance_map from compact data, can run in a worker process
+    """
+    return get_distance_map(get_occupancy_from_bitmap(row, col, bitmap))
+
+
+def get_blocking_radius(min_distance: int) -> int:
+    """
+    Seats within this manhattan distance of a taken seat are not available
+    A taken seat always blocks itself, even when min_distance is 0
+    """
+    return max(min_distance - 1, 0)
+
+
+def get_blocked_counts(occupancy: np.ndarray, min_distance: int) -> np.ndarray:
+    """
+    Count the taken seats closer than min_distance to every seat
+    Args:
+        occupancy: Boolean array (row, col), True for taken seats
+        min_distance: Minimum manhattan distance to every taken seat
+    Returns:
+        int32 array (row, col), seats with count 0 are available
+    """
+    rows, cols = occupancy.shape
+    counts = np.zeros((rows, cols), dtype=np.int32)
+
+    # Prefix sum per row so the taken seats in a column window are 2 lookups
+    prefix = np.zeros((rows, cols + 1), dtype=np.int32)
+    np.cumsum(occupancy, axis=1, out=prefix[:, 1:])
+    col_idx = np.arange(cols)
+
+    # The diamond |dx| + |dy| <= radius is a stack of horizontal windows
+    # of half width radius - |dx|, one per row offset dx
+    radius = min(get_blocking_radius(min_distance), rows - 1 + cols - 1)
+    max_offset = min(radius, rows - 1)
+    for offset in range(-max_offset, max_offset + 1):
+        width = radius - abs(offset)
+        lower = np.clip(col_idx - width, 0, cols)
+        upper = np.clip(col_idx + width + 1, 0, cols)
+        window = prefix[:, upper] - prefix[:, lower]
+
+        # Seat (x, y) is blocked by taken seats of row x + offset
+        if offset >= 0:
+            counts[: rows - offset] += window[offset:]
+        else:
+            counts[-offset:] += window[: rows + offset]
+
+    return counts
+
+
+def get_available_positions(available: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Sorted list of (pos_x, pos_y) of a boolean array, True for available seats
+    argwhere returns row-major order so the result is already sorted
+    """
+    return [(pos_x, pos_y) for pos_x, pos_y in np.argwhere(available).tolist()]
+
+
+def get_available_seats(
+    occupancy: np.ndarray, min_distance: int
+) -> List[Tuple[int, int]]:
+    """
+    Available seats of a room, the seats without taken seats closer than min_distance
+    Args:
+        occupancy: Boolean array (row, col), True for taken seats
+        min_distance: Minimum manhattan distance to every taken seat
+    Returns:
+        Sorted list of available (pos_x, pos_y)
+    """
+    return get_available_positions(get_blocked_counts(occupancy, min_distance) == 0)
+
+
+def iter_available_seats(
+    occupancy: np.ndarray, min_distance: int, chunk_rows: int
+) -> Iterator[Tuple[int, int, List[Tuple[int, int]]]]:
+    """
+    Yield available seats chunk by chunk of rows
+    A chunk only needs the taken seats of its rows plus a halo of
+    min_distance - 1 rows, so memory is bounded by the chunk size
+    Args:
+        occupancy: Boolean array (row, col), True for taken seats
+        min_distance: Minimum manhattan distance to every taken seat
+        chunk_rows: Number of rows per chunk
+    Returns:
+        Iterator of (row_start, row_end, sorted available (pos_x, pos_y)),
+        row_end is exclusive
+    """
+    rows = occupancy.shape[0]
+    radius = get_blocking_radius(min_distance)
+    chunk_rows = max(chunk_rows, 1)
+
+    for row_start in range(0, rows, chunk_rows):
+        row_end = min(row_start + chunk_rows, rows)
+        halo_start = max(row_start - radius, 0)
+        halo_end = min(row_end + radius, rows)
+
+        blocked_counts = get_blocked_counts(
+            occupancy[halo_start:halo_end], min_distance
+        )[row_start - halo_start : row_end - halo_start]
+        yield row_start, row_end, [
+            (pos_x + row_start, pos_y)
+            for pos_x, pos_y in get_available_positions(blocked_counts == 0)
+        ]
+
+
+def get_available_mask_in_rect(
+    occupancy: np.ndarray,
+    min_distance: int,
+    row_start: int,
+    row_end: int,
+    col_start: int,
+    col_end: int,
+) -> np.ndarray:
+    """
+    Available seats of a rectangle of the room
+    Only the taken seats within min_distance - 1 of the rectangle can block it,
+    so the work is proportional to the rectangle plus its halo
+    Args:
+        occupancy: Boolean array (row, col), True for taken seats
+        min_distance: Minimum manhattan distance to every taken seat
+        row_start, row_end: Rows of the rectangle, row_end is exclusive
+        col_start, col_end: Columns of the rectangle, col_end is exclusive
+    Returns:
+        Boolean array (row_end - row_start, col_end - col_start)
+    """
+    rows, cols = occupancy.shape
+    radius = get_blocking_radius(min_distance)
+    halo_row_start, halo_row_end = max(row_start - radius, 0), min(
+        row_end + radius, rows
+    )
+    halo_col_start, halo_col_end = max(col_start - radius, 0), min(
+        col_end + radius, cols
+    )
+
+    blocked_counts = get_blocked_counts(
+        occupancy[halo_row_start:halo_row_end, halo_col_start:halo_col_end],
+        min_distance,
+    )
+    return (
+        blocked_counts[
+            row_start - halo_row_start : row_end - halo_row_start,
+            col_start - halo_col_start : col_end - halo_col_start,
+        ]
+        == 0
+    )
+
+
+class Rect(NamedTuple):
+    """
+    Rectangle of a room, row_end and col_end are exclusive
+    """
+
+    row_start: int
+    row_end: int
+    col_start: int
+    col_end: int
+
+
+def clip_rect(row: int, col: int, rect: Rect) -> Optional[Rect]:
+    """
+    Clip a rectangle to a room of row x col, None if nothing is left
+    """
+    rect = Rect(
+        max(rect.row_start, 0),
+        min(rect.row_end, row),
+        max(rect.col_start, 0),
+        min(rect.col_end, col),
+    )
+    if rect.row_start >= rect.row_end or rect.col_start >= rect.col_end:
+        return None
+    return rect
+
+
+def get_halo_rect(row: int, col: int, rect: Rect, radius: int) -> Rect:
+    """
+    The rectangle plus a halo of radius around it, clipped to the room
+    """
+    return Rect(
+        max(rect.row_start - radius, 0),
+        min(rect.row_end + radius, row),
+        max(rect.col_start - radius, 0),
+        min(rect.col_end + radius, col),
+    )
+
+
+def slice_available_intervals(
+    available_intervals: List[Tuple[int, int, int]], rect: Rect
+) -> List[Tuple[int, int, int]]:
+    """
+    Clip sorted intervals (row, start_col, end_col) of a room to a rectangle
+    """
+    first = bisect.bisect_left(
+        available_intervals, rect.row_start, key=lambda interval: interval[0]
+    )
+    last = bisect.bisect_left(
+        available_intervals, rect.row_end, key=lambda interval: interval[0]
+    )
+    return [
+        (pos_x, max(start_col, rect.col_start), min(end_col, rect.col_end - 1))
+        for pos_x, start_col, end_col in available_intervals[first:last]
+        if start_col < rect.col_end and end_col >= rect.col_start
+    ]
+
+
+def get_available_intervals_in_halo(
+    taken_seats: List[Tuple[int, int]], halo: Rect, rect: Rect, min_distance: int
+) -> List[Tuple[int, int, int]]:
+    """
+    Available intervals of a rectangle from the taken seats of its halo
+    Args:
+        taken_seats: Taken (pos_x, pos_y) inside the halo
+        halo: The rectangle plus the blocking radius, see get_halo_rect
+        rect: Rectangle inside the halo
+        min_distance: Minimum manhattan distance to every taken seat
+    Returns:
+        Sorted list of (row, start_col, end_col) of the room, end_col is inclusive
+    """
+    occupancy = np.zeros(
+        (halo.row_end - halo.row_start, halo.col_end - halo.col_start), dtype=bool
+    )
+    for pos_x, pos_y in taken_seats:
+        occupancy[pos_x - halo.row_start, pos_y - halo.col_start] = True
+
+    available = get_available_mask_in_rect(
+        occupancy,
+        min_distance=min_distance,
+        row_start=rect.row_start - halo.row_start,
+        row_end=rect.row_end - halo.row_start,
+        col_start=rect.col_start - halo.col_start,
+        col_end=rect.col_end - halo.col_start,
+    )
+    return [
+        (pos_x + rect.row_start, start_col + rect.col_start, end_col + rect.col_start)
+        for pos_x, start_col, end_col in get_available_intervals(available)
+    ]
+
+
+def get_distance_map(occupancy: np.ndarray) -> np.ndarray:
+    """
+    Manhattan distance from every seat to the nearest taken seat
+    The L1 distance transform is separable, so one forward/backward sweep
+    along pos_x then one along pos_y gives the exact map in O(row*col)
+    Args:
+        occupancy: Boolean array (row, col), True for taken seats
+    Returns:
+        uint16 array (row, col), distances greater than MAX_STORED_DISTANCE are clipped
+    """
+    rows, cols = occupancy.shape
+    # Seats of a room without taken seats keep MAX_STORED_DISTANCE
+    distance = np.where(occupancy, 0, MAX_STORED_DISTANCE).astype(np.int32)
+
+    # Pass 1: distance to the nearest taken seat in the same column
+    for pos_x in range(1, rows):
+        np.minimum(distance[pos_x], distance[pos_x - 1] + 1, out=distance[pos_x])
+    for pos_x in range(rows - 2, -1, -1):
+        np.minimum(distance[pos_x], distance[pos_x + 1] + 1, out=distance[pos_x])
+
+    # Pass 2: combine columns, min over pos_y' of |pos_y - pos_y'| + pass 1
+    for pos_y in range(1, cols):
+        np.minimum(
+            distance[:, pos_y], distance[:, pos_y - 1] + 1, out=distance[:, pos_y]
+        )
+    for pos_y in range(cols - 2, -1, -1):
+        np.minimum(
+            distance[:, pos_y], distance[:, pos_y + 1] + 1, out=distance[:, pos_y]
+        )
+
+    return np.minimum(distance, MAX_STORED_DISTANCE).astype(np.uint16)
+
+
+def get_available_seats_from_distance_map(
+    distance_map: np.ndarray, min_distance: int
+) -> List[Tuple[int, int]]:
+    """
+    Threshold a distance map, taken seats (distance 0) are never available
+    Args:
+        distance_map: Result of get_distance_map
+        min_distance: Minimum manhattan distance to every taken seat
+    Returns:
+        Sorted list of available (pos_x, pos_y)
+    """
+    return get_available_positions(
+        get_available_mask_from_distance_map(distance_map, min_distance)
+    )
+
+
+def get_available_mask_from_distance_map(
+    distance_map: np.ndarray, min_distance: int
+) -> np.ndarray:
+    """
+    Boolean array (row, col), True for available seats
+    """
+    return distance_map >= max(min_distance, 1)
+
+
+def get_available_intervals(available: np.ndarray) -> List[Tuple[int, int, int]]:
+    """
+    Run-length encode available seats as horizontal intervals
+    Args:
+        available: Boolean array (row, col), True for available seats
+    Returns:
+        Sorted list of (row, start_col, end_col), end_col is inclusive
+    """
+    rows, cols = available.shape
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = available
+
+    # +1 where a run starts, -1 one column after a run ends
+    edges = np.diff(padded, axis=1)
+    starts = np.argwhere(edges == 1).tolist()
+    ends = np.argwhere(edges == -1).tolist()
+    return [
+        (pos_x, start_col, end_col - 1)
+        for (pos_x, start_col), (_, end_col) in zip(starts, ends)
+    ]
+
+
+def encode_distance_map(distance_map: np.ndarray) -> bytes:
+    return distance_map.astype(np.uint16).tobytes()
+
+
+def decode_distance_map(value: bytes, row: int, col: int) -> np.ndarray:
+    return np.frombuffer(value, dtype=np.uint16).reshape(row, col)
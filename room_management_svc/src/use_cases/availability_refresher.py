@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
+
+from loguru import logger
+
+from src.config import settings
+
+if TYPE_CHECKING:
+    from src.use_cases.async_room_management import AsyncRoomManagement
+    from src.use_cases.room_management import RoomManagement
+
+
+class AvailabilityRefresher:
+    """
+    Recompute availability of changed rooms in the background, so readers hit
+    a warm cache instead of paying the recompute after every booking
+    Changes of a room are debounced: the first change schedules a refresh after
+    the debounce, later changes before it are folded into it, so a room with
+    constant bookings is still refreshed once per debounce
+    The same thread flushes the reads of rooms counted in process
+    Coroutine use cases are run on the event loop the refresher was started from
+    """
+
+    def __init__(
+        self,
+        room_management: Union["RoomManagement", "AsyncRoomManagement"],
+        debounce_ms: Optional[int] = None,
+        flush_ms: Optional[int] = None,
+    ):
+        self.room_management = room_management
+        self.debounce = (
+            settings.availability_refresh_debounce_ms
+            if debounce_ms is None
+            else debounce_ms
+        ) / 1000
+        self.flush_interval = (
+            settings.availability_requests_flush_ms if flush_ms is None else flush_ms
+        ) / 1000
+        self.next_flush = time.monotonic() + self.flush_interval
+        self.pending: Dict[int, float] = {}
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        """
+        Start the background thread once
+        """
+        with self.condition:
+            if self.thread is None:
+                try:
+                    self.loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    self.loop = None
+                self.thread = threading.Thread(
+                    target=self.run, name="availability-refresher", daemon=True
+                )
+                self.thread.start()
+
+    def notify(self, room_id: int, delay: Optional[float] = None):
+        """
+        Schedule a refresh of the room
+        Args:
+            room_id: Changed room
+            delay: Seconds before the refresh, the debounce by default
+        """
+        self.start()
+        with self.condition:
+            deadline = time.monotonic() + (self.debounce if delay is None else delay)
+            self.pending[room_id] = min(self.pending.get(room_id, deadline), deadline)
+            self.condition.notify()
+
+    def get_due_rooms(self) -> List[int]:
+        # Wait until a refresh or the flush is due, then take every due room
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                due_room_ids = [
+                    room_id
+                    for room_id, deadline in self.pending.items()
+                    if deadline <= now
+                ]
+                if due_room_ids or self.next_flush <= now:
+                    for room_id in due_room_ids:
+                        del self.pending[room_id]
+                    return due_room_ids
+
+                self.condition.wait(
+                    min([*self.pending.values(), self.next_flush]) - now
+                )
+
+    def run(self):
+        while True:
+            room_ids = self.get_due_rooms()
+            if self.next_flush <= time.monotonic():
+                self.next_flush = time.monotonic() + self.flush_interval
+                try:
+                    self.call(self.room_management.flush_room_requests)
+                except Exception as e:
+                    logger.error(f"Failed to flush room requests: {e}")
+
+            for room_id in room_ids:
+                try:
+                    self.refresh(room_id)
+                except Exception as e:
+                    logger.error(
+                        f"Failed to refresh availability of room {room_id}: {e}"
+                    )
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call a use case from the thread, waiting for it on the event loop if it
+        is a coroutine
+        """
+        result = fn(*args, **kwargs)
+        if asyncio.iscoroutine(result):
+            return asyncio.run_coroutine_threadsafe(result, self.loop).result()
+        return result
+
+    def refresh(self, room_id: int):
+        room = self.call(self.room_management.get_room, room_id)
+        if not room:
+            return
+        self.call(
+            self.room_management.refresh_room_availability,
+            room=room,
+            min_distance=settings.min_distance,
+        )
@@ -1,209 +1,878 @@
-import json
-from typing import List, Optional, Tuple
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Counter,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from loguru import logger
 
 from src.config import settings
-from src.entities.rooms import Room
-from src.entities.seats import Seat
+from src.entities.rooms import Room, RoomRecord, SeatLike
+from src.entities.seats import SeatRecord, SeatRejection
+from src.repositories.availability_repository import (
+    SEAT_NOT_AVAILABLE,
+    SEAT_TOO_CLOSE,
+    AvailabilityRepository,
+)
+from src.repositories.cache_codec import get_cache_codec
+from src.repositories.cache_keys import (
+    ROOM_REQUESTS_KEY,
+    get_available_count_key,
+    get_available_intervals_key,
+    get_available_seats_key,
+    get_blocked_counts_key,
+    get_distance_map_key,
+    get_prefix_sum_key,
+    get_seat_lock_key,
+)
 from src.repositories.room_repository import RoomRepository
 from src.repositories.seat_repository import SeatRepository
+from src.services.async_redis_client import AsyncRedisClient
+from src.services.availability_executor import AvailabilityExecutor
+from src.services.local_cache import local_cache
 from src.services.redis_client import RedisClient
+from src.services.single_flight import SingleFlight
+from src.use_cases.availability_engine import (
+    Rect,
+    clip_rect,
+    compute_blocked_counts,
+    compute_distance_map,
+    decode_distance_map,
+    encode_distance_map,
+    get_available_intervals,
+    get_available_intervals_in_halo,
+    get_available_mask_from_distance_map,
+    get_available_positions,
+    get_available_seats,
+    get_available_seats_from_distance_map,
+    get_blocking_radius,
+    get_halo_rect,
+    get_occupancy,
+    iter_available_seats,
+    slice_available_intervals,
+)
+from src.use_cases.availability_refresher import AvailabilityRefresher
+from src.use_cases.seat_index import RotatedGridIndex, RotatedPrefixSumIndex
+
+if TYPE_CHECKING:
+    from src.repositories.async_availability_repository import (
+        AsyncAvailabilityRepository,
+    )
+    from src.repositories.async_room_repository import AsyncRoomRepository
+    from src.repositories.async_seat_repository import AsyncSeatRepository
+    from src.services.async_single_flight import AsyncSingleFlight
+
+
+def get_canceled_seat_ids(
+    seats: List[SeatLike], canceled_seats: List[Tuple[int, int]]
+) -> List[int]:
+    """
+    Ids of the requested seats which were deleted, to drop their cache entries
+    """
+    positions = set(canceled_seats)
+    return [
+        seat.id
+        for seat in seats
+        if seat.id is not None and (seat.pos_x, seat.pos_y) in positions
+    ]
+
+
+class CachedResult(NamedTuple):
+    """
+    How a result derived from the seats of a room is cached
+    Args:
+        room_key: Cache key of the result for a room version
+        loads: Decode the cached value
+        dumps: Encode the value to cache
+    """
+
+    room_key: Callable[[int], str]
+    loads: Callable[[bytes], Any]
+    dumps: Callable[[Any], Any]
+
+
+class BaseRoomManagement:
+    """
+    Cache layout, checks and background work shared by RoomManagement and
+    AsyncRoomManagement, the subclasses only do the Redis and database I/O
+    """
+
+    def __init__(
+        self,
+        room_repository: Union[RoomRepository, "AsyncRoomRepository"],
+        seat_repository: Union[SeatRepository, "AsyncSeatRepository"],
+        availability_repository: Union[
+            AvailabilityRepository, "AsyncAvailabilityRepository"
+        ],
+        redis_client: Union[RedisClient, AsyncRedisClient],
+        single_flight: Union[SingleFlight, "AsyncSingleFlight"],
+    ):
+        self.room_repository = room_repository
+        self.seat_repository = seat_repository
+        self.availability_repository = availability_repository
+        self.redis_client = redis_client
+        self.single_flight = single_flight
+        self.availability_executor = AvailabilityExecutor()
+        self.cache_codec = get_cache_codec(settings.cache_codec)
+        self.availability_refresher = AvailabilityRefresher(self)
+        # Reads of rooms not yet added to room_requests
+        self.room_requests: Counter[int] = Counter()
+        self.room_requests_lock = threading.Lock()
+
+    def get_available_seats_result(self, room: Room, min_distance: int) -> CachedResult:
+        return CachedResult(
+            lambda version: get_available_seats_key(room.id, version, min_distance),
+            lambda value: self.cache_codec.decode_positions(value, 2),
+            self.cache_codec.encode_positions,
+        )
+
+    def get_available_count_result(self, room: Room, min_distance: int) -> CachedResult:
+        return CachedResult(
+            lambda version: get_available_count_key(room.id, version, min_distance),
+            int,
+            str,
+        )
+
+    def get_available_intervals_result(
+        self, room: Room, min_distance: int
+    ) -> CachedResult:
+        return CachedResult(
+            lambda version: get_available_intervals_key(room.id, version, min_distance),
+            lambda value: self.cache_codec.decode_positions(value, 3),
+            self.cache_codec.encode_positions,
+        )
+
+    def get_prefix_sum_result(self, room: Room) -> CachedResult:
+        return CachedResult(
+            lambda version: get_prefix_sum_key(room.id, version),
+            lambda value: RotatedPrefixSumIndex.decode(value, room.row, room.col),
+            RotatedPrefixSumIndex.encode,
+        )
+
+    def get_distance_map_result(self, room: Room) -> CachedResult:
+        return CachedResult(
+            lambda version: get_distance_map_key(room.id, version),
+            lambda value: decode_distance_map(value, room.row, room.col),
+            encode_distance_map,
+        )
+
+    def decode_rooms_available_seats(
+        self, rooms: List[Room], values: list
+    ) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Decode the available seats of many rooms read with one MGET, rooms
+        without a cached result are left out
+        """
+        return {
+            room.id: self.cache_codec.decode_positions(value, 2)
+            for room, value in zip(rooms, values)
+            if value
+        }
+
+    def encode_rooms_available_seats(
+        self,
+        rooms: List[Room],
+        min_distance: int,
+        available_seats: Dict[int, List[Tuple[int, int]]],
+        versions: Dict[int, int],
+    ) -> Dict[str, Any]:
+        return {
+            get_available_seats_key(
+                room.id, versions[room.id], min_distance
+            ): self.cache_codec.encode_positions(available_seats[room.id])
+            for room in rooms
+        }
+
+    def get_trivial_available_count(
+        self, room: Room, list_room_seats: List[SeatLike], min_distance: int
+    ) -> Optional[int]:
+        # Empty rooms and min_distance 0 don't need the seats around
+        if not list_room_seats:
+            return room.row * room.col
+        if min_distance == 0:
+            return room.row * room.col - len(list_room_seats)
+        return None
+
+    def get_seat_lock_keys(self, room: Room, seats: List[Tuple[int, int]]) -> List[str]:
+        return [get_seat_lock_key(room.id, seat[0], seat[1]) for seat in seats]
+
+    def get_rejected_seats(
+        self, seats: List[Tuple[int, int]], rejected_seats: List[Tuple[int, int]]
+    ) -> List[SeatRejection]:
+        """
+        The seats rejected by the check and reserve script with the reasons of
+        check_room_seats, see AvailabilityRepository.check_and_reserve
+        """
+        reasons = {
+            SEAT_NOT_AVAILABLE: "is not available",
+            SEAT_TOO_CLOSE: "is too close to another requested seat",
+        }
+        return [
+            SeatRejection(*seats[index], reason=reasons[reason])
+            for index, reason in rejected_seats
+        ]
+
+    def log_blocked_counts_overflow(self, room: Room):
+        logger.error(
+            f"Blocked counts of room {room.id} left the u16 range, "
+            "the state is dropped and rebuilt from the database"
+        )
+
+    def log_occupancy_behind(self, room: Room):
+        logger.error(
+            f"Occupancy bitmap of room {room.id} is behind the database, "
+            "it is dropped and built again"
+        )
+
+    def notify_room_changed(self, room_id: int):
+        if settings.availability_refresh_enabled:
+            self.availability_refresher.notify(room_id)
+
+    def record_room_requests(self, room_ids: List[int]):
+        """
+        Count reads of rooms in process, the counts are added to the sorted set
+        room_requests by flush_room_requests and the most requested rooms are
+        warmed at startup
+        """
+        if settings.availability_warm_rooms <= 0 or not room_ids:
+            return
+        with self.room_requests_lock:
+            self.room_requests.update(room_ids)
+        self.availability_refresher.start()
+
+    def pop_room_requests(self) -> Counter[int]:
+        with self.room_requests_lock:
+            room_requests, self.room_requests = self.room_requests, Counter()
+        return room_requests
+
+    def uses_prefix_sum_index(
+        self, room: Room, list_room_seats: List[SeatLike]
+    ) -> bool:
+        # Dense rooms use the cached summed-area table, sparse or long thin
+        # rooms a grid
+        is_dense = (
+            len(list_room_seats)
+            >= settings.dense_seat_index_ratio * room.row * room.col
+        )
+        return is_dense and RotatedPrefixSumIndex.fits(room.row, room.col)
+
+    def check_room_seats(
+        self,
+        room: Room,
+        seats: List[Tuple[int, int]],
+        min_distance: int,
+        list_room_seats: Optional[List[SeatLike]],
+        seat_index: Optional[Union[RotatedGridIndex, RotatedPrefixSumIndex]] = None,
+    ) -> List[SeatRejection]:
+        """
+        Check requested seats against the given seats of the room, None only
+        checks bounds and duplicates. See RoomManagement.validate_room_seats
+        A grid of the seats is built here unless an index is given
+        """
+        radius = get_blocking_radius(min_distance)
+        taken_seats: Set[Tuple[int, int]] = set()
+        if list_room_seats is not None:
+            taken_seats = {(seat.pos_x, seat.pos_y) for seat in list_room_seats}
+            if seat_index is None:
+                seat_index = RotatedGridIndex(list(taken_seats), bucket_size=radius)
 
+        requested_seats: Set[Tuple[int, int]] = set()
+        requested_index = RotatedGridIndex([], bucket_size=radius)
+        rejections: List[SeatRejection] = []
+        for pos_x, pos_y in seats:
+            reason: Optional[str] = None
+            if pos_x < 0 or pos_y < 0:
+                reason = "has a negative position"
+            elif pos_x >= room.row:
+                reason = f"has pos_x greater than row {room.row}"
+            elif pos_y >= room.col:
+                reason = f"has pos_y greater than col {room.col}"
+            elif (pos_x, pos_y) in requested_seats:
+                reason = "is requested more than once"
+            elif (pos_x, pos_y) in taken_seats:
+                reason = "is already in the room"
+            elif seat_index is not None and seat_index.any_within(pos_x, pos_y, radius):
+                reason = "is not available"
+            elif seat_index is not None and requested_index.any_within(
+                pos_x, pos_y, radius
+            ):
+                reason = "is too close to another requested seat"
 
-class RoomManagement:
+            requested_seats.add((pos_x, pos_y))
+            if reason:
+                rejections.append(SeatRejection(pos_x, pos_y, reason))
+            else:
+                requested_index.add(pos_x, pos_y)
+        return rejections
+
+    def get_available_seats(
+        self, room: Room, min_distance: int
+    ) -> List[Tuple[int, int]]:
+        # Seats already added to the room, RPCs read the cached state instead
+        return get_available_seats(get_occupancy(room), min_distance=min_distance)
+
+
+class RoomManagement(BaseRoomManagement):
     def __init__(self):
-        self.room_repository = RoomRepository()
-        self.seat_repository = SeatRepository()
-        self.redis_client = RedisClient()
+        redis_client = RedisClient()
+        super().__init__(
+            RoomRepository(),
+            SeatRepository(),
+            AvailabilityRepository(),
+            redis_client,
+            SingleFlight(redis_client),
+        )
 
     def add_room(self, row: int, col: int) -> Optional[Room]:
         return self.room_repository.add_room(row=row, col=col)
 
     def remove_room(self, room_id: int):
+        self.redis_client.client.zrem(ROOM_REQUESTS_KEY, room_id)
         return self.room_repository.remove_room(room_id=room_id)
 
-    def list_rooms(self) -> List[Room]:
+    def list_rooms(self) -> List[RoomRecord]:
         return self.room_repository.list_rooms()
 
     def get_room(self, room_id: int) -> Optional[Room]:
         return self.room_repository.get_room(room_id=room_id)
 
-    def list_room_seats(self, room_id: int) -> List[Seat]:
+    def get_rooms(self, room_ids: List[int]) -> Dict[int, Room]:
+        return self.room_repository.get_rooms(room_ids=room_ids)
+
+    def list_room_seats(self, room_id: int) -> List[SeatRecord]:
         return self.seat_repository.list_seats_by_room_id(room_id=room_id)
 
+    def get_cached(self, key: str, loads: Callable[[bytes], Any]) -> Optional[Any]:
+        """
+        Get a result from the process, then from Redis
+        Only for keys with the room version, they never change once set
+        """
+        value = local_cache.get(key)
+        if value is not None:
+            return value
+
+        cached_value = self.redis_client.get(key)
+        if cached_value is None:
+            return None
+        value = loads(cached_value)
+        local_cache.set(key, value)
+        return value
+
+    def set_cached(self, key: str, value: Any, dumps: Callable[[Any], Any]):
+        self.redis_client.set(key, dumps(value), ex=settings.redis_key_ttl)
+        local_cache.set(key, value)
+
+    def get_or_compute(
+        self, room: Room, result: CachedResult, compute: Callable[[], Any]
+    ) -> Any:
+        """
+        Get a result of the current room version, on a miss only one caller
+        computes and caches it while concurrent callers wait for it
+        Args:
+            room: Room of the result
+            result: Cache key and encoding of the result
+            compute: Compute the value
+        """
+        version = self.seat_repository.get_room_version(room.id)
+        key = result.room_key(version)
+
+        def compute_and_cache() -> Any:
+            value = compute()
+            self.set_cached(key, value, result.dumps)
+            return value
+
+        return self.single_flight.do(
+            key,
+            get=lambda: self.get_cached(key, result.loads),
+            compute=compute_and_cache,
+            get_stale=(
+                (lambda: self.get_cached(result.room_key(version - 1), result.loads))
+                if version > 0
+                else None
+            ),
+        )
+
     def get_room_available_seats(
         self, room: Room, min_distance: int
     ) -> List[Tuple[int, int]]:
-        # Check if the result is cached
-        cached_available_seats = self.redis_client.get(
-            f"room_available_seats_{room.id}_{min_distance}"
+        # The configured min_distance is served from the state updated in place
+        if min_distance == settings.min_distance:
+            available = self.get_room_available_mask(
+                room=room, min_distance=min_distance
+            )
+            return get_available_positions(available)
+
+        # Threshold the distance map, it is shared by every min_distance
+        return self.get_or_compute(
+            room,
+            self.get_available_seats_result(room=room, min_distance=min_distance),
+            lambda: get_available_seats_from_distance_map(
+                self.get_room_distance_map(room=room), min_distance=min_distance
+            ),
         )
-        if cached_available_seats:
-            return json.loads(cached_available_seats)
 
-        # Get all seats in the room
-        list_room_seats = self.list_room_seats(room_id=room.id)
-        room.add_seats(list_room_seats)
+    def get_rooms_available_seats(
+        self, rooms: List[Room], min_distance: int
+    ) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Available seats of many rooms with one MGET for the cached results,
+        one query for the seats of the misses and the misses computed in parallel
+        Args:
+            rooms: Rooms without duplicates
+            min_distance: Minimum manhattan distance to every taken seat
+        Returns:
+            Sorted available (pos_x, pos_y) by room id
+        """
+        available_seats: Dict[int, List[Tuple[int, int]]] = {}
+        versions = self.seat_repository.get_room_versions([room.id for room in rooms])
 
-        available_seats = self.get_available_seats(room=room, min_distance=min_distance)
+        # The configured min_distance is served from the state updated in place
+        is_state = min_distance == settings.min_distance
+        if is_state:
+            for (
+                room_id,
+                blocked_counts,
+            ) in self.availability_repository.get_many_blocked_counts(
+                rooms=rooms, min_distance=min_distance, versions=versions
+            ).items():
+                available_seats[room_id] = get_available_positions(blocked_counts == 0)
+        else:
+            available_seats = self.decode_rooms_available_seats(
+                rooms,
+                self.redis_client.mget(
+                    [
+                        get_available_seats_key(
+                            room.id, versions[room.id], min_distance
+                        )
+                        for room in rooms
+                    ]
+                ),
+            )
+
+        missing_rooms = [room for room in rooms if room.id not in available_seats]
+        if not missing_rooms:
+            return available_seats
 
-        # Cache the result
-        self.redis_client.set(
-            f"room_available_seats_{room.id}_{min_distance}",
-            json.dumps(available_seats),
-            ex=settings.redis_key_ttl,
+        # Get all seats of the missing rooms
+        room_seats = self.seat_repository.list_seats_by_room_ids(
+            room_ids=[room.id for room in missing_rooms], versions=versions
         )
+        for room in missing_rooms:
+            room.add_seats(room_seats[room.id])
+
+        # Compute the misses in parallel
+        futures = [
+            self.availability_executor.submit(
+                compute_blocked_counts, room, min_distance
+            )
+            for room in missing_rooms
+        ]
+        missing_blocked_counts: Dict[int, np.ndarray] = {}
+        for room, future in zip(missing_rooms, futures):
+            missing_blocked_counts[room.id] = future.result()
+            available_seats[room.id] = get_available_positions(
+                missing_blocked_counts[room.id] == 0
+            )
+
+        # Cache the results in one round-trip
+        if is_state:
+            self.availability_repository.set_many_blocked_counts(
+                rooms=missing_rooms,
+                min_distance=min_distance,
+                counts=missing_blocked_counts,
+                versions=versions,
+            )
+        else:
+            self.redis_client.set_many(
+                self.encode_rooms_available_seats(
+                    missing_rooms, min_distance, available_seats, versions
+                ),
+                ex=settings.redis_key_ttl,
+            )
         return available_seats
 
-    def reverse_room_seats(
-        self, room: Room, seats: List[Tuple[int, int]]
-    ) -> List[Tuple[int, int]]:
-        # DLM lock all seats
-        # Aquire lock for all seats to prevent another flow from reserving the same seat
-        lock_keys = []
-        for seat in seats:
-            tmp_lock = self.redis_client.acquire_lock(
-                f"room_seat_{room.id}_{seat[0]}_{seat[1]}", settings.redis_key_ttl
-            )
-            if not tmp_lock:
-                raise Exception(
-                    f"Failed to acquire lock for room_seat_{room.id}_{seat[0]}_{seat[1]}"
-                )
-            lock_keys.append(tmp_lock)
-        try:
-            return self.seat_repository.reverse_seats(room_id=room.id, seats=seats)
-        except Exception as e:
-            raise e
-        finally:
-            # DLM unlock all seats
-            for lock_key in lock_keys:
-                self.redis_client.release_lock(lock_key)
+    def get_room_available_mask(self, room: Room, min_distance: int) -> np.ndarray:
+        # The configured min_distance is served from the state updated in place
+        if min_distance == settings.min_distance:
+            return (
+                self.get_room_blocked_counts(room=room, min_distance=min_distance) == 0
+            )
 
-    def cancel_room_seats(self, room: Room, seats: List[Seat]):
-        # DLM lock all seats
-        # Aquire lock for all seats to prevent another flow from cancel the same seat
-        lock_keys = []
-        for seat in seats:
-            tmp_lock = self.redis_client.acquire_lock(
-                f"room_seat_{room.id}_{seat.pos_x}_{seat.pos_y}", settings.redis_key_ttl
-            )
-            if not tmp_lock:
-                raise Exception(
-                    f"Failed to acquire lock for room_seat_{room.id}_{seat.pos_x}_{seat.pos_y}"
+        # Threshold the distance map, it is shared by every min_distance
+        return get_available_mask_from_distance_map(
+            self.get_room_distance_map(room=room), min_distance=min_distance
+        )
+
+    def count_room_available_seats(self, room: Room, min_distance: int) -> int:
+        return self.get_or_compute(
+            room,
+            self.get_available_count_result(room=room, min_distance=min_distance),
+            lambda: self.compute_room_available_count(
+                room=room, min_distance=min_distance
+            ),
+        )
+
+    def compute_room_available_count(self, room: Room, min_distance: int) -> int:
+        count = self.get_trivial_available_count(
+            room=room,
+            list_room_seats=self.list_room_seats(room_id=room.id),
+            min_distance=min_distance,
+        )
+        if count is None:
+            count = int(
+                np.count_nonzero(
+                    self.get_room_available_mask(room=room, min_distance=min_distance)
                 )
-            lock_keys.append(tmp_lock)
-        try:
-            return self.seat_repository.cancel_seats(room_id=room.id, seats=seats)
-        except Exception as e:
-            raise e
-        finally:
-            # DLM unlock all seats
-            for lock_key in lock_keys:
-                self.redis_client.release_lock(lock_key)
+            )
+        return count
 
-    def get_available_seats(
+    def get_room_available_intervals(
         self, room: Room, min_distance: int
-    ) -> List[Tuple[int, int]]:
-        # If all seats are available, return all seats
-        if not room.seats:
-            return [
-                (pos_x, pos_y) for pos_x in range(room.row) for pos_y in range(room.col)
-            ]
-        # If all seats are taken, return empty list
-        if len(room.seats) == room.row * room.col:
+    ) -> List[Tuple[int, int, int]]:
+        return self.get_or_compute(
+            room,
+            self.get_available_intervals_result(room=room, min_distance=min_distance),
+            lambda: get_available_intervals(
+                self.get_room_available_mask(room=room, min_distance=min_distance)
+            ),
+        )
+
+    def get_room_available_intervals_in_rect(
+        self,
+        room: Room,
+        min_distance: int,
+        row_start: int,
+        row_end: int,
+        col_start: int,
+        col_end: int,
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Available intervals of a viewport, clipped to the room
+        Args:
+            room: Room of the viewport
+            min_distance: Minimum manhattan distance to every taken seat
+            row_start, row_end: Rows of the viewport, row_end is exclusive
+            col_start, col_end: Columns of the viewport, col_end is exclusive
+        Returns:
+            Sorted list of (row, start_col, end_col), end_col is inclusive
+        """
+        rect = clip_rect(
+            room.row, room.col, Rect(row_start, row_end, col_start, col_end)
+        )
+        if rect is None:
             return []
 
-        available_seats: List[Tuple[int, int]] = []
-        # If min_distance is 0, return all seats without taken seats
-        if min_distance == 0:
-            available_seats = list(
-                set(
-                    [
-                        (pos_x, pos_y)
-                        for pos_x in range(room.row)
-                        for pos_y in range(room.col)
-                    ]
-                )
-                - set([(seat.pos_x, seat.pos_y) for seat in room.seats])
-            )
+        # Slice the cached intervals of the whole room if there are
+        result = self.get_available_intervals_result(
+            room=room, min_distance=min_distance
+        )
+        available_intervals = self.get_cached(
+            result.room_key(self.seat_repository.get_room_version(room.id)),
+            result.loads,
+        )
+        if available_intervals is not None:
+            return slice_available_intervals(available_intervals, rect)
 
-            # Return sorted available seats base on pos_x, pos_y
-            available_seats = sorted(
-                available_seats, key=lambda item: (item[0], item[1])
-            )
+        # Only the taken seats of the viewport plus a halo of the blocking radius
+        halo = get_halo_rect(
+            room.row, room.col, rect, get_blocking_radius(min_distance)
+        )
+        return get_available_intervals_in_halo(
+            self.seat_repository.list_seats_in_rect(room.id, *halo),
+            halo=halo,
+            rect=rect,
+            min_distance=min_distance,
+        )
 
-            return available_seats
+    def iter_room_available_seats(
+        self, room: Room, min_distance: int, chunk_rows: int
+    ) -> Iterator[Tuple[int, int, List[Tuple[int, int]]]]:
+        # Get all seats in the room
+        list_room_seats = self.list_room_seats(room_id=room.id)
+        room.add_seats(list_room_seats)
 
-        # If some seats are taken, return available seats
-        cur_position_seats: List[Tuple[int, int]] = [
-            (seat.pos_x, seat.pos_y) for seat in room.seats
-        ]
+        return iter_available_seats(
+            get_occupancy(room), min_distance=min_distance, chunk_rows=chunk_rows
+        )
 
-        for seat_pos_x, seat_pos_y in cur_position_seats:
-            # Get all available_seats per already taken seat
-            available_per_taken_seat: List[Tuple[int, int]] = (
-                self.get_available_per_taken_seat(
-                    room=room,
-                    min_distance=min_distance,
-                    seat_pos_x=seat_pos_x,
-                    seat_pos_y=seat_pos_y,
-                    cur_position_seats=cur_position_seats,
-                )
+    def validate_room_seats(
+        self,
+        room: Room,
+        seats: List[Tuple[int, int]],
+        min_distance: int,
+        snapshot: bool = True,
+    ) -> List[SeatRejection]:
+        """
+        Check requested seats against one read of the seats of the room
+        Seats are checked in the requested order, a seat too close to an
+        earlier requested seat which passed is rejected
+        Args:
+            room: Room of the seats
+            seats: Requested (pos_x, pos_y)
+            min_distance: Minimum manhattan distance between taken seats
+            snapshot: Check against the seats of the room, without it only
+                bounds and duplicates are checked
+        Returns:
+            Rejected seats with the reason, in the requested order
+        """
+        list_room_seats = self.list_room_seats(room.id) if snapshot else None
+        # The cached summed-area table is read here, a grid is built in the check
+        seat_index: Optional[RotatedPrefixSumIndex] = None
+        if list_room_seats is not None and self.uses_prefix_sum_index(
+            room=room, list_room_seats=list_room_seats
+        ):
+            seat_index = self.get_room_prefix_sum_index(
+                room=room, list_room_seats=list_room_seats
             )
+        return self.check_room_seats(
+            room=room,
+            seats=seats,
+            min_distance=min_distance,
+            list_room_seats=list_room_seats,
+            seat_index=seat_index,
+        )
 
-            # If available_seats is empty, assign available_per_taken_seat to available_seats
-            if not available_seats:
-                available_seats = available_per_taken_seat
-                continue
+    def get_room_prefix_sum_index(
+        self, room: Room, list_room_seats: List[SeatLike]
+    ) -> RotatedPrefixSumIndex:
+        def compute() -> RotatedPrefixSumIndex:
+            room.add_seats(list_room_seats)
+            return RotatedPrefixSumIndex.from_occupancy(get_occupancy(room))
 
-            # Inner join available_seats and available_per_taken_seat
-            available_seats = list(set(available_seats) & set(available_per_taken_seat))
+        return self.get_or_compute(room, self.get_prefix_sum_result(room), compute)
 
-        # Return sorted available seats base on pos_x, pos_y
-        available_seats = sorted(available_seats, key=lambda item: (item[0], item[1]))
+    def get_room_distance_map(self, room: Room) -> np.ndarray:
+        def compute() -> np.ndarray:
+            # Get all seats in the room
+            list_room_seats = self.list_room_seats(room_id=room.id)
+            room.add_seats(list_room_seats)
+            return self.availability_executor.run(compute_distance_map, room)
 
-        return available_seats
+        return self.get_or_compute(room, self.get_distance_map_result(room), compute)
+
+    def get_room_blocked_counts(self, room: Room, min_distance: int) -> np.ndarray:
+        # The decoded state is kept in process under the version read here
+        version = self.seat_repository.get_room_version(room.id)
 
-    def get_available_per_taken_seat(
+        def compute() -> np.ndarray:
+            # Get all seats in the room, at least as new as the version
+            list_room_seats = self.seat_repository.list_seats_by_room_id(
+                room_id=room.id, version=version
+            )
+            room.add_seats(list_room_seats)
+
+            blocked_counts = self.availability_executor.run(
+                compute_blocked_counts, room, min_distance
+            )
+            self.availability_repository.set_blocked_counts(
+                room=room,
+                min_distance=min_distance,
+                counts=blocked_counts,
+                version=version,
+            )
+            return blocked_counts
+
+        # The state is rebuilt once at a time, it is never stale so no fallback
+        return self.single_flight.do(
+            get_blocked_counts_key(room.id, min_distance),
+            get=lambda: self.availability_repository.get_blocked_counts(
+                room=room, min_distance=min_distance, version=version
+            ),
+            compute=compute,
+        )
+
+    def update_room_occupancy(
         self,
         room: Room,
-        min_distance: int,
-        seat_pos_x: int,
-        seat_pos_y: int,
-        cur_position_seats: List[Tuple[int, int]],
-    ) -> List[Tuple[int, int]]:
-        available_seats: List[Tuple[int, int]] = []
+        seats: List[Tuple[int, int]],
+        taken: bool,
+        seat_ids: Optional[List[int]] = None,
+    ):
+        """
+        Apply reserved or canceled seats to the occupancy bitmap and the blocked
+        counts of the room, then bump the room version and schedule a refresh
+        The version is bumped last, so a reader of the new version never sees
+        the counters or the bitmap before the change
+        Args:
+            room: Room of the seats
+            seats: Seats which were inserted or deleted
+            taken: True for reserved seats, False for canceled seats
+            seat_ids: Ids of the canceled seats, their cache entries are deleted
+        """
+        if not seats:
+            return
+        # Only the diamond around every changed seat is touched, the cached
+        # seats are deleted by the same script
+        if not self.availability_repository.update_blocked_counts(
+            room=room,
+            min_distance=settings.min_distance,
+            seats=seats,
+            taken=taken,
+            radius=get_blocking_radius(settings.min_distance),
+            deleted_keys=self.seat_repository.get_seat_keys(room.id, seat_ids),
+        ):
+            self.log_blocked_counts_overflow(room)
+        self.seat_repository.invalidate_room(room.id)
+        self.notify_room_changed(room.id)
 
-        for pos_x in range(room.row):
-            # |pos_x - seat_x| + |pos_y - seat_y| = min_distance
-            # Calculate abs_x
-            abs_x: int = abs(seat_pos_x - pos_x)
+    def flush_room_requests(self):
+        """
+        Add the counted reads to room_requests with one pipelined round-trip
+        """
+        room_requests = self.pop_room_requests()
+        if not room_requests:
+            return
+        pipeline = self.redis_client.pipeline()
+        for room_id, count in room_requests.items():
+            pipeline.zincrby(ROOM_REQUESTS_KEY, count, room_id)
+        pipeline.execute()
 
-            # If abs_x is greater than or equal to min_distance, all seats are available
-            if abs_x >= min_distance:
-                available_seats += list(
-                    set([(pos_x, y) for y in range(room.col)]) - set(cur_position_seats)
-                )
-                continue
-
-            # Calculate pos_y_min and pos_y_max
-            abs_y: int = min_distance - abs_x
-            pos_y_min: int = seat_pos_y - abs_y
-            pos_y_max: int = seat_pos_y + abs_y
-
-            # pos_y <= pos_y_min so if pos_y_min >= 0 and pos_y_min < self._room.col, pos_y = [0,pos_y_min+1]
-            if pos_y_min >= 0 and pos_y_min < room.col:
-                available_seats += list(
-                    set([(pos_x, pos_y) for pos_y in range(0, pos_y_min + 1)])
-                    - set(cur_position_seats)
-                )
+    def warm_hot_rooms(self):
+        """
+        Refresh the availability of the most requested rooms in the background
+        """
+        if settings.availability_warm_rooms <= 0:
+            return
+        for room_id in self.redis_client.client.zrevrange(
+            ROOM_REQUESTS_KEY, 0, settings.availability_warm_rooms - 1
+        ):
+            self.availability_refresher.notify(int(room_id), delay=0)
+
+    def refresh_room_availability(self, room: Room, min_distance: int):
+        """
+        Compute and cache the availability readers ask for after a change
+        """
+        self.list_room_seats(room_id=room.id)
+        self.get_room_blocked_counts(room=room, min_distance=min_distance)
+        self.count_room_available_seats(room=room, min_distance=min_distance)
+        self.get_room_available_intervals(room=room, min_distance=min_distance)
+
+    def reverse_room_seats(
+        self, room: Room, seats: List[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        # Lock all seats at once
+        # Aquire lock for all seats to prevent another flow from reserving the same seat
+        lock = self.redis_client.acquire_locks(
+            self.get_seat_lock_keys(room=room, seats=seats),
+            settings.redis_key_ttl,
+        )
+        if not lock:
+            raise Exception(
+                f"Failed to acquire lock for seats {seats} of room {room.id}"
+            )
+        try:
+            reserved_seats = self.seat_repository.reverse_seats(
+                room_id=room.id, seats=seats
+            )
+            # Only the seats which were inserted are counted
+            self.update_room_occupancy(room=room, seats=reserved_seats, taken=True)
+            return reserved_seats
+        except Exception as e:
+            raise e
+        finally:
+            # Unlock all seats
+            self.redis_client.release_locks(lock)
 
-            # pos_y >= pos_y_max so if pos_y_max >= 0 and pos_y_max < self._room.col, pos_y = [pos_y_max, self._room.col]
-            if pos_y_max >= 0 and pos_y_max < room.col:
-                available_seats += list(
-                    set([(pos_x, pos_y) for pos_y in range(pos_y_max, room.col)])
-                    - set(cur_position_seats)
+    def check_and_reverse_room_seats(
+        self, room: Room, seats: List[Tuple[int, int]], min_distance: int
+    ) -> Tuple[List[Tuple[int, int]], List[SeatRejection]]:
+        """
+        Reserve seats by deciding on the occupancy bitmap of the room in Redis,
+        the check and the reservation are one atomic script so no lock is taken
+        Args:
+            room: Room of the seats
+            seats: Seats to reserve
+            min_distance: Minimum manhattan distance between taken seats
+        Returns:
+            The reserved seats and the rejected seats, if any
+        """
+        radius = get_blocking_radius(min_distance)
+        rejected_seats = self.availability_repository.check_and_reserve(
+            room=room, seats=seats, radius=radius
+        )
+        if rejected_seats is None:
+            # Build the bitmap from the seats of the current room version
+            version = self.seat_repository.get_room_version(room.id)
+            room.add_seats(
+                self.seat_repository.list_seats_by_room_id(
+                    room_id=room.id, version=version
                 )
+            )
+            self.availability_repository.set_occupancy(room, version=version)
+            rejected_seats = self.availability_repository.check_and_reserve(
+                room=room, seats=seats, radius=radius
+            )
+        if rejected_seats is None:
+            # A write changed the room during the build, take the seat locks
+            rejections = self.validate_room_seats(
+                room=room, seats=seats, min_distance=min_distance
+            )
+            if rejections:
+                return [], rejections
+            return self.reverse_room_seats(room=room, seats=seats), []
+        if rejected_seats:
+            return [], self.get_rejected_seats(
+                seats=seats, rejected_seats=rejected_seats
+            )
 
-        # Remove duplicate and remove existing seats
-        available_seats = list(set(available_seats))
-        return available_seats
+        try:
+            reserved_seats = self.seat_repository.reverse_seats(
+                room_id=room.id, seats=seats
+            )
+        except Exception as e:
+            # Give the seats back, they were free before the script took them
+            self.availability_repository.set_occupancy_bits(
+                room=room, seats=seats, taken=False
+            )
+            raise e
+        if len(reserved_seats) < len(set(seats)):
+            # The database had seats the bitmap didn't have, build it again
+            self.log_occupancy_behind(room)
+            self.availability_repository.delete_occupancy(room)
+        # The bits of the reserved seats are already set, setting them again is a no-op
+        self.update_room_occupancy(room=room, seats=reserved_seats, taken=True)
+        return reserved_seats, []
+
+    def cancel_room_seats(
+        self, room: Room, seats: List[SeatLike]
+    ) -> List[Tuple[int, int]]:
+        # Lock all seats at once
+        # Aquire lock for all seats to prevent another flow from cancel the same seat
+        lock = self.redis_client.acquire_locks(
+            self.get_seat_lock_keys(
+                room=room, seats=[(seat.pos_x, seat.pos_y) for seat in seats]
+            ),
+            settings.redis_key_ttl,
+        )
+        if not lock:
+            raise Exception(
+                f"Failed to acquire lock for seats {[(seat.pos_x, seat.pos_y) for seat in seats]} of room {room.id}"
+            )
+        try:
+            # Only the seats which were deleted are given back
+            canceled_seats = self.seat_repository.cancel_seats(
+                room_id=room.id, seats=seats
+            )
+            self.update_room_occupancy(
+                room=room,
+                seats=canceled_seats,
+                taken=False,
+                seat_ids=get_canceled_seat_ids(seats, canceled_seats),
+            )
+            return canceled_seats
+        except Exception as e:
+            raise e
+        finally:
+            # Unlock all seats
+            self.redis_client.release_locks(lock)
@@ -0,0 +1,151 @@
+from collections import defaultdict
+from typing import DefaultDict, Iterable, List, Tuple
+
+import numpy as np
+
+# The table has (row + col)^2 entries, rooms with a larger table than this
+# times row * col (long thin rooms) use RotatedGridIndex instead
+MAX_PREFIX_SUM_TABLE_RATIO = 8
+
+
+class RotatedGridIndex:
+    """
+    Bucketed grid of taken seats in rotated coordinates u = x + y, v = x - y
+    The manhattan diamond |dx| + |dy| <= d becomes the square
+    max(|du|, |dv|) <= d, so a query only visits the buckets around the seat
+    """
+
+    def __init__(self, seats: Iterable[Tuple[int, int]], bucket_size: int):
+        self.bucket_size = max(bucket_size, 1)
+        self.buckets: DefaultDict[Tuple[int, int], List[Tuple[int, int]]] = defaultdict(
+            list
+        )
+        for pos_x, pos_y in seats:
+            self.add(pos_x, pos_y)
+
+    def add(self, pos_x: int, pos_y: int):
+        pos_u, pos_v = pos_x + pos_y, pos_x - pos_y
+        self.buckets[(pos_u // self.bucket_size, pos_v // self.bucket_size)].append(
+            (pos_u, pos_v)
+        )
+
+    def any_within(self, pos_x: int, pos_y: int, distance: int) -> bool:
+        """
+        Check if any taken seat is within manhattan distance of (pos_x, pos_y)
+        Args:
+            pos_x: Row of the seat
+            pos_y: Column of the seat
+            distance: Maximum manhattan distance, inclusive
+        """
+        if distance < 0:
+            return False
+
+        pos_u, pos_v = pos_x + pos_y, pos_x - pos_y
+        for bucket_u in range(
+            (pos_u - distance) // self.bucket_size,
+            (pos_u + distance) // self.bucket_size + 1,
+        ):
+            for bucket_v in range(
+                (pos_v - distance) // self.bucket_size,
+                (pos_v + distance) // self.bucket_size + 1,
+            ):
+                for taken_u, taken_v in self.buckets.get((bucket_u, bucket_v), ()):
+                    if (
+                        abs(taken_u - pos_u) <= distance
+                        and abs(taken_v - pos_v) <= distance
+                    ):
+                        return True
+        return False
+
+
+class RotatedPrefixSumIndex:
+    """
+    Summed-area table of taken seats in rotated coordinates
+    u = x + y, v = x - y + col - 1, so a manhattan diamond is an axis-aligned
+    square and counting the taken seats inside it is 4 lookups
+    Building is O((row + col)^2), which is a small constant times row * col
+    for usual rooms, and the table can be cached per room. See fits
+    """
+
+    def __init__(self, row: int, col: int, prefix_sum: np.ndarray):
+        self.row = row
+        self.col = col
+        self.prefix_sum = prefix_sum
+
+    @staticmethod
+    def fits(row: int, col: int) -> bool:
+        """
+        Check if the table of the room is at most MAX_PREFIX_SUM_TABLE_RATIO
+        times the number of seats
+        """
+        return (row + col) ** 2 <= MAX_PREFIX_SUM_TABLE_RATIO * row * col
+
+    @staticmethod
+    def get_dtype(row: int, col: int) -> np.dtype:
+        """
+        Smallest dtype which holds the number of seats of the room
+        """
+        return np.dtype(
+            np.uint16 if row * col <= np.iinfo(np.uint16).max else np.uint32
+        )
+
+    @classmethod
+    def from_occupancy(cls, occupancy: np.ndarray) -> "RotatedPrefixSumIndex":
+        """
+        Build the index from a boolean array (row, col), True for taken seats
+        """
+        row, col = occupancy.shape
+        size = row + col - 1
+        dtype = cls.get_dtype(row, col)
+        pos_x, pos_y = np.nonzero(occupancy)
+
+        rotated = np.zeros((size, size), dtype=dtype)
+        rotated[pos_x + pos_y, pos_x - pos_y + col - 1] = 1
+
+        prefix_sum = np.zeros((size + 1, size + 1), dtype=dtype)
+        np.cumsum(rotated, axis=0, out=rotated)
+        np.cumsum(rotated, axis=1, out=prefix_sum[1:, 1:])
+        return cls(row, col, prefix_sum)
+
+    @property
+    def nbytes(self) -> int:
+        return self.prefix_sum.nbytes
+
+    def count_within(self, pos_x: int, pos_y: int, distance: int) -> int:
+        """
+        Count taken seats within manhattan distance of (pos_x, pos_y)
+        """
+        if distance < 0:
+            return 0
+
+        size = self.row + self.col - 1
+        pos_u, pos_v = pos_x + pos_y, pos_x - pos_y + self.col - 1
+        u_min, u_max = max(pos_u - distance, 0), min(pos_u + distance + 1, size)
+        v_min, v_max = max(pos_v - distance, 0), min(pos_v + distance + 1, size)
+        # Unsigned entries, the sum is done on Python ints
+        return (
+            int(self.prefix_sum[u_max, v_max])
+            - int(self.prefix_sum[u_min, v_max])
+            - int(self.prefix_sum[u_max, v_min])
+            + int(self.prefix_sum[u_min, v_min])
+        )
+
+    def any_within(self, pos_x: int, pos_y: int, distance: int) -> bool:
+        """
+        Check if any taken seat is within manhattan distance of (pos_x, pos_y)
+        """
+        return self.count_within(pos_x, pos_y, distance) > 0
+
+    def encode(self) -> bytes:
+        return self.prefix_sum.tobytes()
+
+    @classmethod
+    def decode(cls, value: bytes, row: int, col: int) -> "RotatedPrefixSumIndex":
+        size = row + col - 1
+        return cls(
+            row,
+            col,
+            np.frombuffer(value, dtype=cls.get_dtype(row, col)).reshape(
+                size + 1, size + 1
+            ),
+        )
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional, Tuple
 
-from src.entities.seats import Seat
+from src.entities.seats import SeatRecord
 from src.repositories.seat_repository import SeatRepository
 
 
@@ -8,7 +8,14 @@ class SeatManagement:
     def __init__(self):
         self.seat_repository = SeatRepository()
 
-    def get_seat_with_room_id(self, seat_id: int, room_id: int) -> Optional[Seat]:
+    def get_seat_with_room_id(self, seat_id: int, room_id: int) -> Optional[SeatRecord]:
         return self.seat_repository.get_seat_with_room_id(
             seat_id=seat_id, room_id=room_id
         )
+
+    def get_seats_with_room_id(
+        self, seat_ids: List[int], room_id: int
+    ) -> Tuple[List[SeatRecord], List[int]]:
+        return self.seat_repository.get_seats_with_room_id(
+            seat_ids=seat_ids, room_id=room_id
+        )
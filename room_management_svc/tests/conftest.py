@@ -1,11 +1,18 @@
+import asyncio
+import threading
 from concurrent import futures
 
 import grpc
 import pytest
 
+from src.adapters.async_room_service import AsyncRoomService
 from src.adapters.room_service import RoomService
 from src.config import settings
 from src.protos_generated import room_pb2_grpc
+from src.repositories.async_db_connection import (
+    close_async_connection_pool,
+    open_async_connection_pool,
+)
 
 
 @pytest.fixture(scope="module")
@@ -16,3 +23,30 @@ def grpc_server():
     server.start()
     yield server
     server.stop(None)
+
+
+@pytest.fixture(scope="module")
+def aio_grpc_server():
+    # Run the aio server on its own event loop, the stubs of the tests stay sync
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def start():
+        await open_async_connection_pool()
+        # No migration thread pool, every RPC must be a coroutine
+        server = grpc.aio.server()
+        room_pb2_grpc.add_RoomServiceServicer_to_server(AsyncRoomService(), server)
+        port = server.add_insecure_port(f"{settings.grpc_host}:0")
+        await server.start()
+        return server, port
+
+    async def stop(server):
+        await server.stop(None)
+        await close_async_connection_pool()
+
+    server, port = asyncio.run_coroutine_threadsafe(start(), loop).result()
+    yield port
+    asyncio.run_coroutine_threadsafe(stop(server), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
@@ -0,0 +1,37 @@
+"""
+This module contains tests for the occupancy module.
+"""
+
+from src.entities.occupancy import SeatOccupancy
+
+
+def test_seat_occupancy():
+    """
+    Tests seat occupancy
+    """
+    occupancy = SeatOccupancy(row=3, col=5)
+    assert len(occupancy.bitmap) == 2
+
+    # TEST CASE 1: add seats
+    assert occupancy.add(2, 4)
+    assert occupancy.add(0, 1)
+    assert occupancy.add(1, 0)
+    assert len(occupancy) == 3
+    assert (2, 4) in occupancy
+    assert (2, 3) not in occupancy
+
+    # TEST CASE 2: add seat already taken
+    assert not occupancy.add(0, 1)
+    assert len(occupancy) == 3
+
+    # TEST CASE 3: iterate sorted seats
+    assert list(occupancy) == [(0, 1), (1, 0), (2, 4)]
+
+    # TEST CASE 4: bit layout is most significant bit first
+    assert occupancy.bitmap[0] == 0b01000100
+
+    # TEST CASE 5: remove seats
+    assert occupancy.remove(0, 1)
+    assert not occupancy.remove(0, 1)
+    assert len(occupancy) == 2
+    assert list(occupancy) == [(1, 0), (2, 4)]
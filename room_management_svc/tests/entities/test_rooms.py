@@ -4,8 +4,8 @@ This file contains the tests for the rooms module.
 
 import pytest
 
-from src.entities.rooms import Room
-from src.entities.seats import Seat
+from src.entities.rooms import Room, RoomRecord
+from src.entities.seats import Seat, SeatRecord
 
 
 def test_create_room():
@@ -102,3 +102,44 @@ def test_room_remove_seats():
     assert len(tmp_room.seats) == 2
     tmp_room.remove_seats([Seat(pos_x=1, pos_y=1), Seat(pos_x=1, pos_y=1)])
     assert len(tmp_room.seats) == 1
+
+
+def test_room_seats_sorted():
+    """
+    Tests room seats are sorted and keep their data
+    """
+    tmp_room = Room(row=5, col=10)
+    tmp_room.add_seats(
+        [
+            Seat(id=3, pos_x=4, pos_y=1),
+            Seat(id=1, pos_x=0, pos_y=9),
+            Seat(id=2, pos_x=0, pos_y=2),
+        ]
+    )
+    assert [(seat.pos_x, seat.pos_y) for seat in tmp_room.seats] == [
+        (0, 2),
+        (0, 9),
+        (4, 1),
+    ]
+    assert [seat.id for seat in tmp_room.seats] == [2, 1, 3]
+    assert len(tmp_room.occupancy) == 3
+    assert (4, 1) in tmp_room.occupancy
+
+
+def test_room_record():
+    """
+    Tests rooms of records take seat records
+    """
+    record = RoomRecord(1, 5, 10)
+    tmp_room = record.to_room()
+    assert (tmp_room.id, tmp_room.row, tmp_room.col) == (1, 5, 10)
+
+    # TEST CASE 1: add and remove seat records
+    tmp_room.add_seats([SeatRecord(1, 4, 1), SeatRecord(2, 0, 2)])
+    assert [seat.id for seat in tmp_room.seats] == [2, 1]
+    assert (4, 1) in tmp_room.occupancy
+    tmp_room.remove_seats([Seat(pos_x=4, pos_y=1)])
+    assert len(tmp_room.seats) == 1
+
+    # TEST CASE 2: every room has its own seats
+    assert len(record.to_room().seats) == 0
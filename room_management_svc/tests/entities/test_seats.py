@@ -4,7 +4,7 @@ This module contains tests for the seats module.
 
 import pytest
 
-from src.entities.seats import Seat
+from src.entities.seats import Seat, SeatRecord
 
 
 def test_create_seat():
@@ -28,3 +28,20 @@ def test_create_seat():
     tmp_seat = Seat(pos_x=1, pos_y=0)
     assert tmp_seat.pos_x == 1
     assert tmp_seat.pos_y == 0
+
+
+def test_seat_record():
+    """
+    Tests seat records compare like seats
+    """
+    # TEST CASE 1: equal by position
+    record = SeatRecord(1, 2, 3)
+    assert record == SeatRecord(None, 2, 3)
+    assert record == Seat(pos_x=2, pos_y=3)
+    assert Seat(pos_x=2, pos_y=3) == record
+    assert record != SeatRecord(1, 3, 2)
+    assert len({record, Seat(pos_x=2, pos_y=3)}) == 1
+
+    # TEST CASE 2: no attributes besides the fields
+    with pytest.raises(AttributeError):
+        record.created_at = 0
@@ -1,8 +1,11 @@
+import time
+
 import grpc
 from google.protobuf import empty_pb2
 
 from src.config import settings
 from src.protos_generated import room_pb2, room_pb2_grpc
+from src.services.redis_client import RedisClient
 
 
 def test_add_room(grpc_server):
@@ -156,10 +159,12 @@ def test_reverse_room_seats(grpc_server):
             room_pb2.ReserveSeatsRequest(
                 room_id=room_id,
                 seats=[
-                    room_pb2.Seat(pos_x=x, pos_y=y) for x in range(5) for y in range(10)
+                    room_pb2.Seat(pos_x=x, pos_y=y)
+                    for x, y in [(0, 0), (0, 5), (1, 9), (3, 2), (4, 6)]
                 ],
             )
         )
+        assert len(response.seats) == 5
         response = stub.GetAvailableSeats(
             room_pb2.GetAvailableSeatsRequest(room_id=room_id)
         )
@@ -234,3 +239,467 @@ def test_reverse_room_seats(grpc_server):
                 )
             )
             assert "greater than col" in response.status
+
+
+def test_available_seats_after_reserve_and_cancel(grpc_server):
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=10, col=20))
+        room_id = response.id
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+        )
+        assert len(response.seats) == 200
+
+        # TEST CASE 1: reserve updates available seats
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=0, pos_y=0)]
+            )
+        )
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+        )
+        assert len(response.seats) == 200 - 15
+        assert (0, 0) not in [(seat.pos_x, seat.pos_y) for seat in response.seats]
+        assert (0, 5) in [(seat.pos_x, seat.pos_y) for seat in response.seats]
+
+        # TEST CASE 2: cancel updates available seats
+        response = stub.ListRoomSeats(room_pb2.ListRoomSeatsRequest(room_id=room_id))
+        response = stub.CancelSeats(
+            room_pb2.CancelSeatsRequest(
+                room_id=room_id, seat_ids=[seat.id for seat in response.seats]
+            )
+        )
+        assert response.status == "Seats are canceled"
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+        )
+        assert len(response.seats) == 200
+
+
+def test_reserve_seats_dense_room(grpc_server):
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=2, col=10))
+        room_id = response.id
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id,
+                seats=[
+                    room_pb2.Seat(pos_x=0, pos_y=0),
+                    room_pb2.Seat(pos_x=1, pos_y=9),
+                ],
+            )
+        )
+        assert len(response.seats) == 2
+
+        # TEST CASE 1: seat is too close to a taken seat
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=1, pos_y=5)]
+            )
+        )
+        assert "not available" in response.status
+
+        # TEST CASE 2: seat is far enough from every taken seat
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=0, pos_y=5)]
+            )
+        )
+        assert len(response.seats) == 1
+
+
+def test_reserve_seats_rejections(grpc_server):
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=10, col=20))
+        room_id = response.id
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=0, pos_y=0)]
+            )
+        )
+
+        # TEST CASE 1: every rejected seat has its reason, nothing is reserved
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id,
+                seats=[
+                    room_pb2.Seat(pos_x=9, pos_y=0),
+                    room_pb2.Seat(pos_x=10, pos_y=0),
+                    room_pb2.Seat(pos_x=0, pos_y=0),
+                    room_pb2.Seat(pos_x=1, pos_y=1),
+                    room_pb2.Seat(pos_x=9, pos_y=0),
+                    room_pb2.Seat(pos_x=9, pos_y=2),
+                    room_pb2.Seat(pos_x=5, pos_y=10),
+                ],
+            )
+        )
+        assert response.status == "Seat x:10 - y:0 has pos_x greater than row 10"
+        assert [
+            (rejection.seat.pos_x, rejection.seat.pos_y, rejection.reason)
+            for rejection in response.rejected_seats
+        ] == [
+            (10, 0, "has pos_x greater than row 10"),
+            (0, 0, "is already in the room"),
+            (1, 1, "is not available"),
+            (9, 0, "is requested more than once"),
+            (9, 2, "is too close to another requested seat"),
+        ]
+        assert len(response.seats) == 0
+        response = stub.ListRoomSeats(room_pb2.ListRoomSeatsRequest(room_id=room_id))
+        assert len(response.seats) == 1
+
+        # TEST CASE 2: requested seats far from each other are reserved
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id,
+                seats=[
+                    room_pb2.Seat(pos_x=9, pos_y=0),
+                    room_pb2.Seat(pos_x=5, pos_y=10),
+                ],
+            )
+        )
+        assert len(response.seats) == 2
+        assert len(response.rejected_seats) == 0
+
+
+def test_reserve_seats_fast_path(grpc_server, monkeypatch):
+    monkeypatch.setattr(settings, "reserve_fast_path", True)
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=10, col=20))
+        room_id = response.id
+        redis_client = RedisClient()
+
+        # TEST CASE 1: seats far from each other are reserved
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id,
+                seats=[
+                    room_pb2.Seat(pos_x=0, pos_y=0),
+                    room_pb2.Seat(pos_x=0, pos_y=5),
+                ],
+            )
+        )
+        assert len(response.seats) == 2
+        response = stub.ListRoomSeats(room_pb2.ListRoomSeatsRequest(room_id=room_id))
+        assert len(response.seats) == 2
+
+        # TEST CASE 2: seat too close to a taken seat is rejected
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=2, pos_y=2)]
+            )
+        )
+        assert response.status == "Seat x:2 - y:2 is not available"
+
+        # TEST CASE 3: requested seats too close to each other are rejected
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id,
+                seats=[
+                    room_pb2.Seat(pos_x=9, pos_y=0),
+                    room_pb2.Seat(pos_x=9, pos_y=1),
+                ],
+            )
+        )
+        assert (
+            response.status == "Seat x:9 - y:1 is too close to another requested seat"
+        )
+        response = stub.ListRoomSeats(room_pb2.ListRoomSeatsRequest(room_id=room_id))
+        assert len(response.seats) == 2
+
+        # TEST CASE 4: every rejected seat has its reason, nothing is reserved
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id,
+                seats=[
+                    room_pb2.Seat(pos_x=1, pos_y=1),
+                    room_pb2.Seat(pos_x=9, pos_y=0),
+                    room_pb2.Seat(pos_x=9, pos_y=1),
+                    room_pb2.Seat(pos_x=1, pos_y=6),
+                ],
+            )
+        )
+        assert [
+            (rejection.seat.pos_x, rejection.seat.pos_y, rejection.reason)
+            for rejection in response.rejected_seats
+        ] == [
+            (1, 1, "is not available"),
+            (9, 1, "is too close to another requested seat"),
+            (1, 6, "is not available"),
+        ]
+        assert not redis_client.client.getbit(f"room_occupancy_{room_id}", 9 * 20)
+        response = stub.ListRoomSeats(room_pb2.ListRoomSeatsRequest(room_id=room_id))
+        assert len(response.seats) == 2
+
+        # TEST CASE 5: canceled seat can be reserved again
+        response = stub.CancelSeats(
+            room_pb2.CancelSeatsRequest(
+                room_id=room_id, seat_ids=[seat.id for seat in response.seats]
+            )
+        )
+        assert response.status == "Seats are canceled"
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=2, pos_y=2)]
+            )
+        )
+        assert len(response.seats) == 1
+
+        # TEST CASE 6: the bitmap expires
+        assert (
+            0
+            < redis_client.client.ttl(f"room_occupancy_{room_id}")
+            <= (settings.redis_key_ttl)
+        )
+
+        # TEST CASE 7: a bitmap behind the database is dropped
+        redis_client.client.setbit(f"room_occupancy_{room_id}", 2 * 20 + 2, 0)
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=2, pos_y=2)]
+            )
+        )
+        assert len(response.seats) == 0
+        assert not redis_client.client.exists(f"room_occupancy_{room_id}")
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=2, pos_y=3)]
+            )
+        )
+        assert response.status == "Seat x:2 - y:3 is not available"
+
+
+def test_stream_available_seats(grpc_server):
+    # TEST CASE 1: happy case
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=40, col=20))
+        room_id = response.id
+        stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=20, pos_y=10)]
+            )
+        )
+        chunks = list(
+            stub.StreamAvailableSeats(
+                room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+            )
+        )
+        assert len(chunks) > 1
+        assert chunks[-1].row_end == 40
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+        )
+        assert [
+            (seat.pos_x, seat.pos_y) for chunk in chunks for seat in chunk.seats
+        ] == [(seat.pos_x, seat.pos_y) for seat in response.seats]
+
+    # TEST CASE 2: room not found
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        chunks = list(
+            stub.StreamAvailableSeats(room_pb2.GetAvailableSeatsRequest(room_id=999))
+        )
+        assert chunks[0].status == "Room not found"
+
+
+def test_get_available_seats_as_intervals(grpc_server):
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=10, col=20))
+        room_id = response.id
+
+        # TEST CASE 1: empty room is one interval per row
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id, as_intervals=True)
+        )
+        assert len(response.seats) == 0
+        assert [
+            (interval.row, interval.start_col, interval.end_col)
+            for interval in response.intervals
+        ] == [(row, 0, 19) for row in range(10)]
+
+        # TEST CASE 2: intervals expand to the available seats
+        stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=4, pos_y=10)]
+            )
+        )
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id, as_intervals=True)
+        )
+        seats_response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+        )
+        assert [
+            (interval.row, pos_y)
+            for interval in response.intervals
+            for pos_y in range(interval.start_col, interval.end_col + 1)
+        ] == [(seat.pos_x, seat.pos_y) for seat in seats_response.seats]
+
+
+def test_get_available_seats_in_viewport(grpc_server):
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=30, col=40))
+        room_id = response.id
+        stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id,
+                seats=[
+                    room_pb2.Seat(pos_x=10, pos_y=12),
+                    room_pb2.Seat(pos_x=25, pos_y=3),
+                ],
+            )
+        )
+        viewport = room_pb2.SeatRect(row_start=8, row_end=28, col_start=0, col_end=15)
+
+        # TEST CASE 1: viewport computed from the taken seats
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id, viewport=viewport)
+        )
+        seats = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+        ).seats
+        expected = [
+            (seat.pos_x, seat.pos_y)
+            for seat in seats
+            if 8 <= seat.pos_x < 28 and 0 <= seat.pos_y < 15
+        ]
+        assert [(seat.pos_x, seat.pos_y) for seat in response.seats] == expected
+
+        # TEST CASE 2: viewport sliced from the cached intervals
+        stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id, as_intervals=True)
+        )
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(
+                room_id=room_id, viewport=viewport, as_intervals=True
+            )
+        )
+        assert [
+            (interval.row, pos_y)
+            for interval in response.intervals
+            for pos_y in range(interval.start_col, interval.end_col + 1)
+        ] == expected
+
+        # TEST CASE 3: viewport outside the room
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(
+                room_id=room_id,
+                viewport=room_pb2.SeatRect(
+                    row_start=30, row_end=40, col_start=0, col_end=10
+                ),
+            )
+        )
+        assert len(response.seats) == 0
+
+
+def test_count_available_seats(grpc_server):
+    # TEST CASE 1: empty room
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=10, col=20))
+        room_id = response.id
+        response = stub.CountAvailableSeats(
+            room_pb2.CountAvailableSeatsRequest(room_id=room_id)
+        )
+        assert response.count == 200
+
+        # TEST CASE 2: count is updated after reserving seats
+        stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=5, pos_y=5)]
+            )
+        )
+        response = stub.CountAvailableSeats(
+            room_pb2.CountAvailableSeatsRequest(room_id=room_id)
+        )
+        seats = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+        ).seats
+        assert response.count == len(seats)
+
+    # TEST CASE 3: room not found
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.CountAvailableSeats(
+            room_pb2.CountAvailableSeatsRequest(room_id=999)
+        )
+        assert response.status == "Room not found"
+
+
+def test_get_available_seats_batch(grpc_server):
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        room_ids = [
+            stub.AddRoom(room_pb2.AddRoomRequest(row=row, col=10)).id
+            for row in range(4, 8)
+        ]
+        stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_ids[1], seats=[room_pb2.Seat(pos_x=2, pos_y=3)]
+            )
+        )
+
+        # TEST CASE 1: cached and computed rooms match GetAvailableSeats
+        stub.GetAvailableSeats(room_pb2.GetAvailableSeatsRequest(room_id=room_ids[0]))
+        response = stub.GetAvailableSeatsBatch(
+            room_pb2.GetAvailableSeatsBatchRequest(room_ids=room_ids + [999])
+        )
+        assert [room.room_id for room in response.rooms] == room_ids + [999]
+        for room_id, room in zip(room_ids, response.rooms):
+            seats = stub.GetAvailableSeats(
+                room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+            ).seats
+            assert [(seat.pos_x, seat.pos_y) for seat in room.seats] == [
+                (seat.pos_x, seat.pos_y) for seat in seats
+            ]
+
+        # TEST CASE 2: room not found
+        assert response.rooms[-1].status == "Room not found"
+
+
+def test_get_cache_stats(grpc_server):
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=10, col=20))
+        room_id = response.id
+
+        # TEST CASE 1: a repeated read is a hit
+        stub.GetRoom(room_pb2.GetRoomRequest(id=room_id))
+        before = stub.GetCacheStats(empty_pb2.Empty())
+        stub.GetRoom(room_pb2.GetRoomRequest(id=room_id))
+        response = stub.GetCacheStats(empty_pb2.Empty())
+        # The background refresh of earlier tests may hit the cache too
+        assert response.hits >= before.hits + 1
+        assert response.size > 0
+        assert 0 < response.hit_ratio <= 1
+
+
+def test_refresh_after_reserve(grpc_server):
+    with grpc.insecure_channel(f"localhost:{settings.grpc_port}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=10, col=20))
+        room_id = response.id
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=0, pos_y=0)]
+            )
+        )
+        assert len(response.seats) == 1
+
+        # TEST CASE 1: count is cached in the background before it is read
+        redis_client = RedisClient()
+        version = redis_client.get_version(f"room_version_{room_id}")
+        key = f"room_available_seats_{room_id}_v{version}_{settings.min_distance}_count"
+        for _ in range(100):
+            if redis_client.get(key) is not None:
+                break
+            time.sleep(0.01)
+        assert redis_client.get(key) == b"185"
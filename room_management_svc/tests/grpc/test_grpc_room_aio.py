@@ -0,0 +1,147 @@
+"""
+This module contains tests for the async room service module.
+"""
+
+import grpc
+from google.protobuf import empty_pb2
+
+from src.protos_generated import room_pb2, room_pb2_grpc
+
+
+def test_aio_room_seats(aio_grpc_server):
+    with grpc.insecure_channel(f"localhost:{aio_grpc_server}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+
+        # TEST CASE 1: add and get room
+        response = stub.AddRoom(room_pb2.AddRoomRequest(row=10, col=20))
+        assert response.status == "Room added"
+        room_id = response.id
+        response = stub.GetRoom(room_pb2.GetRoomRequest(id=room_id))
+        assert (response.room.row, response.room.col) == (10, 20)
+        response = stub.ListRooms(empty_pb2.Empty())
+        assert room_id in [room.id for room in response.rooms]
+        response = stub.GetRoom(room_pb2.GetRoomRequest(id=999))
+        assert response.status == "Room not found"
+
+        # TEST CASE 2: reserve seats, rejections have their reason
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id,
+                seats=[
+                    room_pb2.Seat(pos_x=0, pos_y=0),
+                    room_pb2.Seat(pos_x=0, pos_y=1),
+                ],
+            )
+        )
+        assert [rejection.reason for rejection in response.rejected_seats] == [
+            "is too close to another requested seat"
+        ]
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id,
+                seats=[
+                    room_pb2.Seat(pos_x=0, pos_y=0),
+                    room_pb2.Seat(pos_x=9, pos_y=19),
+                ],
+            )
+        )
+        assert len(response.seats) == 2
+        response = stub.ReserveSeats(
+            room_pb2.ReserveSeatsRequest(
+                room_id=room_id, seats=[room_pb2.Seat(pos_x=1, pos_y=1)]
+            )
+        )
+        assert response.status == "Seat x:1 - y:1 is not available"
+
+        # TEST CASE 3: availability RPCs are coroutines too
+        response = stub.ListRoomSeats(room_pb2.ListRoomSeatsRequest(room_id=room_id))
+        seat_ids = [seat.id for seat in response.seats]
+        assert len(seat_ids) == 2
+        response = stub.CountAvailableSeats(
+            room_pb2.CountAvailableSeatsRequest(room_id=room_id)
+        )
+        available_count = response.count
+        assert 0 < available_count < 200
+        chunks = list(
+            stub.StreamAvailableSeats(
+                room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+            )
+        )
+        assert sum(len(chunk.seats) for chunk in chunks) == available_count
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+        )
+        assert len(response.seats) == available_count
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id, as_intervals=True)
+        )
+        assert (
+            sum(
+                interval.end_col - interval.start_col + 1
+                for interval in response.intervals
+            )
+            == available_count
+        )
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(
+                room_id=room_id,
+                viewport=room_pb2.SeatRect(
+                    row_start=0, row_end=10, col_start=0, col_end=20
+                ),
+            )
+        )
+        assert len(response.seats) == available_count
+        response = stub.GetAvailableSeatsBatch(
+            room_pb2.GetAvailableSeatsBatchRequest(room_ids=[room_id, 999999])
+        )
+        assert len(response.rooms[0].seats) == available_count
+        assert response.rooms[1].status == "Room not found"
+        response = stub.GetCacheStats(empty_pb2.Empty())
+        assert response.hits + response.misses > 0
+
+        # TEST CASE 4: cancel seats
+        response = stub.CancelSeats(
+            room_pb2.CancelSeatsRequest(room_id=room_id, seat_ids=seat_ids + [999999])
+        )
+        assert response.status == "Seat id 999999 is not found"
+        response = stub.CancelSeats(
+            room_pb2.CancelSeatsRequest(room_id=room_id, seat_ids=seat_ids)
+        )
+        assert response.status == "Seats are canceled"
+        assert len(response.seats) == 2
+        response = stub.GetAvailableSeats(
+            room_pb2.GetAvailableSeatsRequest(room_id=room_id)
+        )
+        assert len(response.seats) == 200
+
+        # TEST CASE 5: remove room
+        response = stub.RemoveRoom(room_pb2.RemoveRoomRequest(id=room_id))
+        assert response.status == "Room removed"
+        response = stub.GetRoom(room_pb2.GetRoomRequest(id=room_id))
+        assert response.status == "Room not found"
+
+
+def test_aio_concurrent_requests(aio_grpc_server):
+    with grpc.insecure_channel(f"localhost:{aio_grpc_server}") as channel:
+        stub = room_pb2_grpc.RoomServiceStub(channel)
+        room_ids = [
+            stub.AddRoom(room_pb2.AddRoomRequest(row=5, col=5)).id for _ in range(20)
+        ]
+
+        # TEST CASE 1: many reservations in flight at once
+        reserve_futures = [
+            stub.ReserveSeats.future(
+                room_pb2.ReserveSeatsRequest(
+                    room_id=room_id, seats=[room_pb2.Seat(pos_x=2, pos_y=2)]
+                )
+            )
+            for room_id in room_ids
+        ]
+        assert all(len(future.result().seats) == 1 for future in reserve_futures)
+
+        # TEST CASE 2: many reads in flight at once
+        seats_futures = [
+            stub.ListRoomSeats.future(room_pb2.ListRoomSeatsRequest(room_id=room_id))
+            for room_id in room_ids * 10
+        ]
+        assert all(len(future.result().seats) == 1 for future in seats_futures)
@@ -0,0 +1,118 @@
+"""
+This module contains tests for the availability repository module.
+"""
+
+from src.entities.seats import Seat
+from src.repositories.availability_repository import AvailabilityRepository
+from src.repositories.room_repository import RoomRepository
+from src.services.redis_client import RedisClient
+from src.use_cases.availability_engine import (
+    get_blocked_counts,
+    get_blocking_radius,
+    get_occupancy,
+)
+
+
+def test_blocked_counts():
+    """
+    Tests the state is only stored from current seats and updated once per seat
+    """
+    room = RoomRepository().add_room(row=10, col=20)
+    availability_repository = AvailabilityRepository()
+    redis_client = RedisClient()
+    radius = get_blocking_radius(5)
+    room.add_seats([Seat(pos_x=2, pos_y=3)])
+    counts = get_blocked_counts(get_occupancy(room), 5)
+
+    # TEST CASE 1: seats read before a write are not stored
+    version = redis_client.get_version(f"room_version_{room.id}")
+    availability_repository.update_blocked_counts(
+        room=room, min_distance=5, seats=[(2, 3)], taken=True, radius=radius
+    )
+    availability_repository.set_blocked_counts(
+        room=room, min_distance=5, counts=counts, version=version
+    )
+    assert availability_repository.get_blocked_counts(room=room, min_distance=5) is None
+
+    # TEST CASE 2: a seat already in the state is not counted twice
+    availability_repository.set_blocked_counts(
+        room=room, min_distance=5, counts=counts, version=version + 1
+    )
+    assert availability_repository.update_blocked_counts(
+        room=room, min_distance=5, seats=[(2, 3)], taken=True, radius=radius
+    )
+    assert (
+        availability_repository.get_blocked_counts(room=room, min_distance=5) == counts
+    ).all()
+
+    # TEST CASE 3: new seats are counted, canceled seats are given back
+    availability_repository.update_blocked_counts(
+        room=room, min_distance=5, seats=[(7, 15)], taken=True, radius=radius
+    )
+    room.add_seats([Seat(pos_x=7, pos_y=15)])
+    assert (
+        availability_repository.get_blocked_counts(room=room, min_distance=5)
+        == get_blocked_counts(get_occupancy(room), 5)
+    ).all()
+    availability_repository.update_blocked_counts(
+        room=room, min_distance=5, seats=[(7, 15)], taken=False, radius=radius
+    )
+    assert (
+        availability_repository.get_blocked_counts(room=room, min_distance=5) == counts
+    ).all()
+
+    # TEST CASE 4: a counter below 0 drops the state
+    redis_client.client.setbit(
+        f"room_blocked_counts_{room.id}_5", room.row * room.col * 16 + 9 * 20 + 19, 1
+    )
+    assert not availability_repository.update_blocked_counts(
+        room=room, min_distance=5, seats=[(9, 19)], taken=False, radius=radius
+    )
+    assert availability_repository.get_blocked_counts(room=room, min_distance=5) is None
+
+    # TEST CASE 5: cached seats are deleted by the script bumping the version
+    redis_client.set(f"seat_{room.id}_1", b"seat")
+    version = redis_client.get_version(f"room_version_{room.id}")
+    availability_repository.update_blocked_counts(
+        room=room,
+        min_distance=5,
+        seats=[(2, 3)],
+        taken=False,
+        radius=radius,
+        deleted_keys=[f"seat_{room.id}_1"],
+    )
+    assert redis_client.get(f"seat_{room.id}_1") is None
+    assert redis_client.get_version(f"room_version_{room.id}") == version + 1
+
+
+def test_blocked_counts_in_process():
+    """
+    Tests the decoded state is kept in process under the room version
+    """
+    room = RoomRepository().add_room(row=10, col=20)
+    availability_repository = AvailabilityRepository()
+    redis_client = RedisClient()
+    room.add_seats([Seat(pos_x=4, pos_y=4)])
+    counts = get_blocked_counts(get_occupancy(room), 5)
+    version = redis_client.get_version(f"room_version_{room.id}")
+    availability_repository.set_blocked_counts(
+        room=room, min_distance=5, counts=counts, version=version
+    )
+
+    # TEST CASE 1: read at a version, later reads of it skip Redis
+    redis_client.delete(f"room_blocked_counts_{room.id}_5")
+    assert availability_repository.get_blocked_counts(room=room, min_distance=5) is None
+    assert (
+        availability_repository.get_blocked_counts(
+            room=room, min_distance=5, version=version
+        )
+        == counts
+    ).all()
+
+    # TEST CASE 2: another version is read from Redis
+    assert (
+        availability_repository.get_blocked_counts(
+            room=room, min_distance=5, version=version + 1
+        )
+        is None
+    )
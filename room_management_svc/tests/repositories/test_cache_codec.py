@@ -0,0 +1,102 @@
+"""
+This module contains tests for the cache codec module.
+"""
+
+import json
+
+import pytest
+
+from src.entities.rooms import Room
+from src.entities.seats import Seat
+from src.repositories.cache_codec import (
+    BINARY_FORMAT_VERSION,
+    BinaryCacheCodec,
+    JsonCacheCodec,
+    get_cache_codec,
+)
+
+
+def room_fields(room):
+    return (room.id, room.row, room.col, room.is_deleted)
+
+
+def seat_fields(seat):
+    return (seat.id, seat.pos_x, seat.pos_y)
+
+
+@pytest.mark.parametrize("writer", [JsonCacheCodec(), BinaryCacheCodec()])
+@pytest.mark.parametrize("reader", [JsonCacheCodec(), BinaryCacheCodec()])
+def test_round_trip(writer, reader):
+    """
+    Tests every codec reads values written by any codec
+    """
+    rooms = [Room(id=1, row=10, col=20), Room(id=2, row=3, col=4, is_deleted=True)]
+    seats = [Seat(id=1, pos_x=0, pos_y=0), Seat(id=7, pos_x=9, pos_y=19)]
+
+    # TEST CASE 1: rooms
+    assert room_fields(reader.decode_room(writer.encode_room(rooms[0]))) == (
+        room_fields(rooms[0])
+    )
+    assert [
+        room_fields(room) for room in reader.decode_rooms(writer.encode_rooms(rooms))
+    ] == [room_fields(room) for room in rooms]
+    assert reader.decode_rooms(writer.encode_rooms([])) == []
+
+    # TEST CASE 2: seats
+    assert seat_fields(reader.decode_seat(writer.encode_seat(seats[1]))) == (
+        seat_fields(seats[1])
+    )
+    assert [
+        seat_fields(seat) for seat in reader.decode_seats(writer.encode_seats(seats))
+    ] == [seat_fields(seat) for seat in seats]
+
+    # TEST CASE 3: records are encoded like models
+    records = reader.decode_seats(writer.encode_seats(seats))
+    assert [
+        seat_fields(seat) for seat in reader.decode_seats(writer.encode_seats(records))
+    ] == [seat_fields(seat) for seat in seats]
+
+    # TEST CASE 4: positions and intervals
+    assert reader.decode_positions(writer.encode_positions([(0, 1), (2, 3)]), 2) == [
+        (0, 1),
+        (2, 3),
+    ]
+    assert reader.decode_positions(writer.encode_positions([(4, 0, 9)]), 3) == [
+        (4, 0, 9)
+    ]
+    assert reader.decode_positions(writer.encode_positions([]), 2) == []
+
+
+def test_binary_layout():
+    """
+    Tests binary values start with the format version and are compact
+    """
+    seats = [Seat(id=seat_id, pos_x=seat_id, pos_y=seat_id) for seat_id in range(100)]
+    value = BinaryCacheCodec().encode_seats(seats)
+    assert value[0] == BINARY_FORMAT_VERSION
+    assert len(value) * 3 < len(JsonCacheCodec().encode_seats(seats))
+
+    # TEST CASE 1: rooms of decoded records have their own seats
+    room_1, room_2 = [
+        record.to_room()
+        for record in BinaryCacheCodec().decode_rooms(
+            BinaryCacheCodec().encode_rooms([Room(id=1, row=2, col=2)] * 2)
+        )
+    ]
+    room_1.add_seats([Seat(pos_x=0, pos_y=0)])
+    assert len(room_2.seats) == 0
+
+    # TEST CASE 2: unknown codec
+    with pytest.raises(ValueError):
+        get_cache_codec("xml")
+
+
+def test_read_previous_formats():
+    """
+    Tests JSON values written before the binary codec are still read
+    """
+    # TEST CASE 1: JSON of models with timestamps
+    value = json.dumps([Seat(id=3, pos_x=1, pos_y=2).model_dump_json()]).encode()
+    assert [seat_fields(seat) for seat in BinaryCacheCodec().decode_seats(value)] == [
+        (3, 1, 2)
+    ]
@@ -0,0 +1,108 @@
+"""
+This module contains tests for the seat repository module.
+"""
+
+from src.repositories.room_repository import RoomRepository
+from src.repositories.seat_repository import SeatRepository
+
+
+def bump_room_version(seat_repository: SeatRepository, room_id: int):
+    # Writers bump the version with the blocked counts of the room
+    seat_repository.redis_client.incr(f"room_version_{room_id}")
+    seat_repository.invalidate_room(room_id)
+
+
+def test_reverse_and_cancel_seats():
+    """
+    Tests seats are reserved and canceled in bulk and only changed seats are reported
+    """
+    room = RoomRepository().add_room(row=10, col=20)
+    seat_repository = SeatRepository()
+
+    # TEST CASE 1: reserve new seats, duplicates are inserted once
+    assert seat_repository.reverse_seats(
+        room_id=room.id, seats=[(3, 4), (0, 0), (3, 4)]
+    ) == [(3, 4), (0, 0)]
+    bump_room_version(seat_repository, room.id)
+    assert sorted(
+        (seat.pos_x, seat.pos_y)
+        for seat in seat_repository.list_seats_by_room_id(room.id)
+    ) == [(0, 0), (3, 4)]
+
+    # TEST CASE 2: taken seats are skipped
+    assert seat_repository.reverse_seats(room_id=room.id, seats=[(0, 0), (9, 19)]) == [
+        (9, 19)
+    ]
+    assert seat_repository.reverse_seats(room_id=room.id, seats=[(0, 0)]) == []
+    assert seat_repository.reverse_seats(room_id=room.id, seats=[]) == []
+    bump_room_version(seat_repository, room.id)
+
+    # TEST CASE 3: cancel seats, free seats are skipped
+    seats = seat_repository.list_seats_by_room_id(room.id)
+    assert sorted(seat_repository.cancel_seats(room_id=room.id, seats=seats)) == [
+        (0, 0),
+        (3, 4),
+        (9, 19),
+    ]
+    assert seat_repository.cancel_seats(room_id=room.id, seats=seats) == []
+    bump_room_version(seat_repository, room.id)
+    assert seat_repository.list_seats_by_room_id(room.id) == []
+
+
+def test_get_seats_with_room_id():
+    """
+    Tests seats are looked up in bulk and missing ids are reported
+    """
+    room_repository = RoomRepository()
+    room = room_repository.add_room(row=10, col=20)
+    other_room = room_repository.add_room(row=10, col=20)
+    seat_repository = SeatRepository()
+    seat_repository.reverse_seats(room_id=room.id, seats=[(0, 0), (5, 5)])
+    seat_repository.reverse_seats(room_id=other_room.id, seats=[(1, 1)])
+    bump_room_version(seat_repository, room.id)
+    bump_room_version(seat_repository, other_room.id)
+    seat_ids = [seat.id for seat in seat_repository.list_seats_by_room_id(room.id)]
+    other_seat_id = seat_repository.list_seats_by_room_id(other_room.id)[0].id
+
+    # TEST CASE 1: from the database, then from the cache
+    for _ in range(2):
+        seats, missing_seat_ids = seat_repository.get_seats_with_room_id(
+            seat_ids=seat_ids + [other_seat_id, 999999, seat_ids[0]], room_id=room.id
+        )
+        assert [seat.id for seat in seats] == seat_ids
+        assert missing_seat_ids == [other_seat_id, 999999]
+
+    # TEST CASE 2: canceled seats are missing
+    seat_repository.cancel_seats(room_id=room.id, seats=seats[:1])
+    bump_room_version(seat_repository, room.id)
+    seat_repository.invalidate_room(room.id, seat_ids=seat_ids[:1])
+    assert seat_repository.get_seat_with_room_id(seat_ids[0], room_id=room.id) is None
+    assert seat_repository.get_seat_with_room_id(seat_ids[1], room_id=room.id) == (
+        seats[1]
+    )
+
+
+def test_list_seats_in_rect():
+    """
+    Tests only the seats of the rectangle are listed
+    """
+    room = RoomRepository().add_room(row=10, col=20)
+    seat_repository = SeatRepository()
+    seat_repository.reverse_seats(
+        room_id=room.id, seats=[(0, 0), (2, 5), (4, 9), (4, 10), (9, 19)]
+    )
+
+    # TEST CASE 1: ends are exclusive
+    assert sorted(
+        seat_repository.list_seats_in_rect(
+            room_id=room.id, row_start=2, row_end=5, col_start=5, col_end=10
+        )
+    ) == [(2, 5), (4, 9)]
+
+    # TEST CASE 2: empty rectangle
+    assert (
+        seat_repository.list_seats_in_rect(
+            room_id=room.id, row_start=5, row_end=9, col_start=0, col_end=20
+        )
+        == []
+    )
@@ -0,0 +1,63 @@
+"""
+This module contains tests for the availability executor module.
+"""
+
+import random
+
+import pytest
+
+from src.entities.rooms import Room
+from src.entities.seats import Seat
+from src.services.availability_executor import AvailabilityExecutor
+from src.use_cases.availability_engine import (
+    compute_blocked_counts,
+    compute_distance_map,
+    get_blocked_counts,
+    get_distance_map,
+    get_occupancy,
+)
+
+
+def test_availability_executor():
+    """
+    Tests offloaded computation matches inline computation
+    """
+    rand = random.Random(6)
+    room = Room(row=30, col=40)
+    room.add_seats(
+        [Seat(pos_x=rand.randrange(30), pos_y=rand.randrange(40)) for _ in range(10)]
+    )
+    occupancy = get_occupancy(room)
+
+    # TEST CASE 1: unknown mode
+    with pytest.raises(ValueError) as _:
+        AvailabilityExecutor(mode="unknown")
+
+    # TEST CASE 2: thread mode runs inline
+    executor = AvailabilityExecutor(mode="thread", offload_min_seats=0, max_workers=2)
+    assert not executor.is_offloaded(room)
+    assert (
+        executor.run(compute_blocked_counts, room, 5)
+        == get_blocked_counts(occupancy, 5)
+    ).all()
+    assert (
+        executor.submit(compute_distance_map, room).result()
+        == get_distance_map(occupancy)
+    ).all()
+    executor.shutdown()
+
+    # TEST CASE 3: process mode offloads rooms above the threshold
+    executor = AvailabilityExecutor(
+        mode="process", offload_min_seats=30 * 40, max_workers=2
+    )
+    assert executor.is_offloaded(room)
+    assert not executor.is_offloaded(Room(row=10, col=10))
+    assert (
+        executor.run(compute_blocked_counts, room, 5)
+        == get_blocked_counts(occupancy, 5)
+    ).all()
+    assert (
+        executor.submit(compute_distance_map, room).result()
+        == get_distance_map(occupancy)
+    ).all()
+    executor.shutdown()
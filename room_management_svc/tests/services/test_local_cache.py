@@ -0,0 +1,102 @@
+"""
+This module contains tests for the local cache module.
+"""
+
+import time
+
+import numpy as np
+
+from src.services.local_cache import LocalCache
+
+
+def test_lru_and_ttl():
+    """
+    Tests eviction of the least recently used and expired entries
+    """
+    local_cache = LocalCache(max_size=2, ttl=60, max_bytes=1024 * 1024)
+
+    # TEST CASE 1: least recently used entry is evicted
+    local_cache.set("a", 1)
+    local_cache.set("b", 2)
+    assert local_cache.get("a") == 1
+    local_cache.set("c", 3)
+    assert local_cache.get("b") is None
+    assert local_cache.get("a") == 1
+    assert local_cache.get("c") == 3
+
+    stats = local_cache.get_stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (3, 1, 1, 2)
+    assert stats.hit_ratio == 0.75
+
+    # TEST CASE 2: expired entry is a miss
+    local_cache.ttl = 0
+    local_cache.set("d", 4)
+    time.sleep(0.01)
+    assert local_cache.get("d") is None
+
+    # TEST CASE 3: disabled cache keeps nothing
+    local_cache = LocalCache(max_size=0, ttl=60, max_bytes=1024 * 1024)
+    local_cache.set("a", 1)
+    assert local_cache.get("a") is None
+
+
+def test_max_bytes():
+    """
+    Tests the cache is bounded by the estimated bytes of the values
+    """
+    local_cache = LocalCache(max_size=10, ttl=60, max_bytes=10000)
+
+    # TEST CASE 1: arrays are counted by their buffer
+    local_cache.set("a", np.zeros(4000, dtype=np.uint8))
+    local_cache.set("b", np.zeros(4000, dtype=np.uint8))
+    assert local_cache.bytes == 8000
+    local_cache.set("c", np.zeros(4000, dtype=np.uint8))
+    assert local_cache.get("a") is None
+    assert local_cache.get("b") is not None
+    assert local_cache.bytes == 8000
+
+    # TEST CASE 2: a value larger than the cache is not kept
+    local_cache.set("d", np.zeros(20000, dtype=np.uint8))
+    assert local_cache.get("d") is None
+    assert local_cache.get("c") is not None
+
+    # TEST CASE 3: lists are estimated from their first item
+    local_cache.set("e", [(1, 2, 3)] * 1000)
+    assert local_cache.get("e") is None
+    local_cache.delete("b", "c")
+    assert local_cache.bytes == 0
+
+
+def test_epoch():
+    """
+    Tests a value read before an invalidation is not cached
+    """
+    local_cache = LocalCache(max_size=10, ttl=60, max_bytes=1024 * 1024)
+    epoch = local_cache.get_epoch()
+    local_cache.delete("a")
+    local_cache.set("a", 1, epoch=epoch)
+    assert local_cache.get("a") is None
+
+    local_cache.set("a", 1, epoch=local_cache.get_epoch())
+    assert local_cache.get("a") == 1
+
+
+def test_invalidate_other_replica():
+    """
+    Tests invalidation is published to every subscribed cache
+    """
+    local_cache = LocalCache(max_size=10, ttl=60, max_bytes=1024 * 1024)
+    other_local_cache = LocalCache(max_size=10, ttl=60, max_bytes=1024 * 1024)
+    other_local_cache.subscribe()
+    other_local_cache.set("a", 1)
+
+    local_cache.set("a", 1)
+    local_cache.invalidate(["a"])
+    assert local_cache.get("a") is None
+
+    for _ in range(100):
+        if other_local_cache.get("a") is None:
+            break
+        time.sleep(0.01)
+    assert other_local_cache.get("a") is None
+    other_local_cache.subscriber.stop()
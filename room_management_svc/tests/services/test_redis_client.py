@@ -0,0 +1,99 @@
+"""
+This module contains tests for the redis client module.
+"""
+
+import uuid
+from typing import Callable, List
+
+import pytest
+
+from src.services.redis_client import RedisClient
+
+
+@pytest.fixture
+def make_key():
+    # Keys are unique per run and deleted afterwards, so runs don't share state
+    redis_client = RedisClient()
+    prefix = f"test_{uuid.uuid4().hex}"
+    keys: List[str] = []
+
+    def make(name: str) -> str:
+        keys.append(f"{prefix}_{name}")
+        return keys[-1]
+
+    yield make
+    redis_client.delete(*keys)
+
+
+def test_acquire_locks(make_key: Callable[[str], str]):
+    """
+    Tests all-or-nothing lock of many keys
+    """
+    redis_client = RedisClient()
+    redis_client.dlm.retry_delay = 0
+    lock_1, lock_2, lock_3 = make_key("lock_1"), make_key("lock_2"), make_key("lock_3")
+
+    # TEST CASE 1: acquire all keys
+    lock = redis_client.acquire_locks([lock_1, lock_2, lock_2], 10000)
+    assert lock is not None
+    assert lock.resources == [lock_1, lock_2]
+    assert redis_client.get(lock_1) == lock.key
+    assert 0 < redis_client.client.pttl(lock_2) <= 10000
+
+    # TEST CASE 2: overlapping keys acquire nothing
+    assert redis_client.acquire_locks([lock_3, lock_2], 10000) is None
+    assert redis_client.get(lock_3) is None
+
+    # TEST CASE 3: release only keys holding the token
+    redis_client.set(lock_1, "other")
+    assert redis_client.release_locks(lock) == 1
+    assert redis_client.get(lock_1) == b"other"
+    assert redis_client.get(lock_2) is None
+    redis_client.client.delete(lock_1)
+
+    # TEST CASE 4: keys can be acquired again after release
+    lock = redis_client.acquire_locks([lock_3, lock_2], 10000)
+    assert lock is not None
+    assert redis_client.release_locks(lock) == 2
+
+
+def test_versions(make_key: Callable[[str], str]):
+    """
+    Tests generation counters used in cache keys
+    """
+    redis_client = RedisClient()
+    version_1, version_2 = make_key("version_1"), make_key("version_2")
+
+    # TEST CASE 1: missing counter is version 0
+    assert redis_client.get_version(version_1) == 0
+
+    # TEST CASE 2: incr bumps the version
+    assert redis_client.incr(version_1) == 1
+    assert redis_client.incr(version_1) == 2
+    assert redis_client.get_versions([version_1, version_2]) == [2, 0]
+
+
+def test_batched_operations(make_key: Callable[[str], str]):
+    """
+    Tests multi-key set, get and delete
+    """
+    redis_client = RedisClient()
+    batch_1, batch_2, batch_3, batch_4 = (
+        make_key("batch_1"),
+        make_key("batch_2"),
+        make_key("batch_3"),
+        make_key("batch_4"),
+    )
+
+    # TEST CASE 1: set many keys with a TTL
+    redis_client.set_many({batch_1: "a", batch_2: "b"}, ex=100)
+    assert redis_client.mget([batch_1, batch_2, batch_3]) == [b"a", b"b", None]
+    assert 0 < redis_client.client.ttl(batch_2) <= 100
+
+    # TEST CASE 2: nx keeps existing keys
+    redis_client.set_many({batch_1: "c", batch_3: "d"}, nx=True)
+    assert redis_client.mget([batch_1, batch_3]) == [b"a", b"d"]
+
+    # TEST CASE 3: delete many keys
+    assert redis_client.delete(batch_1, batch_2, batch_4) == 2
+    assert redis_client.delete() == 0
@@ -0,0 +1,150 @@
+"""
+This module contains tests for the single flight module.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.config import settings
+from src.services.async_redis_client import AsyncRedisClient
+from src.services.async_single_flight import AsyncSingleFlight
+from src.services.redis_client import RedisClient
+from src.services.single_flight import SingleFlight
+
+
+def test_coalesce_in_process():
+    """
+    Tests concurrent misses of a key are computed once
+    """
+    single_flight = SingleFlight(RedisClient())
+    cache = {}
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        cache["test_single_flight_1"] = 42
+        return 42
+
+    # TEST CASE 1: one computation for every caller
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(
+                single_flight.do,
+                "test_single_flight_1",
+                lambda: cache.get("test_single_flight_1"),
+                compute,
+            )
+            for _ in range(8)
+        ]
+        assert [future.result() for future in futures] == [42] * 8
+    assert len(calls) == 1
+    assert single_flight.futures == {}
+
+    # TEST CASE 2: error of the computation is raised and not kept
+    def fail():
+        raise RuntimeError("failed")
+
+    with pytest.raises(RuntimeError):
+        single_flight.do("test_single_flight_2", lambda: None, fail)
+    assert single_flight.do("test_single_flight_2", lambda: None, lambda: 1) == 1
+
+
+def test_lease_across_replicas(monkeypatch):
+    """
+    Tests a replica waits for the one holding the lease
+    """
+    monkeypatch.setattr(settings, "single_flight_lease_ms", 1000)
+    redis_client = RedisClient()
+    single_flight = SingleFlight(redis_client)
+    lock = redis_client.try_acquire_lock("single_flight_test_single_flight_3", 1000)
+    assert lock is not None
+    assert (
+        redis_client.try_acquire_lock("single_flight_test_single_flight_3", 1000)
+        is None
+    )
+
+    # TEST CASE 1: value cached by the other replica is returned
+    cache = {}
+    threading.Timer(0.05, lambda: cache.update(test_single_flight_3=7)).start()
+    value = single_flight.do(
+        "test_single_flight_3",
+        lambda: cache.get("test_single_flight_3"),
+        lambda: 0,
+    )
+    assert value == 7
+
+    # TEST CASE 2: stale value is served while the other replica computes
+    monkeypatch.setattr(settings, "serve_stale_while_revalidate", True)
+    value = single_flight.do(
+        "test_single_flight_3",
+        lambda: None,
+        lambda: 0,
+        get_stale=lambda: 6,
+    )
+    assert value == 6
+    redis_client.release_locks(lock)
+
+    # TEST CASE 3: the lease is released after computing
+    assert single_flight.do("test_single_flight_3", lambda: None, lambda: 8) == 8
+    assert redis_client.get("single_flight_test_single_flight_3") is None
+
+
+def test_async_leader_cancelled():
+    """
+    Tests a cancelled caller doesn't cancel the computation of the others
+    """
+
+    async def run():
+        redis_client = AsyncRedisClient()
+        single_flight = AsyncSingleFlight(redis_client)
+        cache = {}
+        calls = []
+        started = asyncio.Event()
+
+        async def get():
+            return cache.get("test_single_flight_4")
+
+        async def compute():
+            calls.append(1)
+            started.set()
+            await asyncio.sleep(0.05)
+            cache["test_single_flight_4"] = 42
+            return 42
+
+        leader = asyncio.create_task(
+            single_flight.do("test_single_flight_4", get, compute)
+        )
+        await started.wait()
+        follower = asyncio.create_task(
+            single_flight.do("test_single_flight_4", get, compute)
+        )
+        await asyncio.sleep(0)
+
+        # TEST CASE 1: the follower gets the value of the cancelled leader
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await follower == 42
+        assert len(calls) == 1
+        assert single_flight.futures == {}
+
+        # TEST CASE 2: error of the computation is raised and not kept
+        async def fail():
+            raise RuntimeError("failed")
+
+        async def miss():
+            return None
+
+        with pytest.raises(RuntimeError):
+            await single_flight.do("test_single_flight_5", miss, fail)
+        assert single_flight.futures == {}
+        await redis_client.close()
+
+    asyncio.run(run())
@@ -0,0 +1,103 @@
+"""
+This module contains tests for the availability refresher module.
+"""
+
+import asyncio
+import threading
+import time
+
+from src.entities.rooms import Room
+from src.use_cases.availability_refresher import AvailabilityRefresher
+
+
+class FakeRoomManagement:
+    def __init__(self):
+        self.refreshed = []
+        self.event = threading.Event()
+        self.flushed = 0
+        self.flush_event = threading.Event()
+
+    def get_room(self, room_id):
+        return Room(id=room_id, row=10, col=10) if room_id > 0 else None
+
+    def refresh_room_availability(self, room, min_distance):
+        self.refreshed.append(room.id)
+        self.event.set()
+
+    def flush_room_requests(self):
+        self.flushed += 1
+        self.flush_event.set()
+
+
+class FakeAsyncRoomManagement(FakeRoomManagement):
+    async def get_room(self, room_id):
+        return super().get_room(room_id)
+
+    async def refresh_room_availability(self, room, min_distance):
+        # Runs on the event loop the refresher was started from
+        self.loop = asyncio.get_running_loop()
+        super().refresh_room_availability(room, min_distance)
+
+    async def flush_room_requests(self):
+        super().flush_room_requests()
+
+
+def test_debounce():
+    """
+    Tests changes of a room are folded into one refresh
+    """
+    room_management = FakeRoomManagement()
+    refresher = AvailabilityRefresher(room_management, debounce_ms=50)
+
+    # TEST CASE 1: burst of changes is one refresh
+    for _ in range(10):
+        refresher.notify(1)
+    refresher.notify(0)
+    assert room_management.refreshed == []
+    assert room_management.event.wait(1)
+    time.sleep(0.1)
+    assert room_management.refreshed == [1]
+
+    # TEST CASE 2: immediate refresh skips the debounce
+    room_management.event.clear()
+    refresher.notify(2, delay=0)
+    assert room_management.event.wait(1)
+    assert room_management.refreshed == [1, 2]
+
+
+def test_flush_room_requests():
+    """
+    Tests counted reads are flushed periodically by the refresher thread
+    """
+    room_management = FakeRoomManagement()
+    refresher = AvailabilityRefresher(room_management, debounce_ms=50, flush_ms=50)
+
+    # TEST CASE 1: flushed without any refresh
+    refresher.start()
+    assert room_management.flush_event.wait(1)
+    assert room_management.refreshed == []
+
+    # TEST CASE 2: flushed again on the next interval
+    room_management.flush_event.clear()
+    assert room_management.flush_event.wait(1)
+    assert room_management.flushed >= 2
+
+
+def test_refresh_coroutines():
+    """
+    Tests coroutine use cases are awaited on the event loop of the caller
+    """
+    room_management = FakeAsyncRoomManagement()
+    refresher = AvailabilityRefresher(room_management, debounce_ms=0)
+
+    async def notify():
+        refresher.notify(1)
+        # Keep the loop running while the refresher thread waits for it
+        while not room_management.event.is_set():
+            await asyncio.sleep(0.01)
+        return asyncio.get_running_loop()
+
+    # TEST CASE 1: refreshed on the loop which started the refresher
+    loop = asyncio.run(asyncio.wait_for(notify(), 1))
+    assert room_management.refreshed == [1]
+    assert room_management.loop is loop
@@ -2,13 +2,50 @@
 This module contains tests for the room management module.
 """
 
+import random
 from typing import Counter, List, Tuple
 
+import numpy as np
+
+from src.config import settings
 from src.entities.rooms import Room
 from src.entities.seats import Seat
+from src.use_cases.availability_engine import (
+    decode_distance_map,
+    encode_distance_map,
+    get_available_intervals,
+    get_available_mask_from_distance_map,
+    get_available_mask_in_rect,
+    get_available_seats_from_distance_map,
+    get_blocked_counts,
+    get_blocking_radius,
+    get_distance_map,
+    get_occupancy,
+    iter_available_seats,
+)
 from src.use_cases.room_management import RoomManagement
 
 
+def get_diamond_indices(
+    pos_x: int, pos_y: int, radius: int, row: int, col: int
+) -> List[int]:
+    """
+    Row-major indices of the seats within manhattan radius of (pos_x, pos_y),
+    reference for the diamond the Lua scripts update in place
+    """
+    indices: List[int] = []
+    for pos_x_diamond in range(
+        max(pos_x - radius, 0), min(pos_x + radius, row - 1) + 1
+    ):
+        width = radius - abs(pos_x_diamond - pos_x)
+        pos_y_min = max(pos_y - width, 0)
+        pos_y_max = min(pos_y + width, col - 1)
+        indices += range(
+            pos_x_diamond * col + pos_y_min, pos_x_diamond * col + pos_y_max + 1
+        )
+    return indices
+
+
 def test_get_available_seats():
     """
     Tests get available seats
@@ -160,3 +197,234 @@ def test_get_available_seats():
     ]
     print(available_seats)
     assert len(available_seats) == len(expected)
+
+
+def test_get_available_seats_brute_force():
+    """
+    Tests available seats match the manhattan distance to every taken seat
+    """
+    room_management = RoomManagement()
+
+    # TEST CASE 1: empty room
+    room = Room(row=5, col=10)
+    assert len(room_management.get_available_seats(room=room, min_distance=5)) == 50
+
+    # TEST CASE 2: sparse rooms with random taken seats
+    rand = random.Random(0)
+    for row, col, count, min_distance in [
+        (5, 10, 2, 3),
+        (20, 30, 4, 5),
+        (30, 20, 6, 2),
+        (40, 40, 10, 1),
+        (3, 50, 3, 0),
+    ]:
+        room = Room(row=row, col=col)
+        room.add_seats(
+            [
+                Seat(pos_x=rand.randrange(row), pos_y=rand.randrange(col))
+                for _ in range(count)
+            ]
+        )
+        expected = [
+            (pos_x, pos_y)
+            for pos_x in range(row)
+            for pos_y in range(col)
+            if all(
+                (pos_x, pos_y) != (seat.pos_x, seat.pos_y)
+                and abs(pos_x - seat.pos_x) + abs(pos_y - seat.pos_y) >= min_distance
+                for seat in room.seats
+            )
+        ]
+        assert expected
+        assert (
+            room_management.get_available_seats(room=room, min_distance=min_distance)
+            == expected
+        )
+
+    # TEST CASE 3: min_distance is larger than the room
+    room = Room(row=3, col=3)
+    room.add_seats([Seat(pos_x=1, pos_y=1)])
+    assert room_management.get_available_seats(room=room, min_distance=10) == []
+
+
+def test_distance_map():
+    """
+    Tests thresholding the distance map matches the available seats
+    """
+    room_management = RoomManagement()
+
+    # TEST CASE 1: empty room is available for any min_distance
+    room = Room(row=5, col=10)
+    distance_map = get_distance_map(get_occupancy(room))
+    assert len(get_available_seats_from_distance_map(distance_map, 100)) == 50
+
+    # TEST CASE 2: every min_distance from the same map
+    rand = random.Random(1)
+    room = Room(row=20, col=30)
+    room.add_seats(
+        [Seat(pos_x=rand.randrange(20), pos_y=rand.randrange(30)) for _ in range(8)]
+    )
+    distance_map = get_distance_map(get_occupancy(room))
+    for min_distance in range(0, 10):
+        assert get_available_seats_from_distance_map(
+            distance_map, min_distance
+        ) == room_management.get_available_seats(room=room, min_distance=min_distance)
+
+    # TEST CASE 3: encode and decode
+    assert (
+        decode_distance_map(encode_distance_map(distance_map), 20, 30) == distance_map
+    ).all()
+
+
+def test_blocked_counts():
+    """
+    Tests updating blocked counts in place matches rebuilding them
+    """
+    rand = random.Random(2)
+    room = Room(row=15, col=25)
+    seats = list({(rand.randrange(15), rand.randrange(25)) for _ in range(12)})
+    room.add_seats([Seat(pos_x=pos_x, pos_y=pos_y) for pos_x, pos_y in seats])
+
+    for min_distance in range(0, 7):
+        expected = get_blocked_counts(get_occupancy(room), min_distance)
+
+        # TEST CASE 1: reserve seats one by one
+        counts = np.zeros((15, 25), dtype=np.int32)
+        radius = get_blocking_radius(min_distance)
+        for pos_x, pos_y in seats:
+            np.add.at(
+                counts.ravel(), get_diamond_indices(pos_x, pos_y, radius, 15, 25), 1
+            )
+        assert (counts == expected).all()
+
+        # TEST CASE 2: available seats are the seats without blocking seats
+        assert [
+            (pos_x, pos_y) for pos_x, pos_y in np.argwhere(counts == 0).tolist()
+        ] == RoomManagement().get_available_seats(room=room, min_distance=min_distance)
+
+        # TEST CASE 3: cancel a seat
+        pos_x, pos_y = seats[0]
+        np.add.at(counts.ravel(), get_diamond_indices(pos_x, pos_y, radius, 15, 25), -1)
+        room_after_cancel = Room(row=15, col=25)
+        room_after_cancel.add_seats(
+            [Seat(pos_x=pos_x, pos_y=pos_y) for pos_x, pos_y in seats[1:]]
+        )
+        assert (
+            counts == get_blocked_counts(get_occupancy(room_after_cancel), min_distance)
+        ).all()
+
+
+def test_iter_available_seats():
+    """
+    Tests available seats by chunk of rows match the available seats
+    """
+    room_management = RoomManagement()
+    rand = random.Random(3)
+    room = Room(row=23, col=17)
+    room.add_seats(
+        [Seat(pos_x=rand.randrange(23), pos_y=rand.randrange(17)) for _ in range(6)]
+    )
+
+    for min_distance in [0, 1, 5]:
+        for chunk_rows in [1, 4, 23, 100]:
+            chunks = list(
+                iter_available_seats(get_occupancy(room), min_distance, chunk_rows)
+            )
+
+            # TEST CASE 1: chunks cover all rows in order
+            assert chunks[0][0] == 0
+            assert chunks[-1][1] == 23
+            for previous_chunk, chunk in zip(chunks, chunks[1:]):
+                assert previous_chunk[1] == chunk[0]
+
+            # TEST CASE 2: chunks concatenate to all available seats
+            assert [
+                seat for _, _, seats in chunks for seat in seats
+            ] == room_management.get_available_seats(
+                room=room, min_distance=min_distance
+            )
+
+
+def test_get_available_intervals():
+    """
+    Tests available intervals expand to the available seats
+    """
+    # TEST CASE 1: runs on the borders and in the middle
+    available = np.array(
+        [
+            [True, True, False, True],
+            [False, False, False, False],
+            [False, True, True, True],
+        ]
+    )
+    assert get_available_intervals(available) == [(0, 0, 1), (0, 3, 3), (2, 1, 3)]
+
+    # TEST CASE 2: random room
+    room_management = RoomManagement()
+    rand = random.Random(4)
+    room = Room(row=20, col=30)
+    room.add_seats(
+        [Seat(pos_x=rand.randrange(20), pos_y=rand.randrange(30)) for _ in range(7)]
+    )
+    distance_map = get_distance_map(get_occupancy(room))
+    intervals = get_available_intervals(
+        get_available_mask_from_distance_map(distance_map, 5)
+    )
+    assert [
+        (pos_x, pos_y)
+        for pos_x, start_col, end_col in intervals
+        for pos_y in range(start_col, end_col + 1)
+    ] == room_management.get_available_seats(room=room, min_distance=5)
+
+
+def test_get_available_mask_in_rect():
+    """
+    Tests available seats of a rectangle match the whole room
+    """
+    rand = random.Random(5)
+    room = Room(row=25, col=30)
+    room.add_seats(
+        [Seat(pos_x=rand.randrange(25), pos_y=rand.randrange(30)) for _ in range(9)]
+    )
+    occupancy = get_occupancy(room)
+
+    for min_distance in [0, 1, 4, 7]:
+        expected = get_blocked_counts(occupancy, min_distance) == 0
+        for _ in range(20):
+            row_start, row_end = sorted(rand.sample(range(26), 2))
+            col_start, col_end = sorted(rand.sample(range(31), 2))
+            assert (
+                get_available_mask_in_rect(
+                    occupancy, min_distance, row_start, row_end, col_start, col_end
+                )
+                == expected[row_start:row_end, col_start:col_end]
+            ).all()
+
+
+def test_record_room_requests(monkeypatch):
+    """
+    Tests reads of rooms are counted in process and flushed in one round-trip
+    """
+    monkeypatch.setattr(settings, "availability_warm_rooms", 20)
+    monkeypatch.setattr(settings, "availability_requests_flush_ms", 60000)
+    room_management = RoomManagement()
+    room_ids = [
+        room_management.add_room(row=5, col=5).id,
+        room_management.add_room(row=5, col=5).id,
+    ]
+
+    # TEST CASE 1: reads are not sent before the flush
+    room_management.record_room_requests([room_ids[0], room_ids[1], room_ids[0]])
+    assert (
+        room_management.redis_client.client.zscore("room_requests", room_ids[0]) is None
+    )
+
+    # TEST CASE 2: the flush adds the counts
+    room_management.flush_room_requests()
+    assert [
+        room_management.redis_client.client.zscore("room_requests", room_id)
+        for room_id in room_ids
+    ] == [2, 1]
+    assert not room_management.room_requests
+    for room_id in room_ids:
+        room_management.remove_room(room_id)
@@ -0,0 +1,92 @@
+"""
+This module contains tests for the seat index module.
+"""
+
+import random
+
+import numpy as np
+
+from src.use_cases.seat_index import RotatedGridIndex, RotatedPrefixSumIndex
+
+
+def test_rotated_grid_index():
+    """
+    Tests rotated grid index matches brute force manhattan distance
+    """
+    # TEST CASE 1: empty index
+    seat_index = RotatedGridIndex([], bucket_size=4)
+    assert not seat_index.any_within(0, 0, 4)
+
+    # TEST CASE 2: seat on the border of the diamond
+    seat_index = RotatedGridIndex([(0, 1)], bucket_size=4)
+    assert seat_index.any_within(4, 1, 4)
+    assert seat_index.any_within(2, 3, 4)
+    assert not seat_index.any_within(4, 2, 4)
+    assert not seat_index.any_within(0, 1, -1)
+
+    # TEST CASE 3: random seats and distances
+    rand = random.Random(0)
+    seats = [(rand.randrange(30), rand.randrange(40)) for _ in range(25)]
+    for bucket_size in [0, 1, 3, 8]:
+        seat_index = RotatedGridIndex(seats, bucket_size=bucket_size)
+        for _ in range(300):
+            pos_x, pos_y = rand.randrange(30), rand.randrange(40)
+            distance = rand.randrange(0, 10)
+            expected = any(
+                abs(pos_x - taken_x) + abs(pos_y - taken_y) <= distance
+                for taken_x, taken_y in seats
+            )
+            assert seat_index.any_within(pos_x, pos_y, distance) == expected
+
+
+def test_rotated_prefix_sum_index():
+    """
+    Tests rotated prefix sum index matches brute force manhattan distance
+    """
+    rand = random.Random(1)
+    for row, col, count in [
+        (1, 1, 1),
+        (5, 10, 12),
+        (30, 20, 200),
+        (12, 40, 480),
+        (300, 250, 40),
+    ]:
+        seats = {(rand.randrange(row), rand.randrange(col)) for _ in range(count)}
+        occupancy = np.zeros((row, col), dtype=bool)
+        for pos_x, pos_y in seats:
+            occupancy[pos_x, pos_y] = True
+        seat_index = RotatedPrefixSumIndex.from_occupancy(occupancy)
+
+        # TEST CASE 1: encode and decode
+        seat_index = RotatedPrefixSumIndex.decode(seat_index.encode(), row, col)
+
+        # TEST CASE 2: count taken seats within distance
+        for _ in range(200):
+            pos_x, pos_y = rand.randrange(row), rand.randrange(col)
+            distance = rand.randrange(-1, 8)
+            expected = sum(
+                1
+                for taken_x, taken_y in seats
+                if abs(pos_x - taken_x) + abs(pos_y - taken_y) <= distance
+            )
+            assert seat_index.count_within(pos_x, pos_y, distance) == expected
+            assert seat_index.any_within(pos_x, pos_y, distance) == (expected > 0)
+
+
+def test_rotated_prefix_sum_index_size():
+    """
+    Tests the table of the rotated prefix sum index stays proportional to the room
+    """
+    # TEST CASE 1: the table holds the seat count in the smallest dtype
+    assert RotatedPrefixSumIndex.get_dtype(255, 257) == np.uint16
+    assert RotatedPrefixSumIndex.get_dtype(256, 256) == np.uint32
+    occupancy = np.ones((100, 100), dtype=bool)
+    assert RotatedPrefixSumIndex.from_occupancy(occupancy).prefix_sum.nbytes == (
+        200 * 200 * 2
+    )
+
+    # TEST CASE 2: long thin rooms don't fit
+    assert RotatedPrefixSumIndex.fits(100, 100)
+    assert RotatedPrefixSumIndex.fits(10, 50)
+    assert not RotatedPrefixSumIndex.fits(1, 10000)
+    assert not RotatedPrefixSumIndex.fits(10, 100)